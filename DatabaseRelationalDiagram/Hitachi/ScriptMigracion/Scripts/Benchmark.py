@@ -0,0 +1,352 @@
+import os
+import sys
+import io
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+import traceback
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime, timedelta
+import Migrations as funcs
+import Scheduler as planificador
+import Conexiones as conexiones
+
+# Medición del rendimiento de la migración con volcados sintéticos.
+# Los volcados se generan en una carpeta aparte (MIGRACION_RAIZ), por lo que no se tocan DumpFolder ni FicherosModificados_Datos.
+# Uso: python Scripts\Benchmark.py [--filas N] [--mysql] [--guardar-referencia]
+
+# Fichero con las mediciones de referencia. Las regresiones respecto a él se marcan al terminar
+FICHERO_REFERENCIA = 'benchmark_referencia.json'
+
+# Las etapas con menos filas no se comparan con la referencia: su tiempo es sobre todo ruido
+FILAS_MINIMAS_COMPARAR = 1000
+
+# Filas de cada INSERT de los volcados generados, como las de un mysqldump con extended-insert
+FILAS_POR_INSERT = 1000
+
+# Fecha a partir de la que se generan las fechas de los volcados
+FECHA_INICIO = datetime(2020, 1, 1, 6, 0, 0)
+
+# Función que calcula las filas de cada fichero del volcado a partir de las filas de ordenes
+def calcular_tamanos(filas):
+    activos = max(10, filas // 20)
+    return {
+        'hitachi_empresas.sql': 3,
+        'hitachi_plantas.sql': 10,
+        'hitachi_centrosdecostes.sql': 50,
+        'hitachi_localizaciones.sql': 200,
+        'hitachi_tiposincidencias.sql': 20,
+        'hitachi_incidencias.sql': 200,
+        'hitachi_resoluciones.sql': 50,
+        'hitachi_activos.sql': activos,
+        'hitachi_componentes.sql': activos,
+        'hitachi_activo_componentes.sql': activos * 2,
+        'hitachi_estados.sql': 6,
+        'hitachi_tipos_ordenes.sql': 5,
+        'hitachi_ordenes.sql': filas,
+        'hitachi_orden_incidencias_resolucion.sql': filas,
+        'hitachi_usuarios_orden.sql': filas,
+        'hitachi_historial_modificaciones_usuarios_ordenes.sql': filas * 2
+    }
+
+# Función que devuelve una fecha del volcado que avanza con el Id de la fila
+def fecha(identificador, minutos=0):
+    return (FECHA_INICIO + timedelta(minutes=identificador * 7 + minutos)).strftime('%Y-%m-%d %H:%M:%S')
+
+# Función que genera las filas de un fichero del volcado con la forma que espera su mapeo.
+# Las claves externas apuntan a filas que existen y los valores que se traducen se toman de reemplazos.json
+def generar_filas(fichero, tamanos, aleatorio):
+    criticidades = [clave for clave in funcs.leer_reemplazos('criticidad') if clave != 'NULL']
+    actividades = [int(clave) for clave in funcs.leer_reemplazos('actividad')]
+    usuarios = [int(clave) for clave in funcs.leer_reemplazos('usuarios') if clave != 'NULL']
+    # El creador de la orden se traduce con su propia tabla, que no tiene todos los usuarios
+    creadores = [int(clave) for clave in funcs.leer_reemplazos('usuarios_creadores') if clave != 'NULL']
+    elegir = lambda tabla: aleatorio.randint(1, tamanos[tabla])
+    comentarios = [
+        "Cambio de rodamiento (lado acoplamiento), revisar holguras del eje",
+        "Fuga de aceite en el reductor; se sustituye el retén",
+        "Revisión eléctrica: el motor no arranca, it's the contactor",
+        "Parada por alarma de temperatura \\ sin causa aparente",
+        None
+    ]
+
+    for i in range(1, tamanos[fichero] + 1):
+        if fichero == 'hitachi_empresas.sql':
+            yield (i, f'Empresa {i}')
+        elif fichero == 'hitachi_plantas.sql':
+            yield (i, f'Planta {i}', 'smtp.planta.local', 37.8 + i / 100, -4.7 - i / 100, elegir('hitachi_empresas.sql'))
+        elif fichero == 'hitachi_centrosdecostes.sql':
+            yield (i, f'CC{i:05d}', f'Centro de coste {i}', f'Cost centre {i}', elegir('hitachi_plantas.sql'))
+        elif fichero == 'hitachi_localizaciones.sql':
+            yield (i, f'Localización {i}', f'Location {i}', f'L{i:05d}', 37.8, -4.7, 'Almacén central', elegir('hitachi_plantas.sql'))
+        elif fichero in ('hitachi_tiposincidencias.sql', 'hitachi_resoluciones.sql', 'hitachi_estados.sql', 'hitachi_tipos_ordenes.sql'):
+            yield (i, f'Descripción {i}', f'Description {i}')
+        elif fichero == 'hitachi_incidencias.sql':
+            yield (i, f'Incidencia {i}', f'Incident {i}', elegir('hitachi_tiposincidencias.sql'))
+        elif fichero == 'hitachi_activos.sql':
+            # Los valores de criticidad llegan como texto y a veces vacíos, como en el volcado real
+            yield (i, f'A{i:06d}', f'Bomba {i} (principal)', f'Pump {i}', str(aleatorio.randint(0, 3)), aleatorio.randint(0, 3),
+                   '' if i % 11 == 0 else str(aleatorio.randint(0, 3)), aleatorio.randint(0, 3), f'{aleatorio.randint(0, 100)}%',
+                   aleatorio.choice(criticidades), elegir('hitachi_localizaciones.sql'), elegir('hitachi_centrosdecostes.sql'), 12,
+                   aleatorio.choice(actividades))
+        elif fichero == 'hitachi_componentes.sql':
+            yield (i, f'K{i:06d}', f'Componente {i}', f'Component {i}', aleatorio.randint(1, i - 1) if i > 1 and i % 3 else None)
+        elif fichero == 'hitachi_activo_componentes.sql':
+            yield (elegir('hitachi_activos.sql'), elegir('hitachi_componentes.sql'))
+        elif fichero == 'hitachi_ordenes.sql':
+            cerrada = i % 4 != 0
+            yield (i, f'SAP{i:08d}', fecha(i), fecha(i, 30), aleatorio.choice(comentarios), fecha(i, 600) if cerrada else None,
+                   'Sustituido y probado' if cerrada else None, aleatorio.choice([0, 0.5, 1.5, 8]), int(cerrada),
+                   elegir('hitachi_activos.sql'), elegir('hitachi_estados.sql'), aleatorio.choice(creadores),
+                   elegir('hitachi_tipos_ordenes.sql'), 'Rodamiento 6205' if i % 5 == 0 else None, None)
+        elif fichero == 'hitachi_orden_incidencias_resolucion.sql':
+            yield (i, fecha(i), elegir('hitachi_ordenes.sql'), elegir('hitachi_componentes.sql'), elegir('hitachi_incidencias.sql'),
+                   elegir('hitachi_resoluciones.sql'), fecha(i, 600), None, aleatorio.randint(0, 1), aleatorio.randint(0, 1),
+                   aleatorio.randint(0, 1))
+        elif fichero == 'hitachi_usuarios_orden.sql':
+            yield (aleatorio.choice(usuarios), i)
+        elif fichero == 'hitachi_historial_modificaciones_usuarios_ordenes.sql':
+            yield (i, fecha(i), elegir('hitachi_ordenes.sql'), aleatorio.choice(usuarios), aleatorio.choice(usuarios))
+
+# Función que escribe un volcado sintético con el formato de mysqldump en DumpFolder de la carpeta raíz actual
+def generar_volcado(fichero, tamanos, semilla=0):
+    tabla = fichero[len('hitachi_'):-len('.sql')]
+    aleatorio = random.Random(f'{semilla}-{fichero}')
+    filas = generar_filas(fichero, tamanos, aleatorio)
+
+    with open(funcs.obtener_ruta('DumpFolder', fichero), 'w', encoding='utf-8') as file:
+        file.write(f"-- Volcado sintético para el benchmark de la migración\n"
+                   f"DROP TABLE IF EXISTS `{tabla}`;\n"
+                   f"LOCK TABLES `{tabla}` WRITE;\n")
+        while True:
+            lote = [funcs.formatear_tupla(valores) for _, valores in zip(range(FILAS_POR_INSERT), filas)]
+            if not lote:
+                break
+            file.write(f"INSERT INTO `{tabla}` VALUES " + ','.join(lote) + ';\n')
+        file.write("UNLOCK TABLES;\n")
+
+# Cursor que acepta las sentencias sin enviarlas a ninguna base de datos
+class CursorSimulado:
+    def __init__(self, destino):
+        self.destino = destino
+        self.with_rows = False
+        self.rowcount = 0
+
+    def execute(self, sentencia, parametros=None):
+        self.destino.bytes += len(sentencia)
+        # LOAD DATA LOCAL INFILE envía el fichero completo al servidor: se lee para que su coste cuente en la carga
+        if sentencia.startswith("LOAD DATA LOCAL INFILE"):
+            with open(parametros[0], 'rb') as file:
+                for bloque in iter(lambda: file.read(1024 * 1024), b''):
+                    self.destino.bytes += len(bloque)
+
+    def executemany(self, sentencia, filas):
+        for valores in filas:
+            self.destino.bytes += len(sentencia)
+
+    def fetchall(self):
+        return []
+
+    def fetchone(self):
+        return None
+
+    def close(self):
+        pass
+
+# Conexión que sustituye a MySQL cuando se mide la migración sin base de datos
+class ConexionSimulada:
+    def __init__(self, destino):
+        self.destino = destino
+
+    def cursor(self):
+        return CursorSimulado(self.destino)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+# Pool con la misma interfaz que PoolConexiones que solo cuenta los bytes que recibiría la base de datos
+class PoolSimulado:
+    def __init__(self):
+        self.bytes = 0
+
+    @contextmanager
+    def conexion(self):
+        yield ConexionSimulada(self)
+
+    def cerrar(self):
+        pass
+
+# Función que ejecuta una etapa repetidas veces y mide su mejor tiempo y la memoria pico de Python.
+# La memoria se mide en una ejecución aparte porque tracemalloc ralentiza la que observa
+def medir(etapa, filas, repeticiones=1):
+    tiempos = []
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            resultado = etapa()
+        tiempos.append(time.perf_counter() - inicio)
+        if resultado is not True and not isinstance(resultado, tuple):
+            raise RuntimeError(f"La etapa ha fallado: {resultado}")
+
+    tracemalloc.start()
+    try:
+        with redirect_stdout(io.StringIO()):
+            etapa()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    segundos = min(tiempos)
+    return {
+        'filas': filas,
+        'segundos': round(segundos, 3),
+        'filas_por_segundo': round(filas / segundos) if segundos else None,
+        'memoria_pico_mb': round(pico / 1024 ** 2, 1)
+    }
+
+# Función que compara las mediciones con la referencia y devuelve las etapas que han empeorado más que la tolerancia
+def comparar_referencia(resultados, referencia, tolerancia):
+    regresiones = []
+    for etapa, medida in resultados['etapas'].items():
+        base = referencia['etapas'].get(etapa)
+        if base is None or medida['filas'] < FILAS_MINIMAS_COMPARAR:
+            continue
+
+        if base['filas_por_segundo'] and medida['filas_por_segundo'] < base['filas_por_segundo'] * (1 - tolerancia):
+            regresiones.append(f"{etapa}: {medida['filas_por_segundo']} filas/s frente a {base['filas_por_segundo']} de referencia")
+        if medida['memoria_pico_mb'] > base['memoria_pico_mb'] * (1 + tolerancia) and medida['memoria_pico_mb'] - base['memoria_pico_mb'] > 1:
+            regresiones.append(f"{etapa}: {medida['memoria_pico_mb']} MB frente a {base['memoria_pico_mb']} MB de referencia")
+    return regresiones
+
+# Función que imprime la tabla de resultados
+def imprimir_resultados(resultados):
+    print(f"\n{'Etapa':<70} {'Filas':>9} {'Segundos':>9} {'Filas/s':>10} {'Pico MB':>8}")
+    for etapa, medida in resultados['etapas'].items():
+        print(f"{etapa:<70} {medida['filas']:>9} {medida['segundos']:>9} {medida['filas_por_segundo'] or '-':>10} {medida['memoria_pico_mb']:>8}")
+
+# Función que genera los volcados y mide cada transformación y la migración completa.
+# Las transformaciones se miden en este proceso; la migración completa usa el planificador con sus procesos y conexiones,
+# por lo que su memoria pico es la del proceso principal (lectura y carga de los ficheros)
+def ejecutar_benchmark(args, raiz):
+    os.environ[funcs.VARIABLE_RAIZ] = raiz
+    carpeta_scripts = os.path.dirname(os.path.abspath(__file__))
+    for fichero in (funcs.FICHERO_REEMPLAZOS, 'limpiar_BBDD.sql'):
+        shutil.copy(os.path.join(carpeta_scripts, fichero), funcs.obtener_ruta('Scripts', fichero))
+
+    ficheros = list(funcs.MAPEOS)
+    tamanos = calcular_tamanos(args.filas)
+    formato = 'tsv' if args.carga_masiva else 'sql'
+
+    print(f"Generando volcados sintéticos en {raiz}...")
+    for fichero in ficheros:
+        generar_volcado(fichero, tamanos, args.semilla)
+
+    resultados = {
+        'filas': args.filas,
+        'formato': formato,
+        'columnar': args.columnar,
+        'partes': args.partes,
+        'destino': 'mysql' if args.mysql else 'simulado',
+        'etapas': {}
+    }
+
+    for fichero in ficheros:
+        if args.tabla and funcs.MAPEOS[fichero].tabla != args.tabla:
+            continue
+        print(f"Midiendo la transformación de {fichero}...")
+        resultados['etapas'][f"transformar {fichero}"] = medir(
+            lambda: funcs.transformar_fichero(fichero, formato, columnar=args.columnar), tamanos[fichero], args.repeticiones)
+
+    if not args.tabla:
+        if args.mysql:
+            configuracion = funcs.conexionMySQL()
+            if args.base_datos:
+                configuracion['database'] = args.base_datos
+            if args.carga_masiva:
+                configuracion['allow_local_infile'] = True
+            pool = conexiones.PoolConexiones(configuracion, args.conexiones)
+        else:
+            pool = PoolSimulado()
+
+        # En MySQL cada medición empieza con las tablas vacías
+        def migrar():
+            if args.mysql:
+                respuesta = funcs.ejecutar_script_mysql(pool, funcs.leer_fichero_sql('limpiar_BBDD.sql'))
+                if respuesta is not True:
+                    return respuesta
+            return planificador.ejecutar_migracion(pool, ficheros, procesos=args.procesos, conexiones=args.conexiones,
+                                                   carga_masiva=args.carga_masiva, limite_cache=None, columnar=args.columnar,
+                                                   partes=args.partes)
+
+        print("Midiendo la migración completa...")
+        try:
+            resultados['etapas']['migracion completa'] = medir(migrar, sum(tamanos.values()), args.repeticiones)
+        finally:
+            pool.cerrar()
+
+    return resultados
+
+if __name__ == "__main__":
+    try:
+        parser = argparse.ArgumentParser(description="Benchmark de la migración con volcados sintéticos")
+        parser.add_argument('--filas', type=int, default=50000, help="Filas de ordenes; el resto de tablas se generan en proporción")
+        parser.add_argument('--semilla', type=int, default=0, help="Semilla de los valores aleatorios de los volcados")
+        parser.add_argument('--repeticiones', type=int, default=3, help="Veces que se repite cada etapa, se guarda el mejor tiempo")
+        parser.add_argument('--tabla', default=None, help="Medir solo la transformación de esta tabla de destino")
+        parser.add_argument('--carpeta', default=None, help="Carpeta en la que generar los volcados (por defecto, una temporal que se borra al terminar)")
+        parser.add_argument('--procesos', type=int, default=None, help="Procesos para transformar los ficheros en la migración completa")
+        parser.add_argument('--partes', type=int, default=1, help="Partes en las que repartir los volcados grandes en la migración completa")
+        parser.add_argument('--conexiones', type=int, default=4, help="Conexiones simultáneas de la migración completa")
+        parser.add_argument('--carga-masiva', action='store_true', help="Medir la transformación a TSV y la carga con LOAD DATA LOCAL INFILE")
+        parser.add_argument('--columnar', action='store_true', help="Medir la transformación por columnas con NumPy")
+        parser.add_argument('--mysql', action='store_true', help="Cargar en MySQL en lugar del destino simulado. VACÍA las tablas de la base de datos")
+        parser.add_argument('--base-datos', default=None, help="Base de datos de MySQL en la que cargar (por defecto, la de conexionMySQL)")
+        parser.add_argument('--tolerancia', type=float, default=0.2, help="Empeoramiento respecto a la referencia que se marca como regresión")
+        parser.add_argument('--guardar-referencia', action='store_true', help=f"Guardar las mediciones en Scripts/{FICHERO_REFERENCIA}")
+        args = parser.parse_args()
+
+        raiz = os.path.abspath(args.carpeta) if args.carpeta else tempfile.mkdtemp(prefix='benchmark_migracion_')
+        try:
+            resultados = ejecutar_benchmark(args, raiz)
+        finally:
+            if not args.carpeta:
+                shutil.rmtree(raiz, ignore_errors=True)
+            os.environ.pop(funcs.VARIABLE_RAIZ, None)
+
+        imprimir_resultados(resultados)
+
+        ruta_referencia = funcs.obtener_ruta('Scripts', FICHERO_REFERENCIA)
+        if args.guardar_referencia:
+            with open(ruta_referencia, 'w', encoding='utf-8') as file:
+                json.dump(resultados, file, indent=4, ensure_ascii=False)
+                file.write('\n')
+            print(f"\nReferencia guardada en {ruta_referencia}")
+        elif os.path.exists(ruta_referencia):
+            with open(ruta_referencia, 'r', encoding='utf-8') as file:
+                referencia = json.load(file)
+
+            opciones = ('filas', 'formato', 'columnar', 'partes', 'destino')
+            if any(referencia.get(opcion) != resultados[opcion] for opcion in opciones):
+                print("\nLa referencia se midió con otras opciones " +
+                      ', '.join(f"{opcion}={referencia.get(opcion)}" for opcion in opciones) + ", no se compara")
+            else:
+                regresiones = comparar_referencia(resultados, referencia, args.tolerancia)
+                if regresiones:
+                    print("\nREGRESIONES respecto a la referencia:")
+                    for regresion in regresiones:
+                        print(f"  {regresion}")
+                    sys.exit(1)  # Terminar con un código de error para que la regresión no pase desapercibida
+                print("\nSin regresiones respecto a la referencia.")
+    except Exception as ex:
+        print(f"Excepcion: {traceback.print_exc()}")
+        print()
+        print("ERROR INESPERADO. TERMINANDO LA EJECUCIÓN.")
+        sys.exit(1)  # Detener la ejecución con un código de error
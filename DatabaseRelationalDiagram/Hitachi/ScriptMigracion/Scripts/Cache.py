@@ -0,0 +1,156 @@
+import os
+import json
+import hashlib
+import Migrations as funcs
+import Particiones as particiones
+import Verificacion as verificador
+import Informe as informe
+
+# Carpeta con los ficheros transformados de ejecuciones anteriores, guardados por su clave
+CARPETA_CACHE = 'CacheTransformaciones'
+
+# Tamaño máximo por defecto de la caché en bytes
+LIMITE_CACHE = 5 * 1024 ** 3
+
+# Función que calcula el hash del contenido de un fichero leyéndolo por bloques
+def hash_fichero(ruta_fichero):
+    resumen = hashlib.sha256()
+    with open(ruta_fichero, 'rb') as file:
+        for bloque in iter(lambda: file.read(1024 * 1024), b''):
+            resumen.update(bloque)
+    return resumen.hexdigest()
+
+# Función que obtiene la versión de las transformaciones: cualquier cambio en su código invalida la caché
+def version_transformaciones():
+    carpeta = os.path.dirname(os.path.abspath(funcs.__file__))
+    modulos = ('Migrations.py', 'Columnar.py', 'Indice.py', 'Particiones.py', 'Verificacion.py')
+    return [hash_fichero(os.path.join(carpeta, modulo)) for modulo in modulos]
+
+# Función que calcula la clave de un fichero transformado a partir de todo lo que influye en su contenido
+def clave_transformacion(fichero, formato, filas_por_lote, bytes_por_lote, marca, columnar, compresion, partes=1):
+    datos = {
+        'volcado': hash_fichero(funcs.obtener_ruta('DumpFolder', fichero)),
+        'version': version_transformaciones(),
+        'reemplazos': hash_fichero(funcs.obtener_ruta('Scripts', funcs.FICHERO_REEMPLAZOS)),
+        'fichero': fichero,
+        'mapeo': funcs.MAPEOS[fichero],
+        'formato': formato,
+        'filas_por_lote': filas_por_lote,
+        'bytes_por_lote': bytes_por_lote,
+        'marca': marca,
+        'columnar': columnar,
+        'compresion': compresion,
+        'partes': partes
+    }
+    return hashlib.sha256(json.dumps(datos, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+# Función que copia un fichero sustituyendo el destino. Se intenta un enlace duro para no duplicar el espacio en disco
+def enlazar_fichero(origen, destino):
+    temporal = destino + '.tmp'
+    if os.path.exists(temporal):
+        os.remove(temporal)
+    try:
+        os.link(origen, temporal)
+    except OSError:
+        with open(origen, 'rb') as lectura, open(temporal, 'wb') as escritura:
+            for bloque in iter(lambda: lectura.read(1024 * 1024), b''):
+                escritura.write(bloque)
+    os.replace(temporal, destino)
+
+# Función que transforma un fichero reutilizando el resultado de una ejecución anterior si no ha cambiado nada.
+# Devuelve lo mismo que transformar_fichero; las medidas de un fichero reutilizado solo indican sus filas y que viene de la caché.
+# Con limite_cache None no se usa la caché. El resumen del fichero (resumir) se guarda en la caché junto al fichero, si se generó.
+# Con más de una parte el volcado se reparte entre los procesos de ejecutor (módulo Particiones) y esta función se ejecuta en un hilo
+def transformar_fichero(fichero, formato='sql', filas_por_lote=None, bytes_por_lote=None, marca=None, limite_cache=LIMITE_CACHE,
+                        columnar=False, compresion=None, resumir=False, partes=1, ejecutor=None):
+    if limite_cache is None:
+        return transformar_volcado(fichero, formato, filas_por_lote, bytes_por_lote, marca, columnar, compresion, resumir, partes,
+                                   ejecutor)
+
+    clave = clave_transformacion(fichero, formato, filas_por_lote, bytes_por_lote, marca, columnar, compresion, partes)
+    ruta_datos = funcs.obtener_ruta(CARPETA_CACHE, clave + '.json')
+
+    if os.path.exists(ruta_datos):
+        with open(ruta_datos, 'r', encoding='utf-8') as file:
+            datos = json.load(file)
+        ruta_cache = funcs.obtener_ruta(CARPETA_CACHE, clave + os.path.splitext(datos['fichero_modificado'])[1])
+        ruta_modificado = funcs.obtener_ruta('FicherosModificados_Datos', datos['fichero_modificado'])
+
+        if os.path.exists(ruta_cache):
+            # El fichero de FicherosModificados_Datos solo se sustituye si no es ya el de la caché
+            if not (os.path.exists(ruta_modificado) and os.path.samefile(ruta_cache, ruta_modificado)):
+                enlazar_fichero(ruta_cache, ruta_modificado)
+            # El resumen que hubiera junto al fichero puede ser de otra transformación. Si el fichero se guardó sin resumen
+            # y ahora se pide, se resume ya, en paralelo con las cargas, y se guarda también en la caché
+            if os.path.exists(ruta_resumen_cache(clave)):
+                enlazar_fichero(ruta_resumen_cache(clave), verificador.ruta_resumen(ruta_modificado))
+            elif resumir:
+                posiciones = verificador.posiciones_verificacion(funcs.MAPEOS[fichero])
+                resumen = verificador.nuevo_resumen(posiciones)
+                resumen['tramos'] = verificador.resumir_fichero(datos['fichero_modificado'], posiciones)
+                verificador.guardar_resumen(ruta_modificado, resumen)
+                enlazar_fichero(verificador.ruta_resumen(ruta_modificado), ruta_resumen_cache(clave))
+            else:
+                verificador.borrar_resumen(ruta_modificado)
+
+            # Se actualiza la fecha de uso para que la limpieza elimine primero las entradas más antiguas
+            os.utime(ruta_cache)
+            os.utime(ruta_datos)
+            informe.registrar(f"Se reutiliza la transformación anterior de {fichero}.")
+            return datos['fichero_modificado'], datos['marca'], {'cache': True, 'filas': datos.get('filas')}
+
+    fichero_modificado, nueva_marca, medidas = transformar_volcado(fichero, formato, filas_por_lote, bytes_por_lote, marca, columnar,
+                                                                  compresion, resumir, partes, ejecutor)
+
+    ruta_modificado = funcs.obtener_ruta('FicherosModificados_Datos', fichero_modificado)
+    ruta_cache = funcs.obtener_ruta(CARPETA_CACHE, clave + os.path.splitext(fichero_modificado)[1])
+    enlazar_fichero(ruta_modificado, ruta_cache)
+    if os.path.exists(verificador.ruta_resumen(ruta_modificado)):
+        enlazar_fichero(verificador.ruta_resumen(ruta_modificado), ruta_resumen_cache(clave))
+    with open(ruta_datos + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump({'fichero_modificado': fichero_modificado, 'marca': nueva_marca, 'filas': medidas['filas']}, file, default=str)
+    os.replace(ruta_datos + '.tmp', ruta_datos)
+
+    limpiar_cache(limite_cache)
+    return fichero_modificado, nueva_marca, medidas
+
+# Función que obtiene la ruta en la caché del resumen de un fichero transformado. Su extensión lo agrupa con el fichero en la limpieza
+def ruta_resumen_cache(clave):
+    return funcs.obtener_ruta(CARPETA_CACHE, clave + '.resumen')
+
+# Función que transforma un volcado entero o repartido en partes
+def transformar_volcado(fichero, formato, filas_por_lote, bytes_por_lote, marca, columnar, compresion, resumir=False, partes=1,
+                        ejecutor=None):
+    if partes > 1:
+        return particiones.transformar_fichero(fichero, ejecutor, partes, formato, filas_por_lote, bytes_por_lote, marca, columnar,
+                                               compresion, resumir)
+    return funcs.transformar_fichero(fichero, formato, filas_por_lote, bytes_por_lote, marca, columnar, compresion, resumir)
+
+# Función que elimina las entradas usadas hace más tiempo hasta que la caché ocupa menos que el límite
+def limpiar_cache(limite_cache=LIMITE_CACHE):
+    carpeta = os.path.dirname(funcs.obtener_ruta(CARPETA_CACHE, ''))
+    entradas = {}
+    for nombre in os.listdir(carpeta):
+        if nombre.endswith('.tmp'):
+            continue
+        ruta = os.path.join(carpeta, nombre)
+        try:
+            estado = os.stat(ruta)
+        except FileNotFoundError:
+            continue
+        clave = os.path.splitext(nombre)[0]
+        fecha, tamano = entradas.get(clave, (0, 0))
+        entradas[clave] = (max(fecha, estado.st_mtime), tamano + estado.st_size)
+
+    ocupado = sum(tamano for _, tamano in entradas.values())
+    for clave, (_, tamano) in sorted(entradas.items(), key=lambda entrada: entrada[1][0]):
+        if ocupado <= limite_cache:
+            break
+        for nombre in os.listdir(carpeta):
+            if nombre.startswith(clave):
+                try:
+                    os.remove(os.path.join(carpeta, nombre))
+                except FileNotFoundError:
+                    # Otro proceso puede haber eliminado la misma entrada
+                    pass
+        ocupado -= tamano
@@ -0,0 +1,210 @@
+import asyncio
+import functools
+import Conexiones as conexiones
+import Informe as informe
+
+# aiomysql es opcional: sin él los scripts SQL se cargan con una sola conexión síncrona por tabla
+try:
+    import aiomysql
+    from pymysql.err import MySQLError as ErrorAsincrono
+except ImportError:
+    aiomysql = None
+    ErrorAsincrono = Exception
+
+# Errores de una conexión asíncrona que se pierde: además de los de MySQL, los del socket (OSError), los de una respuesta
+# cortada a medias (IncompleteReadError es un EOFError) y los de los tiempos de espera
+ERRORES_CONEXION = (ErrorAsincrono, OSError, EOFError, asyncio.TimeoutError)
+
+# Sentencias en cola por cada escritor. La cola llena detiene la lectura del fichero y limita la memoria de la carga
+SENTENCIAS_POR_ESCRITOR = 2
+
+# Función que indica si se puede usar la carga asíncrona
+def disponible():
+    return aiomysql is not None
+
+# Función que traduce la configuración de mysql.connector a los parámetros de conexión de aiomysql
+def configuracion_asincrona(mysql_config):
+    return {
+        'host': mysql_config.get('host', 'localhost'),
+        'port': mysql_config.get('port', 3306),
+        'user': mysql_config.get('user'),
+        'password': mysql_config.get('password', ''),
+        'db': mysql_config.get('database'),
+        'connect_timeout': mysql_config.get('connect_timeout', 60),
+        'charset': 'utf8mb4',
+        'autocommit': False
+    }
+
+# Función que abre una conexión asíncrona y le aplica las mismas variables de sesión que el pool síncrono
+async def abrir_conexion(configuracion, sesion=conexiones.SESION_CARGA):
+    conexion = await aiomysql.connect(**configuracion)
+    try:
+        async with conexion.cursor() as cursor:
+            for variable, valor in sesion.items():
+                try:
+                    await cursor.execute(f"SET SESSION {variable} = {valor}")
+                except ErrorAsincrono as e:
+                    if not conexiones.variable_ignorable(variable, e.args[0] if e.args else None):
+                        raise
+                    print(f"No se puede cambiar {variable} ({e}), se mantiene el valor del servidor")
+    except BaseException:
+        conexion.close()
+        raise
+    return conexion
+
+# Sentencias confirmadas por los escritores. Los escritores confirman sus lotes en cualquier orden, así que la posición
+# del fichero solo avanza hasta la última sentencia que tiene confirmadas también todas las anteriores.
+# Los INSERT confirmados por delante de esa posición se guardan en el punto de control para no repetirlos al reanudar
+class Confirmaciones:
+    def __init__(self, progreso, al_confirmar=None):
+        self.progreso = progreso
+        self.al_confirmar = al_confirmar
+        self.siguiente = 0
+        self.pendientes = {}
+        self.lotes = 0
+        self.guardado = None
+        self.en_espera = None
+        self.error = None
+
+    # Función que registra las sentencias confirmadas, cada una como (número, posición tras ella, sentencia).
+    # lote indica si es un commit de un escritor o una sentencia que no se ejecuta. Como en la carga síncrona,
+    # solo los commits generan punto de control y la sentencia del progreso es siempre un INSERT
+    def confirmar(self, sentencias, lote=True):
+        for numero, posicion, sentencia in sentencias:
+            self.pendientes[numero] = (posicion, sentencia)
+
+        avanza = False
+        while self.siguiente in self.pendientes:
+            posicion, sentencia = self.pendientes.pop(self.siguiente)
+            self.progreso['posicion'] = posicion
+            if sentencia.startswith("INSERT INTO"):
+                self.progreso['sentencia'] = sentencia
+            self.siguiente += 1
+            avanza = True
+
+        if lote:
+            self.lotes += 1
+            if self.al_confirmar is not None and (avanza or self.pendientes):
+                self.guardar(self.lotes, {'posicion': self.progreso.get('posicion'), 'sentencia': self.progreso.get('sentencia'),
+                                          'confirmadas': self.adelantadas()})
+
+    # Función que devuelve las posiciones tras los INSERT confirmados por delante de la posición del progreso
+    def adelantadas(self):
+        return sorted(posicion for posicion, sentencia in self.pendientes.values() if sentencia.startswith("INSERT INTO"))
+
+    # Función que llama a al_confirmar en un hilo aparte para que escribir el punto de control no detenga a los escritores.
+    # Mientras se guarda un punto de control los siguientes esperan y solo se guarda el último
+    def guardar(self, lote, estado):
+        if self.guardado is not None:
+            self.en_espera = (lote, estado)
+            return
+        self.guardado = asyncio.get_running_loop().run_in_executor(None, functools.partial(self.al_confirmar, lote, estado=estado))
+        self.guardado.add_done_callback(self.guardado_terminado)
+
+    # Función que lanza el punto de control en espera al terminar de guardar el anterior
+    def guardado_terminado(self, guardado):
+        self.guardado = None
+        if guardado.cancelled():
+            return
+        if guardado.exception() is not None:
+            self.error = guardado.exception()
+            self.en_espera = None
+        elif self.en_espera is not None:
+            lote, estado = self.en_espera
+            self.en_espera = None
+            self.guardar(lote, estado)
+
+    # Función que espera a que se guarden los puntos de control pendientes y lanza el error si alguno ha fallado
+    async def esperar(self):
+        while self.guardado is not None:
+            await asyncio.wait([self.guardado])
+        if self.error is not None:
+            raise self.error
+
+# Función que lee las sentencias y las reparte entre los escritores por la cola.
+# Los bloqueos de tabla no se ejecutan: LOCK TABLES en la sesión de un escritor dejaría esperando a los demás
+async def producir(sentencias, lectura, cola, escritores, confirmaciones):
+    for numero, sentencia in enumerate(sentencias):
+        elemento = (numero, lectura['posicion'], sentencia)
+        if sentencia.startswith(("LOCK TABLES", "UNLOCK TABLES")):
+            confirmaciones.confirmar([elemento], lote=False)
+            continue
+        await cola.put(elemento)
+
+    for _ in range(escritores):
+        await cola.put(None)
+
+# Función que ejecuta en su propia conexión las sentencias de la cola, confirmando cada lotes_por_commit INSERT
+async def escribir(configuracion, cola, confirmaciones, lotes_por_commit=None, medidas=None, sesion=conexiones.SESION_CARGA):
+    detalle = informe.activo('detalle')
+    conexion = await abrir_conexion(configuracion, sesion)
+    try:
+        async with conexion.cursor() as cursor:
+            ejecutadas = []
+            while True:
+                elemento = await cola.get()
+                if elemento is None:
+                    break
+
+                sentencia = elemento[2]
+                await cursor.execute(sentencia)
+                if cursor.description:
+                    # Las filas devueltas se leen siempre para poder ejecutar la siguiente sentencia
+                    filas = await cursor.fetchall()
+                    if detalle:
+                        print(f"Filas devueltas: {filas}")
+                elif detalle:
+                    print(f"Afectadas: {cursor.rowcount}")
+
+                if sentencia.startswith("INSERT INTO") and medidas is not None:
+                    medidas['filas'] += max(cursor.rowcount, 0)
+                ejecutadas.append(elemento)
+                if lotes_por_commit and len(ejecutadas) >= lotes_por_commit:
+                    await conexion.commit()
+                    confirmaciones.confirmar(ejecutadas)
+                    ejecutadas = []
+
+            await conexion.commit()
+            if ejecutadas:
+                confirmaciones.confirmar(ejecutadas)
+    finally:
+        # Lo que no se haya confirmado se deshace al cerrar la conexión
+        conexion.close()
+
+# Función que coordina la lectura y los escritores. Si falla cualquiera de ellos se cancelan los demás: la lectura no se queda
+# esperando a que haya sitio en la cola ni los escritores a que lleguen sentencias
+async def ejecutar_tareas(configuracion, sentencias, lectura, escritores, lotes_por_commit, confirmaciones, medidas,
+                          sesion=conexiones.SESION_CARGA):
+    cola = asyncio.Queue(maxsize=escritores * SENTENCIAS_POR_ESCRITOR)
+    tareas = [asyncio.ensure_future(producir(sentencias, lectura, cola, escritores, confirmaciones))]
+    tareas += [asyncio.ensure_future(escribir(configuracion, cola, confirmaciones, lotes_por_commit, medidas, sesion))
+               for _ in range(escritores)]
+    try:
+        await asyncio.gather(*tareas)
+        await confirmaciones.esperar()
+    finally:
+        for tarea in tareas:
+            tarea.cancel()
+        await asyncio.gather(*tareas, return_exceptions=True)
+
+# Función que ejecuta el script con varios escritores asíncronos
+def ejecutar_script_asincrono(mysql_config, sentencias, lectura, escritores=4, lotes_por_commit=None, al_confirmar=None, medidas=None,
+                              progreso=None, sesion=conexiones.SESION_CARGA):
+    """ Ejecutar las sentencias de un script SQL repartidas entre varias conexiones asíncronas.
+    Mientras los escritores esperan la respuesta del servidor se leen las sentencias siguientes, hasta llenar la cola.
+    lectura es el progreso que actualiza Migrations.leer_fichero_modificado al leer cada sentencia.
+    En progreso se guarda la posición tras la última sentencia confirmada junto con todas las anteriores,
+    y al_confirmar se llama en otro hilo con el número de lotes confirmados y, en estado, esa posición, su último INSERT y las
+    posiciones tras los INSERT confirmados por delante de ella (confirmadas).
+    En medidas se van sumando las filas insertadas. Los escritores fijan las variables de sesión, las mismas que el pool síncrono.
+    Devuelve True o el mensaje de error, como Migrations.ejecutar_script_mysql, también si se pierde la conexión de un escritor. """
+    progreso = {} if progreso is None else progreso
+    confirmaciones = Confirmaciones(progreso, al_confirmar)
+    try:
+        asyncio.run(ejecutar_tareas(configuracion_asincrona(mysql_config), sentencias, lectura, max(1, escritores), lotes_por_commit,
+                                    confirmaciones, medidas, sesion))
+        return True
+    except ErrorAsincrono as e:
+        return(f"Error conectando a la base de datos: {e}")
+    except ERRORES_CONEXION as e:
+        return(f"Error en la carga asíncrona: {e!r}")
@@ -0,0 +1,205 @@
+import os
+from array import array
+from collections import namedtuple
+from mysql.connector import Error
+import Migrations as funcs
+import Verificacion as verificador
+
+# Validación de las claves externas antes de la carga. Al terminar la transformación de cada tabla se recorre su fichero
+# transformado: se guardan sus Id en un conjunto compacto para validar sus tablas hijas y se comprueba que cada clave externa
+# de sus filas existe en los Id de su tabla padre. Las claves externas no se comprueban al cargar (Conexiones.SESION_CARGA)
+
+# Clave externa de una tabla migrada: columna de la tabla hija y tabla cuyo Id referencia
+ClaveExterna = namedtuple('ClaveExterna', ['columna', 'padre'])
+
+# Claves externas entre las tablas migradas. La de componentes hacia sí misma (IdComponentePadre) no se comprueba
+CLAVES_EXTERNAS = {
+    'plantas': [ClaveExterna('IdEmpresa', 'empresas')],
+    'centrosdecostes': [ClaveExterna('IdPlanta', 'plantas')],
+    'localizaciones': [ClaveExterna('IdPlanta', 'plantas')],
+    'incidencias': [ClaveExterna('IdMecanismoFallo', 'mecanismosdefallo')],
+    'activos': [ClaveExterna('IdLocalizacion', 'localizaciones'), ClaveExterna('IdCentroCoste', 'centrosdecostes')],
+    'activo_componentes': [ClaveExterna('IdActivo', 'activos'), ClaveExterna('IdComponente', 'componentes')],
+    'ordenes': [ClaveExterna('IdActivo', 'activos'), ClaveExterna('IdEstadoOrden', 'estadosorden'), ClaveExterna('IdTipoOrden', 'tiposorden')],
+    'incidenciasordenes': [ClaveExterna('IdOrden', 'ordenes'), ClaveExterna('IdComponente', 'componentes'),
+                           ClaveExterna('IdIncidencia', 'incidencias'), ClaveExterna('IdResolucion', 'resoluciones')],
+    'usuarios_ordenes': [ClaveExterna('IdOrden', 'ordenes')],
+    'historialcambiosusuariosordenes': [ClaveExterna('IdOrden', 'ordenes')]
+}
+
+# Tablas cuyos Id referencia alguna clave externa
+TABLAS_PADRE = {clave.padre for claves in CLAVES_EXTERNAS.values() for clave in claves}
+
+# Valores huérfanos distintos que se guardan como máximo por clave externa en el informe
+MAXIMO_VALORES = 20
+
+# Id a partir del cual se guardan fuera del mapa de bits (16 MB de mapa como máximo)
+LIMITE_BITS = 2 ** 27
+
+# Conjunto compacto de los Id de una tabla: un mapa de bits indexado por el Id que crece según aparecen Id mayores.
+# Los Id negativos, muy grandes o que no son enteros se guardan aparte en un conjunto normal
+class ConjuntoClaves:
+    def __init__(self):
+        self.bits = bytearray()
+        self.otras = set()
+
+    # Función que convierte el valor leído del fichero (entero o texto) en la clave que se guarda
+    @staticmethod
+    def clave(valor):
+        if valor.__class__ is int:
+            return valor
+        texto = str(valor)
+        return int(texto) if verificador.ENTERO.fullmatch(texto) else texto
+
+    def agregar(self, valor):
+        clave = self.clave(valor)
+        if clave.__class__ is int and 0 <= clave < LIMITE_BITS:
+            byte = clave >> 3
+            if byte >= len(self.bits):
+                # Se duplica el tamaño para no ampliar el mapa en cada Id nuevo
+                self.bits.extend(bytes(max(byte + 1, 2 * len(self.bits)) - len(self.bits)))
+            self.bits[byte] |= 1 << (clave & 7)
+        else:
+            self.otras.add(clave)
+
+    def __contains__(self, valor):
+        clave = self.clave(valor)
+        if clave.__class__ is int and 0 <= clave < LIMITE_BITS:
+            byte = clave >> 3
+            return byte < len(self.bits) and bool(self.bits[byte] & (1 << (clave & 7)))
+        return clave in self.otras
+
+    # Función que quita el espacio sobrante del mapa antes de enviarlo a otros procesos
+    def compactar(self):
+        self.bits = self.bits.rstrip(b'\0')
+        return self
+
+# Función que obtiene las columnas de las filas del fichero transformado de una tabla: las de su mapeo o, si el mapeo
+# inserta todas las columnas, las de la tabla de destino en su orden. Sin conexión (pool None) se necesitan las del mapeo.
+# Devuelve la lista de columnas o el mensaje de error
+def columnas_fichero(pool, tabla, fichero):
+    if funcs.MAPEOS[fichero].columnas:
+        return funcs.MAPEOS[fichero].columnas
+    if pool is None:
+        return (f"Las claves externas de {tabla} no se pueden validar sin conectar con la base de datos: "
+                f"indica sus columnas en el mapeo de {fichero}")
+    try:
+        return funcs.leer_columnas_tabla(pool, tabla)[0]
+    except (Error, ValueError) as e:
+        return f"Error leyendo las columnas de {tabla} para validar sus claves externas: {e}"
+
+# Función que indica si hay que recorrer el fichero de una tabla: si tiene claves externas o si es padre de otra tabla
+def validable(tabla):
+    return tabla in CLAVES_EXTERNAS or tabla in TABLAS_PADRE
+
+# Función que recorre el fichero transformado de una tabla, con las columnas de columnas_fichero, y comprueba que sus claves
+# externas existen en los Id de sus tablas padre. padres tiene el ConjuntoClaves de cada tabla padre disponible; las claves hacia las demás no se comprueban.
+# Con cuarentena las filas huérfanas se sacan del fichero transformado a CuarentenaMigracion/<tabla>.tsv.
+# Se ejecuta en un proceso del pool: devuelve el fichero transformado, el ConjuntoClaves con los Id de la tabla que quedan
+# en el fichero (None si no es padre de ninguna tabla) y el resumen de las filas huérfanas por clave externa
+def validar_fichero(tabla, columnas, fichero_modificado, padres, cuarentena=False):
+    claves = [clave for clave in CLAVES_EXTERNAS.get(tabla, []) if clave.padre in padres]
+    conjunto = ConjuntoClaves() if tabla in TABLAS_PADRE else None
+    # La primera posición leída es siempre la del Id de la tabla, aunque no se guarde
+    posiciones = [columnas.index('Id') if conjunto is not None else 0] + [columnas.index(clave.columna) for clave in claves]
+    comprobaciones = [(indice, padres[clave.padre], {'padre': clave.padre, 'filas': 0, 'valores': []})
+                      for indice, clave in enumerate(claves, 1)]
+
+    huerfanas = array('q')
+    for fila, valores in enumerate(verificador.leer_claves_fichero(fichero_modificado, posiciones)):
+        huerfana = False
+        for indice, ids_padre, resumen in comprobaciones:
+            valor = valores[indice]
+            if valor is not None and valor not in ids_padre:
+                huerfana = True
+                resumen['filas'] += 1
+                if len(resumen['valores']) < MAXIMO_VALORES and str(valor) not in resumen['valores']:
+                    resumen['valores'].append(str(valor))
+        if huerfana:
+            huerfanas.append(fila)
+        # Las filas que se sacan del fichero no se cargan: sus Id no valen como padre de otras tablas
+        if conjunto is not None and not (huerfana and cuarentena) and valores[0] is not None:
+            conjunto.agregar(valores[0])
+
+    resultado = {
+        'claves_externas': {clave.columna: resumen for clave, (_, _, resumen) in zip(claves, comprobaciones)},
+        'filas_huerfanas': len(huerfanas),
+        'omitidas': [clave.columna for clave in CLAVES_EXTERNAS.get(tabla, []) if clave.padre not in padres]
+    }
+    if cuarentena and huerfanas:
+        resultado['cuarentena'] = sacar_huerfanas(tabla, fichero_modificado, huerfanas, columnas)
+    return fichero_modificado, None if conjunto is None else conjunto.compactar(), resultado
+
+# Función que cuenta las filas de un INSERT sin separar sus valores
+def numero_filas(sentencia):
+    return sum(1 for inicio, _ in verificador.PRIMER_VALOR.findall(sentencia) if inicio)
+
+# Función que reescribe el fichero transformado sin las filas huérfanas (números de fila en orden) y las guarda en el
+# fichero de cuarentena de la tabla. El fichero se sustituye por uno nuevo para no modificar el de la caché de transformaciones.
+# Los INSERT sin filas huérfanas se copian sin separar sus valores. Las filas huérfanas se descuentan del resumen del fichero
+# para la verificación, si lo tiene. Devuelve la ruta del fichero de cuarentena
+def sacar_huerfanas(tabla, fichero_modificado, huerfanas, columnas):
+    ruta_modificado = funcs.obtener_ruta('FicherosModificados_Datos', fichero_modificado)
+    compresion = funcs.compresion_fichero(ruta_modificado)
+    resumen = verificador.leer_resumen(ruta_modificado)
+    sacadas = []
+    ruta_cuarentena = funcs.obtener_ruta('CuarentenaMigracion', f"{tabla}.tsv")
+    pendientes = iter(huerfanas)
+    siguiente = next(pendientes, -1)
+    fila = 0
+
+    with funcs.abrir_fichero(ruta_modificado + '.tmp', 'wt', compresion, encoding='utf-8', newline='\n') as destino, \
+            open(ruta_cuarentena, 'w', encoding='utf-8', newline='\n') as cuarentena:
+        cuarentena.write('\t'.join(columnas) + '\n')
+        if funcs.formato_fichero(fichero_modificado) == 'tsv':
+            with funcs.abrir_fichero(ruta_modificado, 'rt', compresion, encoding='utf-8', newline='\n') as origen:
+                destino.write(origen.readline())
+                for linea in origen:
+                    if fila == siguiente:
+                        cuarentena.write(linea)
+                        if resumen is not None:
+                            sacadas.append(verificador.leer_claves_tsv(linea, resumen['posiciones']))
+                        siguiente = next(pendientes, -1)
+                    else:
+                        destino.write(linea)
+                    fila += 1
+        else:
+            for sentencia in funcs.leer_fichero_modificado(fichero_modificado):
+                if not sentencia.startswith("INSERT INTO"):
+                    destino.write(sentencia + '\n')
+                    continue
+                filas = numero_filas(sentencia)
+                if siguiente == -1 or siguiente >= fila + filas:
+                    destino.write(sentencia + '\n')
+                    fila += filas
+                    continue
+
+                insercion = funcs.leer_insercion(sentencia)
+                validas = []
+                for valores in insercion.filas:
+                    if fila == siguiente:
+                        cuarentena.write(funcs.formatear_fila_tsv(valores))
+                        if resumen is not None:
+                            sacadas.append([valores[posicion] for posicion in resumen['posiciones']])
+                        siguiente = next(pendientes, -1)
+                    else:
+                        validas.append(valores)
+                    fila += 1
+                if validas:
+                    destino.write(funcs.formatear_insercion(insercion._replace(filas=validas)) + '\n')
+
+    verificador.borrar_resumen(ruta_modificado)
+    os.replace(ruta_modificado + '.tmp', ruta_modificado)
+    if resumen is not None:
+        verificador.acumular_tramos(resumen['tramos'], sacadas, resumen['tamano_tramo'], -1)
+        verificador.guardar_resumen(ruta_modificado, resumen)
+    return ruta_cuarentena
+
+# Función que imprime las filas huérfanas de una tabla
+def imprimir_validacion(tabla, resultado):
+    for columna, resumen in resultado['claves_externas'].items():
+        if resumen['filas']:
+            print(f"Claves externas de {tabla}: {resumen['filas']} filas con {columna} que no existe en {resumen['padre']} "
+                  f"(por ejemplo: {', '.join(resumen['valores'][:5])})")
+    if resultado.get('cuarentena'):
+        print(f"Las {resultado['filas_huerfanas']} filas huérfanas de {tabla} no se cargan; están en {resultado['cuarentena']}")
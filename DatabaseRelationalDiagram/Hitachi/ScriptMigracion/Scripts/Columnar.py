@@ -0,0 +1,226 @@
+import re
+from collections import namedtuple, Counter
+import Migrations as funcs
+
+# NumPy es opcional: sin él las tablas se transforman fila a fila
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Códigos de los caracteres que delimitan los valores de un INSERT de mysqldump
+COMILLA = ord("'")
+COMA = ord(',')
+ABRE = ord('(')
+CIERRA = ord(')')
+LETRA_N = ord('N')
+BARRA = ord('\\')
+
+# Secuencias de escape que el camino por filas escribe igual que mysqldump. mysqldump escapa además las comillas dobles,
+# los tabuladores y los retrocesos, que al transformar por filas se escriben tal cual
+ESCAPES_NORMALIZADOS = "\\'0nrZ"
+SECUENCIA_ESCAPE = re.compile(r"\\(.)", re.S)
+CODIGOS_NORMALIZADOS = [ord(caracter) for caracter in ESCAPES_NORMALIZADOS]
+
+# Plan de una tabla para la transformación por columnas:
+#  - mapeo: mapeo de la tabla
+#  - cabecera: cabecera de los INSERT generados
+#  - textos: posiciones del volcado que se insertan como texto
+#  - reemplazos: posiciones del volcado que se traducen, con el nombre de su tabla de reemplazo y su columna si es obligatoria
+#  - desconocidos: contador de los valores sin reemplazo
+PlanColumnar = namedtuple('PlanColumnar', ['mapeo', 'cabecera', 'textos', 'reemplazos', 'desconocidos'])
+
+# Función que indica si NumPy está instalado
+def disponible():
+    return numpy is not None
+
+# Función que prepara el plan de una tabla. Devuelve None si el mapeo no se puede aplicar por columnas:
+# sin NumPy, si solo cambia la cabecera (ya es inmediato), si usa conversores numéricos o columnas de texto obligatorias
+def compilar_plan(mapeo, desconocidos):
+    if numpy is None or (mapeo.origen is None and not mapeo.conversores and mapeo.marca is None):
+        return None
+
+    conversores = mapeo.conversores or {}
+    if any(nombre in funcs.CONVERSORES and (nombre != 'texto' or funcs.columna_obligatoria(mapeo, indice) is not None)
+           for indice, nombre in conversores.items()):
+        return None
+
+    lista_columnas = f" ({', '.join(mapeo.columnas)})" if mapeo.columnas else ''
+    return PlanColumnar(mapeo, f"INSERT INTO `{mapeo.tabla}`{lista_columnas} VALUES ",
+                        {indice for indice, nombre in conversores.items() if nombre == 'texto'},
+                        {indice: (nombre, funcs.columna_obligatoria(mapeo, indice)) for indice, nombre in conversores.items()
+                         if nombre != 'texto'},
+                        desconocidos)
+
+# Función que devuelve la posición de la barra de cada secuencia de escape: las barras a las que precede un número par
+# de barras seguidas
+def secuencias_escape(codigos):
+    barras = numpy.flatnonzero(codigos == BARRA)
+    if not len(barras):
+        return barras
+    iniciales = numpy.diff(barras, prepend=-2) != 1
+    tramos = numpy.flatnonzero(iniciales)
+    return barras[(numpy.arange(len(barras)) - tramos[numpy.cumsum(iniciales) - 1]) % 2 == 0]
+
+# Función que escribe una secuencia de escape como la escribe el camino por filas
+def normalizar_escape(secuencia):
+    caracter = secuencia.group(1)
+    if caracter in ESCAPES_NORMALIZADOS:
+        return secuencia.group(0)
+    return funcs.ESCAPES_MYSQL.get(caracter, caracter).translate(funcs.ESCAPAR_MYSQL)
+
+# Función que localiza los valores de la lista VALUES de un INSERT sin separarlos.
+# Devuelve dos matrices (filas x columnas) con la posición de inicio y de fin de cada valor en la lista,
+# o None si la lista no tiene el formato de mysqldump (todas las filas con el mismo número de valores).
+# escapes son las posiciones de las barras de las secuencias de escape (ver secuencias_escape)
+def separar_valores(codigos, escapes):
+    # Las comillas y los separadores son los caracteres de la comilla a la coma (', (, ), *, + y ,): se localizan todos juntos.
+    # Las comillas sin escapar abren y cierran las cadenas: un separador está fuera de ellas si le precede un número par
+    posiciones = numpy.flatnonzero((codigos - COMILLA) <= COMA - COMILLA)
+    tipos = codigos[posiciones]
+    comillas = tipos == COMILLA
+    if len(escapes):
+        escapadas = escapes[codigos[escapes + 1] == COMILLA] + 1
+        comillas[numpy.searchsorted(posiciones, escapadas)] = False
+    separadores = ((numpy.cumsum(comillas) & 1) == 0) & ((tipos == COMA) | (tipos == ABRE) | (tipos == CIERRA))
+    tipos = tipos[separadores]
+    separadores = posiciones[separadores]
+
+    # Cada valor va de un '(' o ',' al siguiente ',' o ')'. En el formato de mysqldump todas las filas tienen los mismos
+    # separadores: '(', una ',' entre cada dos valores, ')' y la ',' que la separa de la siguiente. Con una ',' más al final
+    # forman una matriz con una fila por tupla
+    if not len(tipos):
+        return None
+    columnas = int(numpy.argmax(tipos == CIERRA))
+    ancho = columnas + 2
+    if columnas == 0 or tipos[0] != ABRE or (len(tipos) + 1) % ancho:
+        return None
+    filas = (len(tipos) + 1) // ancho
+    patron = numpy.full(ancho, COMA, dtype=tipos.dtype)
+    patron[0] = ABRE
+    patron[columnas] = CIERRA
+    if not numpy.array_equal(numpy.append(tipos, COMA).reshape(filas, ancho), numpy.broadcast_to(patron, (filas, ancho))):
+        return None
+
+    separadores = numpy.append(separadores, 0).reshape(filas, ancho)
+    return separadores[:, :columnas] + 1, separadores[:, 1:columnas + 1]
+
+# Función que convierte el texto de un valor del volcado en su valor tipado
+def leer_literal(texto):
+    if texto == 'NULL':
+        return None
+    if texto[:1] == "'":
+        return funcs.SECUENCIA_ESCAPE.sub(funcs.desescapar_caracter, texto[1:-1])
+    return funcs.leer_numero(texto)
+
+# Función que traduce una columna con su tabla de reemplazo. Cada valor distinto se traduce una sola vez, en el orden
+# en que aparece, para que un valor sin reemplazo en una columna obligatoria dé el mismo error que fila a fila
+def reemplazar_columna(textos, nombre, columna, desconocidos, separador=''):
+    reemplazos = funcs.leer_reemplazos(nombre)
+    literales = dict.fromkeys(textos)
+    for texto in literales:
+        # Los valores sin reemplazo se cuentan una vez por cada fila en la que aparecen
+        encontrados = Counter()
+        literales[texto] = separador + funcs.formatear_valor(funcs.reemplazar(reemplazos, leer_literal(texto), nombre, encontrados, columna))
+        for clave in encontrados:
+            desconocidos[clave] += textos.count(texto)
+
+    return [literales[texto] for texto in textos]
+
+# Función que transforma un INSERT trabajando por columnas: los valores que no cambian se copian tal cual del volcado,
+# los que se insertan como texto se entrecomillan y los que se traducen se resuelven una vez por valor distinto.
+# Devuelve el INSERT transformado y su número de filas ('' y 0 si no le quedan filas) o None si hay que transformarlo fila a fila
+def transformar_insercion(plan, linea, marca):
+    inicio = linea.find(' VALUES ')
+    if inicio == -1:
+        return None
+
+    # Los valores se copian con sus secuencias de escape, que solo se resuelven en las columnas que se traducen.
+    # Las que el camino por filas escribe de otra forma se normalizan antes, para que los dos caminos generen el mismo texto
+    lista = linea[inicio + 8:].rstrip().rstrip(';')
+    codigos = numpy.frombuffer(lista.encode('utf-32-le'), dtype=numpy.uint32)
+    escapes = secuencias_escape(codigos)
+    if len(escapes):
+        # Una barra al final no escapa nada: la lista no tiene el formato de mysqldump
+        if escapes[-1] == len(codigos) - 1:
+            return None
+        if not numpy.all(numpy.isin(codigos[escapes + 1], CODIGOS_NORMALIZADOS)):
+            lista = SECUENCIA_ESCAPE.sub(normalizar_escape, lista)
+            codigos = numpy.frombuffer(lista.encode('utf-32-le'), dtype=numpy.uint32)
+            escapes = secuencias_escape(codigos)
+    posiciones = separar_valores(codigos, escapes)
+    if posiciones is None:
+        return None
+    inicios, finales = posiciones
+
+    mapeo = plan.mapeo
+    origen = mapeo.origen if mapeo.origen is not None else list(range(inicios.shape[1]))
+    if max(origen + list(plan.reemplazos) + [mapeo.marca or 0]) >= inicios.shape[1]:
+        return None
+
+    # Descartar las filas anteriores a la marca incremental
+    if mapeo.marca is not None:
+        try:
+            identificadores = numpy.array([lista[a:b] for a, b in zip(inicios[:, mapeo.marca].tolist(), finales[:, mapeo.marca].tolist())]).astype(numpy.int64)
+        except ValueError:
+            return None
+        if len(identificadores):
+            mayor = int(identificadores.max())
+            if marca['hasta'] is None or mayor > marca['hasta']:
+                marca['hasta'] = mayor
+        if marca['desde'] is not None:
+            nuevas = identificadores > marca['desde']
+            inicios = inicios[nuevas]
+            finales = finales[nuevas]
+            if not len(inicios):
+                return '', 0
+
+    # Agrupar las columnas de destino en tramos: los tramos de columnas consecutivas del volcado que no cambian
+    # se copian con un solo corte por fila
+    tramos = []
+    for indice in origen:
+        if indice in plan.reemplazos:
+            tramos.append(('reemplazo', indice))
+            continue
+
+        if indice in plan.textos:
+            primeros = codigos[inicios[:, indice]]
+            if numpy.any((primeros != COMILLA) & (primeros != LETRA_N)):
+                tramos.append(('texto', indice))
+                continue
+
+        if tramos and tramos[-1][0] == 'copia' and tramos[-1][2] == indice - 1:
+            tramos[-1] = ('copia', tramos[-1][1], indice)
+        else:
+            tramos.append(('copia', indice, indice))
+
+    # Cada tramo se genera con el separador que lo precede en la fila, '(' o ','. Los tramos copiados lo toman del volcado
+    # si allí les precede el mismo
+    columnas = []
+    for posicion, tramo in enumerate(tramos):
+        separador = ',' if posicion else '('
+        if tramo[0] == 'copia':
+            desde = inicios[:, tramo[1]].tolist()
+            hasta = finales[:, tramo[2]].tolist()
+            if (tramo[1] > 0) == (posicion > 0):
+                columnas.append([lista[a - 1:b] for a, b in zip(desde, hasta)])
+            else:
+                columnas.append([separador + lista[a:b] for a, b in zip(desde, hasta)])
+            continue
+
+        indice = tramo[1]
+        textos = [lista[a:b] for a, b in zip(inicios[:, indice].tolist(), finales[:, indice].tolist())]
+        if tramo[0] == 'reemplazo':
+            columnas.append(reemplazar_columna(textos, *plan.reemplazos[indice], plan.desconocidos, separador))
+        else:
+            # Los números se entrecomillan; las cadenas y los NULL se mantienen
+            columnas.append([separador + texto if texto[:1] in "'N" else separador + "'" + texto + "'" for texto in textos])
+
+    # Las filas se unen de una vez: los tramos de cada fila se intercalan en una sola lista, cada fila cerrada con '),'
+    filas = len(inicios)
+    partes = [None] * (filas * (len(columnas) + 1))
+    for posicion, columna in enumerate(columnas):
+        partes[posicion::len(columnas) + 1] = columna
+    partes[len(columnas)::len(columnas) + 1] = ['),'] * filas
+    partes[-1] = ')'
+    return plan.cabecera + ''.join(partes) + ';', filas
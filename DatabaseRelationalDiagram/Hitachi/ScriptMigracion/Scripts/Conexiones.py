@@ -0,0 +1,137 @@
+import queue
+import threading
+from contextlib import contextmanager
+import mysql.connector
+from mysql.connector import Error
+
+# Variables de sesión que se fijan una sola vez en cada conexión del pool.
+# Las tablas se cargan en orden de claves externas, por lo que no hace falta comprobarlas fila a fila
+SESION_CARGA = {
+    'foreign_key_checks': 0,
+    'unique_checks': 0,
+    'autocommit': 0
+}
+
+# Variable que deja las cargas fuera del binlog. Requiere SUPER o SYSTEM_VARIABLES_ADMIN y las filas cargadas no llegan
+# a las réplicas, así que solo se fija si se pide (--sin-binlog)
+SESION_SIN_BINLOG = {'sql_log_bin': 0}
+
+# Variables que se intentan fijar pero que, si el servidor no lo permite por cualquier motivo, se dejan como están
+VARIABLES_OPCIONALES = ('sql_log_bin',)
+
+# Error de MySQL cuando el usuario no tiene permiso para cambiar una variable (ER_SPECIFIC_ACCESS_DENIED_ERROR)
+ERROR_PERMISO_VARIABLE = 1227
+
+# Función que devuelve las variables de la sesión de carga, con sql_log_bin solo si se pide.
+# sql_log_bin va antes que autocommit: no se puede cambiar dentro de una transacción
+def sesion_carga(sin_binlog=False):
+    return {**SESION_SIN_BINLOG, **SESION_CARGA} if sin_binlog else SESION_CARGA
+
+# Función que indica si el error al fijar una variable de sesión se puede ignorar manteniendo el valor del servidor
+def variable_ignorable(variable, codigo):
+    return variable in VARIABLES_OPCIONALES or codigo == ERROR_PERMISO_VARIABLE
+
+# Pool de conexiones reutilizadas durante toda la migración.
+# Las conexiones se abren bajo demanda hasta el tamaño indicado y se reparten entre los hilos de carga
+class PoolConexiones:
+    def __init__(self, mysql_config, tamano=4, sesion=SESION_CARGA):
+        self.mysql_config = mysql_config
+        self.sesion = sesion
+        self.libres = queue.LifoQueue()
+        self.todas = []
+        self.abiertas = 0
+        self.tamano = tamano
+        self.bloqueo = threading.Lock()
+        # Conexiones cuya sesión han cambiado las sentencias ejecutadas en ellas (ver sesion_modificada)
+        self.modificadas = set()
+
+    # Función que abre una conexión nueva y le aplica las variables de sesión
+    def abrir(self):
+        conexion = mysql.connector.connect(**self.mysql_config)
+        self.configurar_sesion(conexion)
+        return conexion
+
+    # Función que fija las variables de sesión. Las que el usuario no puede cambiar (sql_log_bin) se dejan como están
+    def configurar_sesion(self, conexion):
+        cursor = conexion.cursor()
+        for variable, valor in self.sesion.items():
+            try:
+                cursor.execute(f"SET SESSION {variable} = {valor}")
+            except Error as e:
+                if not variable_ignorable(variable, e.errno):
+                    raise
+                print(f"No se puede cambiar {variable} ({e.msg}), se mantiene el valor del servidor")
+        cursor.close()
+
+    # Función que anota que las sentencias ejecutadas en una conexión han cambiado su sesión (por ejemplo, el SET FOREIGN_KEY_CHECKS=1
+    # de limpiar_BBDD.sql): sus variables se vuelven a fijar al devolverla al pool
+    def sesion_modificada(self, conexion):
+        self.modificadas.add(id(conexion))
+
+    # Función que vuelve a fijar las variables de sesión de una conexión modificada. Si no se puede, se cierra la conexión:
+    # obtener la vuelve a abrir y a configurar antes de entregarla
+    def restaurar_sesion(self, conexion):
+        self.modificadas.discard(id(conexion))
+        try:
+            self.configurar_sesion(conexion)
+        except Error:
+            conexion.close()
+
+    # Función que entrega una conexión del pool y la devuelve al terminar, con su sesión restaurada si se ha modificado.
+    # Si la conexión se ha perdido se vuelve a abrir y se configura de nuevo su sesión
+    @contextmanager
+    def conexion(self):
+        conexion = self.obtener()
+        try:
+            yield conexion
+        except BaseException:
+            # Deshacer lo que haya quedado pendiente antes de que otro hilo reutilice la conexión
+            try:
+                conexion.rollback()
+            except Error:
+                pass
+            raise
+        finally:
+            if id(conexion) in self.modificadas:
+                self.restaurar_sesion(conexion)
+            self.libres.put(conexion)
+
+    # Función que saca una conexión libre o abre una nueva si aún no se ha alcanzado el tamaño del pool
+    def obtener(self):
+        with self.bloqueo:
+            nueva = self.libres.empty() and self.abiertas < self.tamano
+            if nueva:
+                self.abiertas += 1
+
+        if nueva:
+            try:
+                conexion = self.abrir()
+            except BaseException:
+                with self.bloqueo:
+                    self.abiertas -= 1
+                raise
+            with self.bloqueo:
+                self.todas.append(conexion)
+            return conexion
+
+        conexion = self.libres.get()
+        if not conexion.is_connected():
+            try:
+                conexion.reconnect(attempts=3, delay=1)
+                self.configurar_sesion(conexion)
+                self.modificadas.discard(id(conexion))
+            except BaseException:
+                # La conexión vuelve al pool para que el siguiente hilo intente reconectarla
+                self.libres.put(conexion)
+                raise
+        return conexion
+
+    # Función que cierra todas las conexiones al terminar la migración
+    def cerrar(self):
+        with self.bloqueo:
+            for conexion in self.todas:
+                if conexion.is_connected():
+                    conexion.close()
+            self.todas = []
+            self.modificadas = set()
+            self.abiertas = 0
@@ -0,0 +1,201 @@
+import time
+from datetime import datetime
+from mysql.connector import Error
+import Migrations as funcs
+import Verificacion as verificador
+
+# Indicadores de las órdenes y de sus incidencias agregados por día de apertura, activo, estado, tipo y confirmación de la orden,
+# con la planta del activo. Las páginas de indicadores pueden sumar estas filas en lugar de recorrer todo el historial de
+# ordenes e incidenciasordenes. Se calculan con los ficheros transformados de esas tablas y se cargan completos tras ellos.
+# Las tablas las crea la migración AddedIndicadoresDiarios de GSMAO.Server: el script solo actualiza sus filas
+
+# Tablas de destino de los indicadores
+TABLA_ORDENES = 'indicadores_ordenes_diarias'
+TABLA_INCIDENCIAS = 'indicadores_incidencias_diarias'
+TABLAS_INDICADORES = [TABLA_ORDENES, TABLA_INCIDENCIAS]
+
+# Tablas cuyos ficheros transformados hacen falta para calcular los indicadores y tablas con las que se obtiene la planta
+# de cada activo (si no se migran, la planta queda a NULL)
+TABLAS_ORIGEN = ['ordenes', 'incidenciasordenes']
+TABLAS_PLANTAS = ['activos', 'localizaciones']
+
+# Columnas que agrupan las filas de las dos tablas. Los Id que la orden no tiene se guardan como 0, igual que en OrdenesDAO
+COLUMNAS_GRUPO = ['Fecha', 'IdActivo', 'IdEstadoOrden', 'IdTipoOrden', 'Confirmada']
+
+# Columnas de cada tabla de indicadores:
+#  - Ordenes: órdenes del grupo (en incidencias, las que tienen alguna incidencia)
+#  - TiempoParada: suma del tiempo de parada de las órdenes, en horas (NULL si ninguna lo tiene)
+#  - IncidenciasResueltas, MinutosParada: incidencias con fecha de resolución y suma de sus minutos de parada (TIMESTAMPDIFF)
+#  - HorasReparacion: suma de las horas redondeadas de cada incidencia resuelta, el tiempo de reparación de KPIsController
+COLUMNAS_INDICADORES = {
+    TABLA_ORDENES: COLUMNAS_GRUPO + ['IdPlanta', 'Ordenes', 'TiempoParada'],
+    TABLA_INCIDENCIAS: COLUMNAS_GRUPO + ['IdPlanta', 'Ordenes', 'Incidencias', 'IncidenciasResueltas', 'ParosMaquina',
+                                         'MinutosParada', 'HorasReparacion']
+}
+
+# Filas de cada INSERT de los ficheros de indicadores
+FILAS_POR_INSERT = 1000
+
+# Función que lee de un fichero transformado las columnas indicadas de cada fila. ficheros tiene, por tabla,
+# su fichero del volcado y su fichero transformado
+def leer_columnas(ficheros, tabla, nombres):
+    fichero, fichero_modificado = ficheros[tabla]
+    columnas = funcs.MAPEOS[fichero].columnas
+    return verificador.leer_claves_fichero(fichero_modificado, [columnas.index(nombre) for nombre in nombres])
+
+# Función que convierte un Id leído del fichero (entero o texto) en entero, con 0 si es NULL
+def leer_id(valor):
+    return 0 if valor is None else int(valor)
+
+# Función que indica si un valor booleano leído del fichero es verdadero
+def leer_booleano(valor):
+    return valor is not None and str(valor) not in ('0', '')
+
+# Función que convierte una fecha leída del fichero. Las fechas vacías o no válidas ('0000-00-00') se toman como NULL
+def leer_fecha(valor):
+    if valor is None:
+        return None
+    try:
+        return datetime.fromisoformat(str(valor))
+    except ValueError:
+        return None
+
+# Función que convierte el tiempo de parada de una orden, que se migra como texto. Los valores no numéricos se toman como NULL
+def leer_tiempo(valor):
+    if valor is None or str(valor).strip() == '':
+        return None
+    try:
+        return funcs.leer_numero(str(valor).strip())
+    except ValueError:
+        return None
+
+# Función que obtiene la planta de cada activo con los ficheros de activos y localizaciones (None si no se migran)
+def leer_plantas(ficheros):
+    if not all(tabla in ficheros for tabla in TABLAS_PLANTAS):
+        return None
+    plantas = {leer_id(localizacion): None if planta is None else int(planta)
+               for localizacion, planta in leer_columnas(ficheros, 'localizaciones', ['Id', 'IdPlanta'])}
+    return {leer_id(activo): plantas.get(leer_id(localizacion))
+            for activo, localizacion in leer_columnas(ficheros, 'activos', ['Id', 'IdLocalizacion'])}
+
+# Función que genera los INSERT de una tabla de indicadores con sus filas ordenadas por grupo
+def generar_inserciones(tabla, filas, plantas):
+    lote = []
+    for grupo in sorted(filas):
+        planta = plantas.get(grupo[1]) if plantas is not None else None
+        lote.append([*grupo, planta, *filas[grupo]])
+        if len(lote) >= FILAS_POR_INSERT:
+            yield funcs.Insercion(tabla, COLUMNAS_INDICADORES[tabla], lote)
+            lote = []
+    if lote:
+        yield funcs.Insercion(tabla, COLUMNAS_INDICADORES[tabla], lote)
+
+# Función que obtiene el nombre del fichero de una tabla de indicadores a partir del fichero transformado de ordenes
+def nombre_fichero_indicadores(tabla, fichero_ordenes):
+    return f"{tabla}_modificado." + fichero_ordenes.split('_modificado.', 1)[1]
+
+# Función que calcula los indicadores recorriendo una vez los ficheros transformados de ordenes e incidenciasordenes
+# (y los de activos y localizaciones para la planta) y los guarda junto al de ordenes, en su mismo formato y compresión.
+# ficheros tiene, por tabla, su fichero del volcado y su fichero transformado.
+# Las órdenes sin fecha de apertura y las incidencias de órdenes que no están en el fichero no se agregan.
+# Se ejecuta en un proceso del pool: devuelve el fichero de cada tabla de indicadores y las medidas del cálculo
+def calcular_indicadores(ficheros):
+    inicio = time.perf_counter()
+    plantas = leer_plantas(ficheros)
+
+    # Grupo de cada orden; los grupos iguales se comparten entre órdenes para no repetirlos en memoria
+    grupos = {}
+    ordenes = {}
+    filas_ordenes = {}
+    sin_fecha = 0
+    for id_orden, apertura, tiempo, confirmada, activo, estado, tipo in leer_columnas(
+            ficheros, 'ordenes', ['Id', 'FechaApertura', 'TiempoParada', 'Confirmada', 'IdActivo', 'IdEstadoOrden', 'IdTipoOrden']):
+        fecha = leer_fecha(apertura)
+        if fecha is None:
+            sin_fecha += 1
+            continue
+        grupo = (fecha.date().isoformat(), leer_id(activo), leer_id(estado), leer_id(tipo), int(leer_booleano(confirmada)))
+        grupo = grupos.setdefault(grupo, grupo)
+        ordenes[leer_id(id_orden)] = grupo
+
+        fila = filas_ordenes.get(grupo)
+        if fila is None:
+            fila = filas_ordenes[grupo] = [0, None]
+        fila[0] += 1
+        tiempo = leer_tiempo(tiempo)
+        if tiempo is not None:
+            fila[1] = tiempo if fila[1] is None else fila[1] + tiempo
+
+    filas_incidencias = {}
+    con_incidencias = set()
+    incidencias = 0
+    sin_orden = 0
+    for deteccion, id_orden, resolucion, paro in leer_columnas(
+            ficheros, 'incidenciasordenes', ['FechaDeteccion', 'IdOrden', 'FechaResolucion', 'ParoMaquina']):
+        incidencias += 1
+        id_orden = leer_id(id_orden)
+        grupo = ordenes.get(id_orden)
+        if grupo is None:
+            sin_orden += 1
+            continue
+
+        fila = filas_incidencias.get(grupo)
+        if fila is None:
+            fila = filas_incidencias[grupo] = [0, 0, 0, 0, 0, 0]
+        if id_orden not in con_incidencias:
+            con_incidencias.add(id_orden)
+            fila[0] += 1
+        fila[1] += 1
+        fila[3] += leer_booleano(paro)
+        deteccion = leer_fecha(deteccion)
+        resolucion = leer_fecha(resolucion)
+        if deteccion is not None and resolucion is not None:
+            segundos = (resolucion - deteccion).total_seconds()
+            fila[2] += 1
+            # TIMESTAMPDIFF trunca los minutos y KPIsController redondea las horas de cada incidencia (Math.Round, al par)
+            fila[4] += int(segundos / 60)
+            fila[5] += round(segundos / 3600)
+
+    fichero_ordenes = ficheros['ordenes'][1]
+    ruta_ordenes = funcs.obtener_ruta('FicherosModificados_Datos', fichero_ordenes)
+    ficheros_indicadores = {}
+    for tabla, filas in ((TABLA_ORDENES, filas_ordenes), (TABLA_INCIDENCIAS, filas_incidencias)):
+        ficheros_indicadores[tabla] = nombre_fichero_indicadores(tabla, fichero_ordenes)
+        funcs.escribir_fichero_modificado(generar_inserciones(tabla, filas, plantas),
+                                          funcs.obtener_ruta('FicherosModificados_Datos', ficheros_indicadores[tabla]),
+                                          funcs.formato_fichero(fichero_ordenes), compresion=funcs.compresion_fichero(ruta_ordenes))
+
+    medidas = {
+        'ordenes': len(ordenes) + sin_fecha,
+        'incidencias': incidencias,
+        'ordenes_sin_fecha': sin_fecha,
+        'incidencias_sin_orden': sin_orden,
+        'plantas': plantas is not None,
+        'filas': {TABLA_ORDENES: len(filas_ordenes), TABLA_INCIDENCIAS: len(filas_incidencias)}
+    }
+    medidas['segundos'] = round(time.perf_counter() - inicio, 3)
+    return ficheros_indicadores, medidas
+
+# Función que imprime las filas que no se han podido agregar en los indicadores
+def imprimir_indicadores(medidas):
+    if medidas['ordenes_sin_fecha']:
+        print(f"Indicadores: {medidas['ordenes_sin_fecha']} órdenes sin fecha de apertura no se agregan")
+    if medidas['incidencias_sin_orden']:
+        print(f"Indicadores: {medidas['incidencias_sin_orden']} incidencias de órdenes que no están en el fichero de ordenes no se agregan")
+    if not medidas['plantas']:
+        print(f"Indicadores: no se migran {' ni '.join(TABLAS_PLANTAS)}, la planta de los activos queda a NULL")
+
+# Función que vacía una tabla de indicadores: siempre se carga completa.
+# Si la tabla no existe se indica qué migración de la base de datos falta aplicar
+def preparar_tabla(pool, tabla):
+    try:
+        with pool.conexion() as conexion:
+            cursor = conexion.cursor()
+            cursor.execute(f"TRUNCATE TABLE `{tabla}`")
+            cursor.close()
+        return True
+    except Error as e:
+        if e.errno == funcs.ERROR_TABLA_INEXISTENTE:
+            return(f"No existe la tabla {tabla}: aplica la migración AddedIndicadoresDiarios de GSMAO.Server "
+                   "(dotnet ef database update) antes de calcular los indicadores")
+        return(f"Error preparando la tabla {tabla}: {e}")
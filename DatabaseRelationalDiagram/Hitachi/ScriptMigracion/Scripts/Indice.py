@@ -0,0 +1,219 @@
+import os
+import re
+import sys
+import json
+import mmap
+import traceback
+from array import array
+from collections import namedtuple
+from contextlib import contextmanager
+import Migrations as funcs
+
+# Índice de las posiciones de un volcado para leerlo por partes sin recorrerlo entero.
+# Se guarda junto al volcado (<volcado>.indice) y se vuelve a generar si cambian el tamaño o la fecha del volcado
+
+# Extensión del fichero con el índice de un volcado
+EXTENSION_INDICE = '.indice'
+
+# Versión del formato del índice. Los índices de otra versión se vuelven a generar
+VERSION_INDICE = 1
+
+# Posiciones de un volcado:
+#  - sentencias: inicio y fin (sin el salto de línea) de cada INSERT, seguidos en un solo array
+#  - primeras: posición en tuplas de la primera tupla de cada INSERT, con una posición más al final
+#  - tuplas: inicio (el paréntesis de apertura) de cada tupla de los INSERT
+IndiceVolcado = namedtuple('IndiceVolcado', ['sentencias', 'primeras', 'tuplas'])
+
+# Expresión que recorre la lista VALUES de un INSERT: salta las cadenas completas y encuentra los separadores entre tuplas
+SEPARADOR_TUPLAS = re.compile(rb"'(?:[^'\\]|\\.)*'|\),\(", re.S)
+
+# Marca del comienzo de cada INSERT en el volcado
+INICIO_INSERT = b'INSERT INTO '
+
+# Código del punto y coma que termina cada INSERT
+PUNTO_Y_COMA = ord(';')
+
+# Función que abre un volcado proyectado en memoria. Los volcados vacíos no se pueden proyectar y se devuelven como bytes vacíos
+@contextmanager
+def proyectar_volcado(ruta_volcado):
+    with open(ruta_volcado, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as volcado:
+            yield volcado
+
+# Función que recorre el volcado proyectado y calcula las posiciones de sus INSERT y de sus tuplas
+def construir_indice(volcado):
+    sentencias = array('q')
+    primeras = array('q')
+    tuplas = array('q')
+
+    posicion = 0 if volcado[:len(INICIO_INSERT)] == INICIO_INSERT else volcado.find(b'\n' + INICIO_INSERT)
+    while posicion != -1:
+        if volcado[posicion:posicion + 1] == b'\n':
+            posicion += 1
+        fin = volcado.find(b'\n', posicion)
+        fin = len(volcado) if fin == -1 else fin
+        if volcado[fin - 1:fin] == b'\r':
+            fin -= 1
+
+        primeras.append(len(tuplas))
+        valores = volcado.find(b' VALUES (', posicion, fin)
+        if valores != -1:
+            tuplas.append(valores + 8)
+            for separador in SEPARADOR_TUPLAS.finditer(volcado, valores + 8, fin):
+                if separador.group(0) == b'),(':
+                    tuplas.append(separador.start() + 2)
+        sentencias.extend((posicion, fin))
+
+        posicion = volcado.find(b'\n' + INICIO_INSERT, fin)
+
+    primeras.append(len(tuplas))
+    return IndiceVolcado(sentencias, primeras, tuplas)
+
+# Función que guarda el índice junto al volcado: una línea JSON con los datos del volcado y después los arrays en binario
+def guardar_indice(ruta_volcado, indice, estado):
+    cabecera = {
+        'version': VERSION_INDICE,
+        'tamano': estado.st_size,
+        'fecha': estado.st_mtime_ns,
+        'orden_bytes': sys.byteorder,
+        'sentencias': len(indice.sentencias),
+        'primeras': len(indice.primeras),
+        'tuplas': len(indice.tuplas)
+    }
+    ruta_indice = ruta_volcado + EXTENSION_INDICE
+    with open(ruta_indice + '.tmp', 'wb') as file:
+        file.write(json.dumps(cabecera).encode('utf-8') + b'\n')
+        for datos in indice:
+            datos.tofile(file)
+    os.replace(ruta_indice + '.tmp', ruta_indice)
+
+# Función que lee el índice guardado de un volcado. Devuelve None si no existe o no corresponde al volcado actual
+def leer_indice(ruta_volcado, estado):
+    ruta_indice = ruta_volcado + EXTENSION_INDICE
+    if not os.path.exists(ruta_indice):
+        return None
+
+    with open(ruta_indice, 'rb') as file:
+        try:
+            cabecera = json.loads(file.readline())
+        except ValueError:
+            return None
+        if (cabecera.get('version') != VERSION_INDICE or cabecera.get('tamano') != estado.st_size
+                or cabecera.get('fecha') != estado.st_mtime_ns or cabecera.get('orden_bytes') != sys.byteorder):
+            return None
+
+        datos = []
+        for nombre in IndiceVolcado._fields:
+            valores = array('q')
+            try:
+                valores.fromfile(file, cabecera[nombre])
+            except EOFError:
+                # Índice a medias: se vuelve a generar
+                return None
+            datos.append(valores)
+    return IndiceVolcado(*datos)
+
+# Función que devuelve el índice de un volcado, generándolo si no existe o si el volcado ha cambiado
+def obtener_indice(ruta_volcado):
+    estado = os.stat(ruta_volcado)
+    indice = leer_indice(ruta_volcado, estado)
+    if indice is None:
+        with proyectar_volcado(ruta_volcado) as volcado:
+            indice = construir_indice(volcado)
+        guardar_indice(ruta_volcado, indice, estado)
+    return indice
+
+# Función que devuelve el número de INSERT del índice
+def numero_sentencias(indice):
+    return len(indice.sentencias) // 2
+
+# Función que reparte las tuplas del volcado en rangos consecutivos de un tamaño parecido en bytes.
+# Cada rango es (primera tupla, tupla siguiente a la última) sobre el array de tuplas del índice.
+# Los rangos empiezan al principio de un INSERT, para que las partes unidas tengan los mismos INSERT que el fichero
+# transformado entero. Solo se corta un INSERT por la mitad si es más grande que una parte
+def dividir_tuplas(indice, partes):
+    total = len(indice.tuplas)
+    if total == 0:
+        return []
+    partes = max(1, min(partes, total))
+
+    inicio_datos = indice.tuplas[0]
+    fin_datos = indice.sentencias[-1]
+    objetivo = (fin_datos - inicio_datos) / partes
+
+    rangos = []
+    desde = 0
+    for parte in range(1, partes):
+        # Primera tupla que empieza después del límite en bytes de esta parte
+        limite = inicio_datos + objetivo * parte
+        hasta = buscar_posicion(indice.tuplas, limite, desde + 1)
+        if hasta >= total:
+            break
+        primera = indice.primeras[buscar_posicion(indice.primeras, hasta + 1) - 1]
+        if primera > desde:
+            hasta = primera
+        rangos.append((desde, hasta))
+        desde = hasta
+    rangos.append((desde, total))
+    return rangos
+
+# Función que busca en un array ordenado la primera posición cuyo valor es mayor o igual que el indicado
+def buscar_posicion(valores, valor, desde=0):
+    hasta = len(valores)
+    while desde < hasta:
+        medio = (desde + hasta) // 2
+        if valores[medio] < valor:
+            desde = medio + 1
+        else:
+            hasta = medio
+    return desde
+
+# Función que lee como INSERT las tuplas de un rango del volcado. Las tuplas de un mismo INSERT del volcado
+# se mantienen juntas con su cabecera; el texto se toma directamente del volcado proyectado, sin separar los valores.
+# Un INSERT que se lee entero se decodifica de una vez; si se lee solo una parte, su cabecera y sus tuplas se unen
+# como bytes y se decodifican juntas, sin crear cadenas intermedias
+def leer_tuplas(volcado, indice, desde, hasta):
+    vista = memoryview(volcado)
+    sentencia = buscar_posicion(indice.primeras, desde + 1) - 1
+    try:
+        while desde < hasta:
+            inicio, fin = indice.sentencias[2 * sentencia], indice.sentencias[2 * sentencia + 1]
+            primera, siguiente = indice.primeras[sentencia], indice.primeras[sentencia + 1]
+            ultima = min(hasta, siguiente)
+            if desde < ultima:
+                # La última tupla de un INSERT termina en el punto y coma; las demás, en la coma que las separa de la siguiente
+                final = indice.tuplas[ultima] - 1 if ultima < siguiente else fin - 1
+                if desde == primera and final == fin - 1 and vista[final] == PUNTO_Y_COMA:
+                    yield str(vista[inicio:fin], 'utf-8')
+                else:
+                    yield b''.join((vista[inicio:indice.tuplas[primera]], vista[indice.tuplas[desde]:final], b';')).decode('utf-8')
+                desde = ultima
+            sentencia += 1
+    finally:
+        vista.release()
+
+# Función que lee los INSERT de un rango de sentencias del índice
+def leer_sentencias(volcado, indice, desde=0, hasta=None):
+    hasta = numero_sentencias(indice) if hasta is None else hasta
+    vista = memoryview(volcado)
+    try:
+        for sentencia in range(desde, hasta):
+            yield str(vista[indice.sentencias[2 * sentencia]:indice.sentencias[2 * sentencia + 1]], 'utf-8')
+    finally:
+        vista.release()
+
+if __name__ == "__main__":
+    # Generar o comprobar los índices de todos los volcados de DumpFolder
+    try:
+        for fichero in funcs.MAPEOS:
+            ruta_volcado = funcs.obtener_ruta('DumpFolder', fichero)
+            if not os.path.exists(ruta_volcado):
+                continue
+            indice = obtener_indice(ruta_volcado)
+            print(f"{fichero}: {numero_sentencias(indice)} INSERT y {len(indice.tuplas)} tuplas")
+    except Exception as ex:
+        print(f"Excepcion: {traceback.print_exc()}")
+        sys.exit(1)  # Detener la ejecución con un código de error
@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import threading
+from collections import namedtuple
+from mysql.connector import Error
+import Migrations as funcs
+
+# Índices secundarios que se quitan antes de la carga completa de una tabla y se vuelven a crear al terminarla:
+# crear un índice sobre las filas ya cargadas es mucho más rápido que mantenerlo fila a fila en cada INSERT.
+# Las claves externas y la unicidad ya no se comprueban en la sesión de carga (Conexiones.SESION_CARGA)
+
+# Índice secundario de una tabla: columnas es una lista de (columna, longitud del prefijo, descendente)
+# y tipo el de information_schema (BTREE, FULLTEXT, SPATIAL)
+IndiceSecundario = namedtuple('IndiceSecundario', ['nombre', 'columnas', 'tipo'])
+
+# Fichero con los índices quitados que aún no se han vuelto a crear, por si la migración se interrumpe
+FICHERO_INDICES = 'indices_diferidos.json'
+bloqueo_indices = threading.Lock()
+
+# Función que lee los índices de una tabla que se pueden quitar durante la carga. Se mantienen la clave primaria,
+# los índices únicos (se volverían a crear comprobando duplicados), los de expresiones y los que usa una clave externa
+def leer_indices_secundarios(pool, tabla):
+    with pool.conexion() as conexion:
+        cursor = conexion.cursor()
+        cursor.execute(
+            "SELECT INDEX_NAME, COLUMN_NAME, SUB_PART, COLLATION, INDEX_TYPE, NON_UNIQUE FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY INDEX_NAME, SEQ_IN_INDEX", (tabla,))
+        filas = cursor.fetchall()
+        cursor.execute(
+            "SELECT CONSTRAINT_NAME, COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND REFERENCED_TABLE_NAME IS NOT NULL "
+            "ORDER BY CONSTRAINT_NAME, ORDINAL_POSITION", (tabla,))
+        columnas_externas = cursor.fetchall()
+        cursor.close()
+
+    claves_externas = {}
+    for restriccion, columna in columnas_externas:
+        claves_externas.setdefault(restriccion, []).append(columna)
+
+    indices = {}
+    mantener = set()
+    for nombre, columna, prefijo, orden, tipo, no_unico in filas:
+        if nombre == 'PRIMARY' or not int(no_unico) or columna is None:
+            mantener.add(nombre)
+        indice = indices.setdefault(nombre, IndiceSecundario(nombre, [], tipo))
+        indice.columnas.append((columna, None if prefijo is None else int(prefijo), orden == 'D'))
+
+    secundarios = []
+    for nombre, indice in indices.items():
+        columnas = [columna for columna, _, _ in indice.columnas]
+        if nombre in mantener or any(columnas[:len(externas)] == externas for externas in claves_externas.values()):
+            continue
+        secundarios.append(indice)
+    return secundarios
+
+# Función que escribe la cláusula de ALTER TABLE que crea un índice
+def definicion_indice(indice):
+    columnas = ', '.join(f"`{columna}`" + (f"({prefijo})" if prefijo else '') + (' DESC' if descendente else '')
+                         for columna, prefijo, descendente in indice.columnas)
+    tipo = f"{indice.tipo} " if indice.tipo in ('FULLTEXT', 'SPATIAL') else ''
+    return f"ADD {tipo}INDEX `{indice.nombre}` ({columnas})"
+
+# Función que quita los índices secundarios de una tabla antes de cargarla y devuelve los que se han quitado.
+# Se guardan antes en FICHERO_INDICES para poder crearlos de nuevo aunque la migración se interrumpa
+def quitar_indices(pool, tabla):
+    indices = leer_indices_secundarios(pool, tabla)
+    if not indices:
+        return []
+
+    with bloqueo_indices:
+        diferidos = leer_diferidos()
+        diferidos[tabla] = indices
+        guardar_diferidos(diferidos)
+
+    with pool.conexion() as conexion:
+        cursor = conexion.cursor()
+        cursor.execute(f"ALTER TABLE `{tabla}` " + ', '.join(f"DROP INDEX `{indice.nombre}`" for indice in indices))
+        cursor.close()
+    return indices
+
+# Función que vuelve a crear los índices quitados de una tabla con un solo ALTER TABLE, que los construye todos
+# en una pasada sobre las filas ya cargadas. Los que ya existen (si el ALTER TABLE anterior no llegó a ejecutarse) se saltan.
+# En medidas se guardan los índices creados y sus segundos. Devuelve True o el mensaje de error
+def crear_indices(pool, tabla, indices, medidas=None):
+    medidas = {} if medidas is None else medidas
+    inicio = time.perf_counter()
+    try:
+        with pool.conexion() as conexion:
+            cursor = conexion.cursor()
+            cursor.execute("SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS "
+                           "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", (tabla,))
+            existentes = {nombre for nombre, in cursor.fetchall()}
+            faltan = [indice for indice in indices if indice.nombre not in existentes]
+            if faltan:
+                cursor.execute(f"ALTER TABLE `{tabla}` " + ', '.join(definicion_indice(indice) for indice in faltan))
+            cursor.close()
+    except Error as e:
+        return(f"Error creando los índices de la tabla {tabla}: {e}")
+
+    with bloqueo_indices:
+        diferidos = leer_diferidos()
+        if diferidos.pop(tabla, None) is not None:
+            guardar_diferidos(diferidos)
+
+    medidas['indices'] = [indice.nombre for indice in faltan]
+    medidas['segundos'] = round(time.perf_counter() - inicio, 3)
+    return True
+
+# Función que lee los índices quitados que aún no se han vuelto a crear, por tabla
+def leer_diferidos():
+    ruta_indices = funcs.obtener_ruta('EstadoMigracion', FICHERO_INDICES)
+    if not os.path.exists(ruta_indices):
+        return {}
+    with open(ruta_indices, 'r', encoding='utf-8') as file:
+        return {tabla: [IndiceSecundario(indice['nombre'], [tuple(columna) for columna in indice['columnas']], indice['tipo'])
+                        for indice in indices]
+                for tabla, indices in json.load(file).items()}
+
+# Función que guarda los índices pendientes. Se escribe un fichero temporal y se renombra para no dejarlo a medias
+def guardar_diferidos(diferidos):
+    ruta_indices = funcs.obtener_ruta('EstadoMigracion', FICHERO_INDICES)
+    if not diferidos:
+        if os.path.exists(ruta_indices):
+            os.remove(ruta_indices)
+        return
+    datos = {tabla: [indice._asdict() for indice in indices] for tabla, indices in diferidos.items()}
+    with open(ruta_indices + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump(datos, file, indent=4, sort_keys=True)
+    os.replace(ruta_indices + '.tmp', ruta_indices)
@@ -0,0 +1,130 @@
+import os
+import sys
+import json
+import time
+import threading
+from collections import Counter
+
+# Variable de entorno con el nivel de registro. Al ser del entorno la heredan los procesos que transforman los ficheros
+VARIABLE_NIVEL = 'MIGRACION_NIVEL_REGISTRO'
+
+# Niveles de registro: 'error' solo muestra errores y avisos, 'info' el avance de cada tabla
+# y 'detalle' además el resultado de cada sentencia, que ralentiza las cargas grandes
+NIVELES = {'error': 0, 'info': 1, 'detalle': 2}
+NIVEL_DEFECTO = 'info'
+
+# Función que fija el nivel de registro de la migración
+def fijar_nivel(nivel):
+    os.environ[VARIABLE_NIVEL] = nivel
+
+# Función que indica si se imprimen los mensajes del nivel indicado
+def activo(nivel):
+    return NIVELES[nivel] <= NIVELES.get(os.environ.get(VARIABLE_NIVEL, NIVEL_DEFECTO), NIVELES[NIVEL_DEFECTO])
+
+# Función que imprime un mensaje si su nivel está activo
+def registrar(mensaje, nivel='info'):
+    if activo(nivel):
+        print(mensaje)
+
+# Cronómetro de las etapas de un fichero. Cada instante se carga a una sola etapa: al entrar en una etapa anidada
+# (por ejemplo, leer dentro de transformar) el tiempo deja de contar para la exterior
+class Cronometro:
+    def __init__(self, etapa):
+        self.tiempos = Counter()
+        self.filas = 0
+        self.pila = [etapa]
+        self.ultimo = time.perf_counter()
+
+    # Función que carga el tiempo transcurrido a la etapa en curso y pasa a la etapa indicada (None vuelve a la anterior)
+    def cambiar(self, etapa=None):
+        ahora = time.perf_counter()
+        self.tiempos[self.pila[-1]] += ahora - self.ultimo
+        self.ultimo = ahora
+        if etapa is None:
+            self.pila.pop()
+        else:
+            self.pila.append(etapa)
+
+    # Función que recorre un iterable cargando a la etapa indicada el tiempo que se tarda en obtener cada elemento
+    def medir(self, iterable, etapa):
+        iterador = iter(iterable)
+        while True:
+            self.cambiar(etapa)
+            try:
+                elemento = next(iterador)
+            except StopIteration:
+                return
+            finally:
+                self.cambiar()
+            yield elemento
+
+    # Función que termina la medición y devuelve los segundos de cada etapa
+    def terminar(self):
+        ahora = time.perf_counter()
+        self.tiempos[self.pila[-1]] += ahora - self.ultimo
+        self.ultimo = ahora
+        return {etapa: round(segundos, 3) for etapa, segundos in self.tiempos.items()}
+
+# Función que añade el ritmo en filas por segundo a las medidas de una etapa
+def calcular_ritmo(medidas, segundos):
+    medidas['segundos'] = round(segundos, 3)
+    filas = medidas.get('filas')
+    medidas['filas_por_segundo'] = round(filas / segundos) if filas and segundos else None
+    return medidas
+
+# Función que imprime el resumen por tabla de la migración: filas, segundos de transformación y de carga y su ritmo
+def imprimir_resumen(informe):
+    tablas = informe.get('tablas', {})
+    if not tablas or not activo('info'):
+        return
+
+    print(f"\n{'Tabla':<34} {'Filas':>10} {'Transformar s':>14} {'Cargar s':>10} {'Carga filas/s':>14}")
+    for tabla, medidas in tablas.items():
+        transformacion = medidas.get('transformacion', {})
+        carga = medidas.get('carga', {})
+        print(f"{tabla:<34} {transformacion.get('filas') or carga.get('filas') or 0:>10} "
+              f"{transformacion.get('segundos', '-'):>14} {carga.get('segundos', '-'):>10} {carga.get('filas_por_segundo') or '-':>14}")
+
+# Función que guarda el informe de la migración. Se escribe un fichero temporal y se renombra para no dejarlo a medias
+def guardar_informe(informe, ruta_informe):
+    with open(ruta_informe + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump(informe, file, indent=4, ensure_ascii=False, default=str)
+        file.write('\n')
+    os.replace(ruta_informe + '.tmp', ruta_informe)
+
+# Barra de progreso que se redibuja en la consola desde un hilo con el estado de las tablas del informe
+class BarraProgreso:
+    def __init__(self, informe, total_tablas, intervalo=0.5, ancho=30):
+        self.informe = informe
+        self.total_tablas = total_tablas
+        self.intervalo = intervalo
+        self.ancho = ancho
+        self.inicio = time.perf_counter()
+        self.parar = threading.Event()
+        self.hilo = threading.Thread(target=self.ejecutar, daemon=True)
+
+    # Función que compone la línea de la barra
+    def linea(self):
+        tablas = list(self.informe['tablas'].values())
+        transformadas = sum(1 for tabla in tablas if tabla.get('estado') in ('transformada', 'cargando', 'indexando', 'terminada'))
+        terminadas = sum(1 for tabla in tablas if tabla.get('estado') == 'terminada')
+        filas = sum(tabla.get('carga', {}).get('filas', 0) for tabla in tablas)
+        segundos = time.perf_counter() - self.inicio
+
+        llenas = self.ancho * terminadas // self.total_tablas if self.total_tablas else self.ancho
+        return (f"\r[{'#' * llenas}{'.' * (self.ancho - llenas)}] {terminadas}/{self.total_tablas} tablas cargadas, "
+                f"{transformadas} transformadas, {filas} filas ({round(filas / segundos) if segundos else 0} filas/s)")
+
+    def ejecutar(self):
+        while not self.parar.wait(self.intervalo):
+            sys.stderr.write(self.linea())
+            sys.stderr.flush()
+
+    def iniciar(self):
+        self.hilo.start()
+
+    def detener(self):
+        self.parar.set()
+        self.hilo.join()
+        sys.stderr.write(self.linea() + '\n')
+        sys.stderr.flush()
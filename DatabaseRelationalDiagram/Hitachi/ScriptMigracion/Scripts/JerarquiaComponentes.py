@@ -0,0 +1,126 @@
+import time
+from mysql.connector import Error
+import Migrations as funcs
+import Verificacion as verificador
+
+# Tabla de cierre de la jerarquía de componentes: una fila por cada componente y cada uno de sus antecesores (y él mismo,
+# con profundidad 0). El subárbol de un componente es WHERE IdAncestro = ? y su ruta hasta la raíz WHERE IdDescendiente = ?,
+# sin recorrer IdComponentePadre nivel a nivel. Se calcula con el fichero transformado de componentes y se carga tras él.
+# La tabla la crea la migración AddedComponentesJerarquia de GSMAO.Server: el script solo la rellena
+
+# Tabla de destino de la jerarquía y sus columnas
+TABLA_JERARQUIA = 'componentes_jerarquia'
+COLUMNAS_JERARQUIA = ['IdAncestro', 'IdDescendiente', 'Profundidad']
+
+# Tabla de la que se calcula la jerarquía y columna con el padre de cada componente
+TABLA_COMPONENTES = 'componentes'
+COLUMNA_PADRE = 'IdComponentePadre'
+
+# Filas de cada INSERT del fichero de la jerarquía
+FILAS_POR_INSERT = 1000
+
+# Componentes con ciclo o con padre inexistente que se guardan como máximo en el informe
+MAXIMO_COMPONENTES = 20
+
+# Función que calcula los antecesores de cada componente, del padre a la raíz.
+# Los componentes cuyo padre no existe se toman como raíces y en los ciclos se corta la relación con el padre del componente
+# por el que se ha entrado en el ciclo. Devuelve los antecesores, los padres inexistentes y los componentes en ciclo
+def calcular_antecesores(padres):
+    antecesores = {}
+    inexistentes = []
+    ciclos = []
+    for componente in padres:
+        # Subir hasta un componente ya resuelto, una raíz o un ciclo, y resolver la ruta de vuelta
+        ruta = []
+        en_ruta = set()
+        actual = componente
+        while actual is not None and actual not in antecesores:
+            if actual in en_ruta:
+                ciclos.append(actual)
+                padres[actual] = None
+                antecesores[actual] = []
+                break
+            ruta.append(actual)
+            en_ruta.add(actual)
+            padre = padres[actual]
+            if padre is not None and padre not in padres:
+                inexistentes.append((actual, padre))
+                padres[actual] = padre = None
+            actual = padre
+
+        for componente_ruta in reversed(ruta):
+            if componente_ruta in antecesores:
+                continue
+            padre = padres[componente_ruta]
+            antecesores[componente_ruta] = [] if padre is None else [padre] + antecesores[padre]
+    return antecesores, inexistentes, ciclos
+
+# Función que genera los INSERT de la tabla de cierre
+def generar_inserciones(antecesores):
+    filas = []
+    for componente, lista in antecesores.items():
+        filas.append((componente, componente, 0))
+        filas.extend((antecesor, componente, profundidad) for profundidad, antecesor in enumerate(lista, 1))
+        if len(filas) >= FILAS_POR_INSERT:
+            yield funcs.Insercion(TABLA_JERARQUIA, COLUMNAS_JERARQUIA, filas)
+            filas = []
+    if filas:
+        yield funcs.Insercion(TABLA_JERARQUIA, COLUMNAS_JERARQUIA, filas)
+
+# Función que obtiene el nombre del fichero de la jerarquía a partir del fichero transformado de componentes
+def nombre_fichero_jerarquia(fichero_componentes):
+    return f"{TABLA_JERARQUIA}_modificado." + fichero_componentes.split('_modificado.', 1)[1]
+
+# Función que calcula la tabla de cierre con el fichero transformado de componentes y la guarda junto a él,
+# en su mismo formato y compresión. Se ejecuta en un proceso del pool: devuelve el fichero de la jerarquía y sus medidas,
+# con los componentes cuyo padre no existe y los que forman ciclos
+def construir_jerarquia(fichero, fichero_componentes):
+    inicio = time.perf_counter()
+    columnas = funcs.MAPEOS[fichero].columnas
+    padres = {}
+    for componente, padre in verificador.leer_claves_fichero(fichero_componentes, [0, columnas.index(COLUMNA_PADRE)]):
+        padres[int(componente)] = None if padre is None else int(padre)
+
+    antecesores, inexistentes, ciclos = calcular_antecesores(padres)
+
+    fichero_jerarquia = nombre_fichero_jerarquia(fichero_componentes)
+    ruta_componentes = funcs.obtener_ruta('FicherosModificados_Datos', fichero_componentes)
+    funcs.escribir_fichero_modificado(generar_inserciones(antecesores), funcs.obtener_ruta('FicherosModificados_Datos', fichero_jerarquia),
+                                      funcs.formato_fichero(fichero_componentes), compresion=funcs.compresion_fichero(ruta_componentes))
+
+    medidas = {
+        'componentes': len(antecesores),
+        'filas': len(antecesores) + sum(len(lista) for lista in antecesores.values()),
+        'profundidad_maxima': max((len(lista) for lista in antecesores.values()), default=0),
+        'padres_inexistentes': len(inexistentes),
+        'ciclos': len(ciclos),
+        'ejemplos_padres_inexistentes': [{'Id': componente, COLUMNA_PADRE: padre} for componente, padre in inexistentes[:MAXIMO_COMPONENTES]],
+        'ejemplos_ciclos': ciclos[:MAXIMO_COMPONENTES]
+    }
+    medidas['segundos'] = round(time.perf_counter() - inicio, 3)
+    return fichero_jerarquia, medidas
+
+# Función que imprime los problemas encontrados al construir la jerarquía
+def imprimir_jerarquia(medidas):
+    if medidas['padres_inexistentes']:
+        ejemplos = ', '.join(f"{ejemplo['Id']} (padre {ejemplo[COLUMNA_PADRE]})" for ejemplo in medidas['ejemplos_padres_inexistentes'][:5])
+        print(f"Jerarquía de componentes: {medidas['padres_inexistentes']} componentes con un padre que no existe, "
+              f"se toman como raíces (por ejemplo: {ejemplos})")
+    if medidas['ciclos']:
+        print(f"Jerarquía de componentes: {medidas['ciclos']} ciclos en IdComponentePadre, se cortan en los componentes "
+              f"{', '.join(str(componente) for componente in medidas['ejemplos_ciclos'])}")
+
+# Función que vacía la tabla de la jerarquía: siempre se carga completa, también en la migración incremental.
+# Si la tabla no existe se indica qué migración de la base de datos falta aplicar
+def preparar_tabla(pool):
+    try:
+        with pool.conexion() as conexion:
+            cursor = conexion.cursor()
+            cursor.execute(f"TRUNCATE TABLE `{TABLA_JERARQUIA}`")
+            cursor.close()
+        return True
+    except Error as e:
+        if e.errno == funcs.ERROR_TABLA_INEXISTENTE:
+            return(f"No existe la tabla {TABLA_JERARQUIA}: aplica la migración AddedComponentesJerarquia de GSMAO.Server "
+                   "(dotnet ef database update) antes de migrar los componentes")
+        return(f"Error preparando la tabla {TABLA_JERARQUIA}: {e}")
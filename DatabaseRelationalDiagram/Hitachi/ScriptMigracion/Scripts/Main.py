@@ -1,12 +1,111 @@
-import os
+import argparse
 import traceback
 import sys
+import time
+from datetime import datetime
 import Migrations as funcs
+import Scheduler as planificador
+import Conexiones as conexiones
+import Columnar as columnar
+import CargaAsincrona as carga_asincrona
+import Informe as informe
+import Verificacion as verificador
+import Perfiles as perfiles
 
 if __name__ == "__main__":
     try:
-        ficheros = [
-            'limpiar_BBDD.sql',
+        parser = argparse.ArgumentParser(description="Migración de los volcados de Hitachi a la base de datos de GSMAO")
+        parser.add_argument('--base-datos', default=None, help="Base de datos de destino (por defecto, la de conexionMySQL)")
+        parser.add_argument('--ficheros', nargs='+', default=None, help="Ficheros del volcado a migrar (por defecto, todos los de Hitachi)")
+        parser.add_argument('--procesos', type=int, default=None, help="Procesos para transformar los ficheros (por defecto, uno por núcleo)")
+        parser.add_argument('--partes', type=int, default=1,
+                            help="Repartir la transformación de cada volcado grande en este número de partes en paralelo (por defecto, sin repartir)")
+        parser.add_argument('--conexiones', type=int, default=4, help="Conexiones simultáneas para cargar las tablas")
+        parser.add_argument('--sin-binlog', action='store_true',
+                            help="No escribir las cargas en el binlog (sql_log_bin=0, requiere SUPER o SYSTEM_VARIABLES_ADMIN)")
+        parser.add_argument('--escritores-asincronos', type=int, default=None,
+                            help="Cargar cada script SQL con este número de conexiones asíncronas además de las del pool (requiere aiomysql)")
+        parser.add_argument('--diferir-indices', action='store_true',
+                            help="Quitar los índices secundarios de las tablas durante su carga completa y crearlos de nuevo al terminar cada una")
+        parser.add_argument('--carga-masiva', action='store_true', help="Cargar las tablas con LOAD DATA LOCAL INFILE en lugar de ejecutar los INSERT")
+        parser.add_argument('--filas-por-lote', type=int, default=None, help="Filas como máximo en cada INSERT (por defecto, las de cada INSERT del volcado)")
+        parser.add_argument('--bytes-por-lote', type=int, default=None, help="Bytes como máximo en cada INSERT, por debajo de max_allowed_packet")
+        parser.add_argument('--lotes-por-commit', type=int, default=None, help="Confirmar la transacción cada este número de INSERT (por defecto, al terminar cada tabla)")
+        parser.add_argument('--incremental', action='store_true', help="No vaciar las tablas: cargar solo las filas nuevas o modificadas con upserts")
+        parser.add_argument('--reanudar', '--resume', action='store_true', help="Continuar la última migración interrumpida sin vaciar las tablas ya cargadas")
+        parser.add_argument('--cache-max-mb', type=int, default=5120, help="Tamaño máximo de la caché de ficheros transformados en MB")
+        parser.add_argument('--sin-cache', action='store_true', help="Transformar todos los ficheros aunque sus volcados no hayan cambiado")
+        parser.add_argument('--columnar', action='store_true', help="Transformar por columnas con NumPy las tablas que lo permiten (requiere numpy)")
+        parser.add_argument('--nivel-registro', choices=list(informe.NIVELES), default=informe.NIVEL_DEFECTO,
+                            help="Mensajes a mostrar: error, info (avance de cada tabla) o detalle (resultado de cada sentencia, más lento)")
+        parser.add_argument('--progreso', action='store_true', help="Mostrar una barra con el avance de la migración")
+        parser.add_argument('--informe', default=None, help="Fichero JSON con el informe de la migración (por defecto, uno nuevo en InformesMigracion)")
+        modos = parser.add_mutually_exclusive_group()
+        modos.add_argument('--solo-transformar', '--dry-run', action='store_true',
+                           help="Solo generar los ficheros transformados y su manifiesto, sin conectar con la base de datos")
+        modos.add_argument('--solo-cargar', action='store_true', help="Cargar los ficheros de una ejecución anterior con --solo-transformar")
+        parser.add_argument('--validar-claves', action='store_true',
+                            help="Comprobar antes de cargar que las claves externas de cada tabla existen en sus tablas padre")
+        parser.add_argument('--cuarentena', action='store_true',
+                            help="Validar las claves externas y no cargar las filas huérfanas, que se guardan en CuarentenaMigracion")
+        parser.add_argument('--verificar', action='store_true',
+                            help="Al terminar, comparar por rangos de Ids las filas y claves de cada tabla con sus ficheros transformados")
+        parser.add_argument('--comprimir', choices=list(funcs.EXTENSIONES_COMPRESION), default=None,
+                            help="Comprimir los ficheros transformados con gzip o zstd (requiere zstandard)")
+        parser.add_argument('--perfil', '--profile', choices=list(perfiles.MODOS), default=None,
+                            help="Perfilar la transformación y la carga de cada tabla con cProfile (cpu), tracemalloc (memoria) o ambos. "
+                                 "Los perfiles y sus resúmenes se guardan en PerfilesMigracion. Las cargas perfiladas se ejecutan de una en una")
+        parser.add_argument('--perfil-tablas', nargs='+', default=None,
+                            help="Perfilar solo estas tablas, por su fichero del volcado o su tabla de destino (por defecto, todas)")
+        parser.add_argument('--perfil-top', type=int, default=25, help="Funciones y líneas de memoria de cada resumen del perfil")
+        args = parser.parse_args()
+        informe.fijar_nivel(args.nivel_registro)
+
+        if args.solo_transformar and args.reanudar:
+            parser.error("--reanudar continúa una carga, no se puede usar con --solo-transformar")
+        if args.solo_transformar and args.verificar:
+            parser.error("--verificar comprueba las tablas cargadas, no se puede usar con --solo-transformar")
+        desconocidos = [fichero for fichero in args.ficheros or [] if fichero not in funcs.MAPEOS]
+        if desconocidos:
+            parser.error(f"Ficheros sin mapeo en Migrations.MAPEOS: {', '.join(desconocidos)}")
+        if args.perfil_tablas and not args.perfil:
+            parser.error("--perfil-tablas elige las tablas de --perfil, que no se ha indicado")
+        desconocidas = [tabla for tabla in args.perfil_tablas or []
+                        if tabla not in funcs.MAPEOS and tabla not in planificador.DEPENDENCIAS]
+        if desconocidas:
+            parser.error(f"Tablas a perfilar que no se migran: {', '.join(desconocidas)}")
+        if args.escritores_asincronos and not carga_asincrona.disponible():
+            print("La carga asíncrona necesita el paquete aiomysql (pip install aiomysql).")
+            sys.exit(1)  # Detener la ejecución con un código de error
+        if args.comprimir and not funcs.compresion_disponible(args.comprimir):
+            print("La compresión zstd necesita el paquete zstandard (pip install zstandard).")
+            sys.exit(1)  # Detener la ejecución con un código de error
+
+        # Los ficheros a cargar indican si son incrementales y si son de carga masiva
+        modo = 'transformar' if args.solo_transformar else 'cargar' if args.solo_cargar else 'completo'
+        incremental = args.incremental
+        carga_masiva = args.carga_masiva
+        if args.solo_cargar:
+            manifiesto = planificador.leer_manifiesto()
+            if manifiesto is None:
+                print(f"No hay ficheros transformados que cargar: falta {planificador.FICHERO_MANIFIESTO} en FicherosModificados_Datos")
+                sys.exit(1)  # Detener la ejecución con un código de error
+            incremental = incremental or manifiesto['incremental']
+            carga_masiva = manifiesto['formato'] == 'tsv'
+
+        if args.columnar and not columnar.disponible():
+            print("La transformación por columnas necesita NumPy (pip install numpy). Se transforman las tablas fila a fila.")
+
+        # La cuarentena incluye la validación de las claves externas
+        validacion = 'cuarentena' if args.cuarentena else 'informar' if args.validar_claves else None
+
+        lotes = {
+            'filas_por_lote': args.filas_por_lote,
+            'bytes_por_lote': args.bytes_por_lote,
+            'lotes_por_commit': args.lotes_por_commit
+        }
+
+        ficheros = args.ficheros or [
             'hitachi_empresas.sql',
             'hitachi_plantas.sql',
             'hitachi_centrosdecostes.sql',
@@ -26,77 +125,75 @@ if __name__ == "__main__":
         ]
 
         conexion = funcs.conexionMySQL()
-        for fichero in ficheros:
-            script_sql = funcs.leer_fichero_sql(fichero)
-
-            # Generar documento de INSERT por cada fichero con las modificaciones pertinentes
-            if fichero != 'limpiar_BBDD.sql':
-                script_sql = funcs.generarScript(script_sql)
-
-            if fichero == 'hitachi_ordenes.sql':
-                script_sql = funcs.Ordenes(script_sql)
-
-            if fichero == 'hitachi_orden_incidencias_resolucion.sql':
-                script_sql = funcs.IncidenciasOrdenes(script_sql)
-
-            if fichero == 'hitachi_usuarios_orden.sql':
-                script_sql = funcs.UsuariosOrdenes(script_sql)
-
-            if fichero == 'hitachi_historial_modificaciones_usuarios_ordenes.sql':
-                script_sql = funcs.HistorialUsuariosOrdenes(script_sql)
-
-            if fichero == 'hitachi_componentes.sql':
-                script_sql = funcs.Componentes(script_sql)
-
-            if fichero == 'hitachi_plantas.sql':
-                script_sql = funcs.Plantas(script_sql)
-
-            if fichero == 'hitachi_incidencias.sql':
-                script_sql = funcs.Incidencias(script_sql)
-
-            if fichero == 'hitachi_estados.sql':
-                script_sql = funcs.EstadosOrden(script_sql)
-
-            if fichero == 'hitachi_tipos_ordenes.sql':
-                script_sql = funcs.TiposOrdenes(script_sql)
-
-            if fichero == 'hitachi_resoluciones.sql':
-                script_sql = funcs.Resoluciones(script_sql)
-
-            if fichero == 'hitachi_centrosdecostes.sql':
-                script_sql = funcs.CentrosCostes(script_sql)
-
-            if fichero == 'hitachi_localizaciones.sql':
-                script_sql = funcs.Localizaciones(script_sql)
-
-            if fichero == 'hitachi_tiposincidencias.sql':
-                script_sql = funcs.MecanismosDeFallo(script_sql)
-                fichero = 'hitachi_mecanismosdefallo.sql'
-
-            if fichero == 'hitachi_activos.sql':
-                script_sql = funcs.Activos(script_sql)
-
-            # Guardar el fichero modificado
-            if fichero != "limpiar_BBDD.sql":
-                ruta_guardar = funcs.obtener_ruta('FicherosModificados_Datos', fichero)
-                ruta_guardar = ruta_guardar.replace('.sql', '_modificado.sql')
-                with open(ruta_guardar, 'w', encoding='utf-8') as file:
-                    file.write(script_sql)
-
-            # Ejecutar el script modificado en la base de datos
-            response = funcs.ejecutar_script_mysql(conexion, script_sql)
-            if fichero == 'limpiar_BBDD.sql':
-                print(f"Se ha terminado la ejecucion del fichero {fichero}.")
-            else:
-                print(f"Se ha terminado la ejecucion del fichero {os.path.basename(ruta_guardar)}.")
-
-            if not response:
+        if args.base_datos:
+            conexion['database'] = args.base_datos
+        if carga_masiva:
+            conexion['allow_local_infile'] = True
+
+        # Las tablas perfiladas se transforman sin caché y sin repartir en partes
+        perfil = None
+        if args.perfil:
+            perfil = perfiles.Perfil(perfiles.MODOS[args.perfil], set(args.perfil_tablas) if args.perfil_tablas else None,
+                                     args.perfil_top, f"{datetime.now():%Y%m%d_%H%M%S}")
+
+        # Informe de la migración con las opciones y las medidas de cada tabla. Se guarda también si la migración falla
+        informe_migracion = {'inicio': datetime.now().isoformat(timespec='seconds'), 'opciones': vars(args), 'resultado': None}
+        ruta_informe = args.informe or funcs.obtener_ruta('InformesMigracion', f"informe_{datetime.now():%Y%m%d_%H%M%S}.json")
+        inicio = time.perf_counter()
+
+        # Las mismas conexiones se reutilizan para vaciar las tablas y para todas las cargas. Sin cargas no se conecta.
+        # Las cargas solo se dejan fuera del binlog si se pide con --sin-binlog
+        pool = None if args.solo_transformar else conexiones.PoolConexiones(conexion, args.conexiones,
+                                                                            conexiones.sesion_carga(args.sin_binlog))
+        try:
+            # Vaciar las tablas antes de lanzar las cargas en paralelo. La migración incremental y la reanudada las mantienen
+            if pool is not None and not incremental and not args.reanudar:
+                response = funcs.ejecutar_script_mysql(pool, funcs.leer_fichero_sql('limpiar_BBDD.sql'))
+                informe_migracion['segundos_limpiar'] = round(time.perf_counter() - inicio, 3)
+                if response is not True:
+                    informe_migracion['resultado'] = response
+                    print(response)
+                    sys.exit(1)  # Detener la ejecución con un código de error
+                informe.registrar("Se ha terminado la ejecucion del fichero limpiar_BBDD.sql.")
+
+            # Transformar y cargar el resto de ficheros respetando las dependencias entre tablas
+            response = planificador.ejecutar_migracion(pool, ficheros, informe_migracion=informe_migracion,
+                                                       procesos=args.procesos, conexiones=args.conexiones, carga_masiva=carga_masiva,
+                                                       lotes=lotes, incremental=incremental, reanudar=args.reanudar,
+                                                       limite_cache=None if args.sin_cache else args.cache_max_mb * 1024 * 1024,
+                                                       columnar=args.columnar and columnar.disponible(), progreso=args.progreso,
+                                                       modo=modo, compresion=args.comprimir, partes=args.partes,
+                                                       escritores=args.escritores_asincronos, diferir_indices=args.diferir_indices,
+                                                       validacion=validacion, perfil=perfil, verificar=args.verificar)
+            informe_migracion['resultado'] = response
+            if response is not True:
                 print(response)
                 sys.exit(1)  # Detener la ejecución con un código de error
-            
+
+            # Comparar las tablas cargadas con sus ficheros transformados
+            if args.verificar:
+                inicio_verificar = time.perf_counter()
+                verificacion = verificador.verificar_migracion(pool, informe_migracion['tablas'], args.procesos, args.conexiones, incremental)
+                informe_migracion['verificacion'] = verificacion
+                informe_migracion['segundos_verificar'] = round(time.perf_counter() - inicio_verificar, 3)
+                verificador.imprimir_verificacion(verificacion)
+                if any(resultado['estado'] == 'distinta' for resultado in verificacion.values()):
+                    informe_migracion['resultado'] = "Hay tablas con filas distintas a las de sus ficheros transformados"
+                    print(informe_migracion['resultado'])
+                    sys.exit(1)  # Detener la ejecución con un código de error
+        finally:
+            if pool is not None:
+                pool.cerrar()
+            informe_migracion['fin'] = datetime.now().isoformat(timespec='seconds')
+            informe_migracion['segundos'] = round(time.perf_counter() - inicio, 3)
+            informe.guardar_informe(informe_migracion, ruta_informe)
+            informe.imprimir_resumen(informe_migracion)
+            perfiles.imprimir_perfiles(informe_migracion.get('tablas', {}))
+            informe.registrar(f"Informe de la migración guardado en {ruta_informe}")
+
         print("SCRIPT COMPLETADO")
     except Exception as ex:
         print(f"Excepcion: {traceback.print_exc()}")
         print()
         print("ERROR INESPERADO. TERMINANDO LA EJECUCIÓN.\nPresione cualquier tecla para finalizar...")
-        sys.exit(1)  # Detener la ejecución con un código de error
\ No newline at end of file
+        sys.exit(1)  # Detener la ejecución con un código de error
@@ -0,0 +1,202 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import traceback
+import subprocess
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+import Migrations as funcs
+import Informe as informe
+
+# Migración de varias fuentes (Hitachi, Demo, Preventivos...) descritas en un fichero JSON, cada una a su base de datos.
+# Cada fuente se migra con Main.py en un proceso aparte con su propia carpeta raíz (MIGRACION_RAIZ), donde quedan sus ficheros
+# transformados, su estado y sus informes, por lo que varias fuentes pueden migrarse a la vez sin compartir nada.
+# Uso: python Scripts\MigracionFuentes.py [fuentes.json] [--simultaneas N] [--conexiones N] [--escritores-asincronos N]
+
+# Fichero de fuentes por defecto, en la carpeta Scripts
+FICHERO_FUENTES = 'fuentes.json'
+
+# Fuente de datos del fichero de fuentes. Las rutas relativas lo son a la carpeta del fichero:
+#  - nombre: nombre con el que se informa de la fuente
+#  - raiz: carpeta raíz de la migración de la fuente
+#  - base_datos: base de datos de destino
+#  - volcados: carpeta de los volcados (por defecto, DumpFolder de la raíz)
+#  - ficheros: ficheros del volcado que se migran (por defecto, los de Main.py)
+#  - mapeos: fichero JSON con los mapeos que se añaden o cambian para sus volcados (ver Migrations.aplicar_mapeos)
+#  - reemplazos: fichero con sus tablas de reemplazo (por defecto, el de Scripts de la raíz o, si no tiene, el de esta carpeta)
+#  - argumentos: opciones de Main.py para esta fuente, además de las comunes a todas
+Fuente = namedtuple('Fuente', ['nombre', 'raiz', 'base_datos', 'volcados', 'ficheros', 'mapeos', 'reemplazos', 'argumentos'],
+                    defaults=[None, None, None, None, []])
+
+# Opciones de Main.py que reparte o fija este script y que no se pueden indicar en el fichero de fuentes
+OPCIONES_RESERVADAS = ('--base-datos', '--ficheros', '--conexiones', '--procesos', '--informe', '--escritores-asincronos')
+
+# Función que lee el fichero de fuentes: las opciones comunes de Main.py ('argumentos') y la lista de fuentes ('fuentes').
+# Las rutas se devuelven absolutas. Las raíces y las bases de datos no se pueden repetir entre fuentes
+def leer_fuentes(ruta_fuentes):
+    with open(ruta_fuentes, 'r', encoding='utf-8') as file:
+        datos = json.load(file)
+    carpeta = os.path.dirname(os.path.abspath(ruta_fuentes))
+    ruta = lambda valor: None if valor is None else os.path.normpath(os.path.join(carpeta, valor))
+
+    fuentes = []
+    for campos in datos['fuentes']:
+        fuente = Fuente(**campos)
+        if not fuente.nombre or not fuente.raiz or not fuente.base_datos:
+            raise ValueError(f"Cada fuente debe indicar nombre, raiz y base_datos: {campos}")
+        fuentes.append(fuente._replace(raiz=ruta(fuente.raiz), volcados=ruta(fuente.volcados), mapeos=ruta(fuente.mapeos),
+                                       reemplazos=ruta(fuente.reemplazos)))
+
+    argumentos = datos.get('argumentos', [])
+    for campo in ('nombre', 'raiz', 'base_datos'):
+        valores = [getattr(fuente, campo) for fuente in fuentes]
+        repetidos = sorted({valor for valor in valores if valores.count(valor) > 1})
+        if repetidos:
+            raise ValueError(f"Las fuentes no pueden compartir {campo}: {', '.join(repetidos)}")
+    for lista in [argumentos] + [fuente.argumentos for fuente in fuentes]:
+        reservadas = [opcion for opcion in lista if opcion.split('=')[0] in OPCIONES_RESERVADAS]
+        if reservadas:
+            raise ValueError(f"Las opciones {', '.join(reservadas)} las fija MigracionFuentes, no el fichero de fuentes")
+    return argumentos, fuentes
+
+# Función que deja en la carpeta Scripts de la raíz de una fuente los ficheros que Main.py lee de ella: las tablas de reemplazo
+# (las de la fuente, o las de esta carpeta si la raíz no tiene) y el script que vacía las tablas
+def preparar_raiz(fuente):
+    carpeta_scripts = os.path.dirname(os.path.abspath(__file__))
+    destino = os.path.join(fuente.raiz, 'Scripts')
+    os.makedirs(destino, exist_ok=True)
+    if fuente.reemplazos is not None:
+        if os.path.abspath(fuente.reemplazos) != os.path.abspath(os.path.join(destino, funcs.FICHERO_REEMPLAZOS)):
+            shutil.copy(fuente.reemplazos, os.path.join(destino, funcs.FICHERO_REEMPLAZOS))
+    for fichero in (funcs.FICHERO_REEMPLAZOS, 'limpiar_BBDD.sql'):
+        if not os.path.exists(os.path.join(destino, fichero)):
+            shutil.copy(os.path.join(carpeta_scripts, fichero), os.path.join(destino, fichero))
+
+# Función que migra una fuente con Main.py en un proceso aparte. Su salida se guarda en InformesMigracion de su raíz.
+# Devuelve el resumen de la fuente con el resultado de su informe de migración
+def migrar_fuente(fuente, argumentos, conexiones, procesos, marca, escritores=None):
+    preparar_raiz(fuente)
+    carpeta_informes = os.path.join(fuente.raiz, 'InformesMigracion')
+    os.makedirs(carpeta_informes, exist_ok=True)
+    ruta_informe = os.path.join(carpeta_informes, f"informe_{marca}.json")
+    ruta_salida = os.path.join(carpeta_informes, f"salida_{marca}.log")
+
+    comando = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Main.py'),
+               '--base-datos', fuente.base_datos, '--conexiones', str(conexiones), '--procesos', str(procesos),
+               '--informe', ruta_informe, *argumentos, *fuente.argumentos]
+    if escritores:
+        comando += ['--escritores-asincronos', str(escritores)]
+    if fuente.ficheros:
+        comando += ['--ficheros', *fuente.ficheros]
+
+    # Las variables que no indica la fuente se quitan para que no hereden las de este proceso
+    entorno = dict(os.environ)
+    entorno[funcs.VARIABLE_RAIZ] = fuente.raiz
+    for variable, valor in ((funcs.VARIABLE_VOLCADOS, fuente.volcados), (funcs.VARIABLE_MAPEOS, fuente.mapeos)):
+        if valor is None:
+            entorno.pop(variable, None)
+        else:
+            entorno[variable] = valor
+
+    informe.registrar(f"Empieza la migración de {fuente.nombre} a {fuente.base_datos}.")
+    inicio = time.perf_counter()
+    with open(ruta_salida, 'w', encoding='utf-8') as salida:
+        proceso = subprocess.run(comando, env=entorno, stdin=subprocess.DEVNULL, stdout=salida, stderr=subprocess.STDOUT)
+
+    resumen = {'nombre': fuente.nombre, 'base_datos': fuente.base_datos, 'codigo': proceso.returncode,
+               'segundos': round(time.perf_counter() - inicio, 3), 'informe': ruta_informe, 'salida': ruta_salida, 'resultado': None}
+    if os.path.exists(ruta_informe):
+        with open(ruta_informe, 'r', encoding='utf-8') as file:
+            resumen['resultado'] = json.load(file).get('resultado')
+    if resumen['resultado'] is None and proceso.returncode != 0:
+        resumen['resultado'] = f"Main.py ha terminado con el código {proceso.returncode}"
+    informe.registrar(f"Ha terminado la migración de {fuente.nombre}: "
+                      f"{'correcta' if resumen['resultado'] is True else resumen['resultado']}.")
+    return resumen
+
+# Función que reparte las conexiones de una fuente entre sus cargas y los escritores asíncronos de cada carga.
+# Cada carga de un script SQL abre sus escritores además de su conexión del pool, así que se lanzan menos cargas a la vez
+# para que entre todas no pasen de conexiones_fuente. Con menos de dos conexiones se carga sin escritores.
+# Devuelve las conexiones de carga y los escritores por carga
+def repartir_conexiones(conexiones_fuente, escritores=None):
+    if not escritores or conexiones_fuente < 2:
+        return conexiones_fuente, None
+    escritores = min(escritores, conexiones_fuente - 1)
+    return conexiones_fuente // (escritores + 1), escritores
+
+# Función que migra las fuentes, como mucho simultaneas a la vez. Las conexiones, incluidos los escritores asíncronos, y los
+# procesos se reparten a partes iguales entre las fuentes que se migran a la vez, de forma que entre todas no pasan de los indicados
+def migrar_fuentes(argumentos, fuentes, simultaneas=2, conexiones=8, procesos=None, escritores=None):
+    simultaneas = max(1, min(simultaneas, len(fuentes)))
+    conexiones_fuente, escritores_fuente = repartir_conexiones(max(1, conexiones // simultaneas), escritores)
+    procesos_fuente = max(1, (procesos or os.cpu_count()) // simultaneas)
+    marca = f"{datetime.now():%Y%m%d_%H%M%S}"
+
+    resumenes = {}
+    with ThreadPoolExecutor(max_workers=simultaneas) as ejecutor:
+        futuros = {ejecutor.submit(migrar_fuente, fuente, argumentos, conexiones_fuente, procesos_fuente, marca, escritores_fuente): fuente
+                   for fuente in fuentes}
+        for futuro in as_completed(futuros):
+            fuente = futuros[futuro]
+            try:
+                resumenes[fuente.nombre] = futuro.result()
+            except Exception as e:
+                resumenes[fuente.nombre] = {'nombre': fuente.nombre, 'base_datos': fuente.base_datos, 'resultado': f"Error: {e}"}
+    # El resumen sigue el orden del fichero de fuentes
+    return [resumenes[fuente.nombre] for fuente in fuentes]
+
+# Función que imprime el resultado de cada fuente
+def imprimir_fuentes(resumenes):
+    print(f"\n{'Fuente':<20} {'Base de datos':<28} {'Segundos':>9}  Resultado")
+    for resumen in resumenes:
+        resultado = 'correcta' if resumen['resultado'] is True else resumen['resultado']
+        print(f"{resumen['nombre']:<20} {resumen['base_datos']:<28} {resumen.get('segundos', '-'):>9}  {resultado}")
+        if resumen['resultado'] is not True and resumen.get('salida'):
+            print(f"{'':<20} Salida en {resumen['salida']}")
+
+if __name__ == "__main__":
+    try:
+        parser = argparse.ArgumentParser(description="Migración de varias fuentes de datos, cada una a su base de datos")
+        parser.add_argument('fuentes', nargs='?', default=None, help=f"Fichero JSON con las fuentes (por defecto, Scripts/{FICHERO_FUENTES})")
+        parser.add_argument('--simultaneas', type=int, default=2, help="Fuentes que se migran a la vez")
+        parser.add_argument('--conexiones', type=int, default=8,
+                            help="Conexiones de carga entre todas las fuentes que se migran a la vez, incluidos los escritores asíncronos")
+        parser.add_argument('--escritores-asincronos', type=int, default=None,
+                            help="Conexiones asíncronas con las que se carga cada script SQL (requiere aiomysql). "
+                                 "Se limitan para no pasar de --conexiones")
+        parser.add_argument('--procesos', type=int, default=None,
+                            help="Procesos de transformación entre todas las fuentes que se migran a la vez (por defecto, uno por núcleo)")
+        parser.add_argument('--solo', nargs='+', default=None, help="Migrar solo las fuentes con estos nombres")
+        args = parser.parse_args()
+
+        ruta_fuentes = args.fuentes or os.path.join(os.path.dirname(os.path.abspath(__file__)), FICHERO_FUENTES)
+        try:
+            argumentos, fuentes = leer_fuentes(ruta_fuentes)
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            print(f"Fichero de fuentes {ruta_fuentes} no válido: {e!r}")
+            sys.exit(1)  # Detener la ejecución con un código de error
+        if args.solo:
+            desconocidas = [nombre for nombre in args.solo if nombre not in {fuente.nombre for fuente in fuentes}]
+            if desconocidas:
+                parser.error(f"Fuentes que no están en {ruta_fuentes}: {', '.join(desconocidas)}")
+            fuentes = [fuente for fuente in fuentes if fuente.nombre in args.solo]
+
+        inicio = time.perf_counter()
+        resumenes = migrar_fuentes(argumentos, fuentes, args.simultaneas, args.conexiones, args.procesos, args.escritores_asincronos)
+        imprimir_fuentes(resumenes)
+
+        ruta_informe = funcs.obtener_ruta('InformesMigracion', f"fuentes_{datetime.now():%Y%m%d_%H%M%S}.json")
+        informe.guardar_informe({'fuentes': resumenes, 'segundos': round(time.perf_counter() - inicio, 3)}, ruta_informe)
+        informe.registrar(f"Informe de las fuentes guardado en {ruta_informe}")
+        if any(resumen['resultado'] is not True for resumen in resumenes):
+            sys.exit(1)  # Terminar con un código de error si alguna fuente ha fallado
+        print("SCRIPT COMPLETADO")
+    except Exception as ex:
+        print(f"Excepcion: {traceback.print_exc()}")
+        print()
+        print("ERROR INESPERADO. TERMINANDO LA EJECUCIÓN.")
+        sys.exit(1)  # Detener la ejecución con un código de error
@@ -1,10 +1,22 @@
 import os
+import io
 import re
+import gzip
 import traceback
 import sys
-import csv
-import mysql.connector
+import itertools
+import operator
+import json
+from collections import namedtuple, Counter
+from decimal import Decimal, InvalidOperation
 from mysql.connector import Error
+import Informe as informe
+
+# zstandard es opcional: sin él solo se pueden comprimir los ficheros transformados con gzip
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 # Función que configura la conexión de MySQL
 def conexionMySQL():
@@ -19,518 +31,907 @@ def conexionMySQL():
 
     return mysql_config
 
-# Función para abrir el fichero en modo lectura
-def leer_fichero_sql(fichero):
+# Función que lee el fichero SQL sentencia a sentencia sin cargarlo entero en memoria
+def leer_fichero_sql(fichero, carpeta=None):
     try:
-        ruta_fichero = obtener_ruta('DumpFolder' if fichero != "limpiar_BBDD.sql" else 'Scripts', fichero)
+        if carpeta is None:
+            carpeta = 'DumpFolder' if fichero != "limpiar_BBDD.sql" else 'Scripts'
+        ruta_fichero = obtener_ruta(carpeta, fichero)
 
         with open(ruta_fichero, 'r', encoding='utf-8') as file:
-            contenido = file.read()
-
-        return contenido
+            yield from agrupar_sentencias(file)
     except Exception:
         print(f"\n\nError al leer el fichero\n{ruta_fichero}\nExcepcion: {traceback.print_exc()}")
         print("\n\nERROR INESPERADO. TERMINANDO LA EJECUCIÓN.\nPresione cualquier tecla para finalizar...")
         sys.exit(1)  # Detener la ejecución con un código de error
 
+# Función que junta en sentencias las líneas de un fichero SQL
+def agrupar_sentencias(lineas):
+    sentencia = []
+    for linea in lineas:
+        linea = linea.rstrip('\r\n')
+
+        # Ignorar comentarios y líneas vacías fuera de una sentencia
+        if not sentencia and (not linea.strip() or linea.startswith('--')):
+            continue
+
+        # Las sentencias de mysqldump pueden ocupar varias líneas (CREATE TABLE), los INSERT siempre ocupan una
+        sentencia.append(linea)
+        if linea.endswith(';'):
+            yield '\n'.join(sentencia)
+            sentencia = []
+
+    if sentencia:
+        yield '\n'.join(sentencia)
+
+# Función que lee un fichero ya transformado desde la posición indicada, con una sentencia por línea.
+# progreso guarda la posición en bytes tras la última sentencia entregada y la propia sentencia, para los puntos de control.
+# En los ficheros comprimidos las posiciones se cuentan sobre el contenido descomprimido
+def leer_fichero_modificado(fichero_modificado, desde=0, progreso=None):
+    progreso = {} if progreso is None else progreso
+    posicion = desde
+    ruta_fichero = obtener_ruta('FicherosModificados_Datos', fichero_modificado)
+    with abrir_fichero(ruta_fichero, 'rb', compresion_fichero(ruta_fichero)) as file:
+        if file.seekable():
+            file.seek(desde)
+        else:
+            # Los ficheros zstd solo se pueden recorrer hacia delante
+            pendiente = desde
+            while pendiente > 0:
+                bloque = file.read(min(pendiente, 1024 * 1024))
+                if not bloque:
+                    break
+                pendiente -= len(bloque)
+
+        for linea in file:
+            posicion += len(linea)
+            sentencia = linea.decode('utf-8').rstrip('\r\n')
+            if not sentencia:
+                continue
+
+            progreso['posicion'] = posicion
+            progreso['sentencia'] = sentencia
+            yield sentencia
+
+# Extensión de los ficheros transformados según su compresión
+EXTENSIONES_COMPRESION = {'gzip': '.gz', 'zstd': '.zst'}
+
+# Nivel de compresión de gzip: los niveles altos apenas reducen más los scripts y son mucho más lentos
+NIVEL_GZIP = 6
+
+# Función que indica si se puede usar una compresión
+def compresion_disponible(compresion):
+    return compresion != 'zstd' or zstandard is not None
+
+# Función que obtiene la compresión de un fichero por su extensión (None si no está comprimido)
+def compresion_fichero(ruta_fichero):
+    for compresion, extension in EXTENSIONES_COMPRESION.items():
+        if ruta_fichero.endswith(extension):
+            return compresion
+    return None
+
+# Función que obtiene el formato ('sql' o 'tsv') de un fichero transformado, esté o no comprimido
+def formato_fichero(ruta_fichero):
+    compresion = compresion_fichero(ruta_fichero)
+    if compresion is not None:
+        ruta_fichero = ruta_fichero[:-len(EXTENSIONES_COMPRESION[compresion])]
+    return os.path.splitext(ruta_fichero)[1].lstrip('.')
+
+# Función que abre un fichero con la compresión indicada. El modo debe indicar si es de texto ('rt', 'wt') o binario ('rb', 'wb')
+def abrir_fichero(ruta_fichero, modo, compresion=None, **opciones):
+    if compresion is None:
+        return open(ruta_fichero, modo, **opciones)
+    if compresion == 'gzip':
+        return gzip.open(ruta_fichero, modo, compresslevel=NIVEL_GZIP, **opciones)
+    if zstandard is None:
+        raise RuntimeError("La compresión zstd necesita el paquete zstandard (pip install zstandard)")
+
+    fichero = zstandard.open(ruta_fichero, modo, **opciones)
+    # El lector binario de zstandard no sabe leer por líneas
+    return io.BufferedReader(fichero) if modo == 'rb' else fichero
+
+# Variable de entorno que cambia la carpeta raíz de la migración (la usa el benchmark para no tocar la migración real).
+# Al ser del entorno la heredan también los procesos que transforman los ficheros
+VARIABLE_RAIZ = 'MIGRACION_RAIZ'
+
+# Variable de entorno con la carpeta de los volcados, si no están en DumpFolder de la carpeta raíz
+VARIABLE_VOLCADOS = 'MIGRACION_VOLCADOS'
+
 # Función que obtiene la ruta completa del fichero
 def obtener_ruta(carpeta, ruta_fichero):
     directorio_actual = os.path.dirname(os.path.abspath(__file__))
 
     # Subir un nivel desde el directorio actual
-    carpeta_superior = os.path.dirname(directorio_actual)
+    carpeta_superior = os.environ.get(VARIABLE_RAIZ) or os.path.dirname(directorio_actual)
     ruta_raiz = os.path.join(carpeta_superior, carpeta)
+    if carpeta == 'DumpFolder' and os.environ.get(VARIABLE_VOLCADOS):
+        ruta_raiz = os.environ[VARIABLE_VOLCADOS]
 
-    # Comprobar que la ruta para los ficheros modificados exista, si no, crearla
-    if not os.path.exists(ruta_raiz):
-        os.makedirs(ruta_raiz)
+    # Comprobar que la ruta para los ficheros modificados exista, si no, crearla.
+    # exist_ok evita el error cuando varios procesos la crean a la vez
+    os.makedirs(ruta_raiz, exist_ok=True)
 
     return os.path.join(ruta_raiz, ruta_fichero)
 
-# Función que genera un script de INSERT para la tabla Empresas
-def generarScript(script_sql):
-    lineas_modificadas = []
-    for linea in script_sql.splitlines():
-        # Incluir linea para bloquear y desbloquear tablas
-        if "LOCK TABLES" in linea or "INSERT INTO" in linea or "UNLOCK TABLES" in linea:
-            # Incluir estas líneas tal y cómo están
-            lineas_modificadas.append(linea)
-    
-    return '\n'.join(lineas_modificadas)
-
-# Función que incluye en la consulta las columnas que se están insertando
-def Plantas(script_sql):
-    lineas_modificadas = []
-    for linea in script_sql.splitlines():
-        if "INSERT INTO" in linea:
-            lineas_modificadas.append(re.sub(r'`([^`]*)`', '`plantas` (Id, Descripcion, StmpConfig, Latitud, Longitud, IdEmpresa)', linea))
-        else:
-            lineas_modificadas.append(linea)
-
-    return '\n'.join(str(linea).strip('{""}') for linea in lineas_modificadas)
-
-# Función que incluye en la consulta las columnas que se están insertando
-def Componentes(script_sql):
-    lineas_modificadas = []
-    for linea in script_sql.splitlines():
-        if "INSERT INTO" in linea:
-            lineas_modificadas.append(re.sub(r'`([^`]*)`', '`componentes` (Id, Denominacion, DescripcionES, DescripcionEN, IdComponentePadre)', linea))
-        else:
-            lineas_modificadas.append(linea)
-
-    return '\n'.join(str(linea).strip('{""}') for linea in lineas_modificadas)
-
-# Función que incluye en la consulta las columnas que se están insertando
-def Incidencias(script_sql):
-    lineas_modificadas = []
-    for linea in script_sql.splitlines():
-        if "INSERT INTO" in linea:
-            lineas_modificadas.append(re.sub(r'`([^`]*)`', '`incidencias` (Id, DescripcionES, DescripcionEN, IdMecanismoFallo)', linea))
-        else:
-            lineas_modificadas.append(linea)
-
-    return '\n'.join(str(linea).strip('{""}') for linea in lineas_modificadas)
-
-# Función que cambia el orden del centro de coste SAP
-def CentrosCostes(script_sql):
-    lineas_modificadas = []
-    for linea in script_sql.splitlines():
+# Función que transforma un fichero del volcado y guarda el resultado en FicherosModificados_Datos.
+# Se ejecuta en un proceso independiente por fichero, por lo que devuelve solo el nombre del fichero generado.
+# Con formato 'tsv' se genera un fichero para LOAD DATA en lugar del script SQL.
+# filas_por_lote y bytes_por_lote limitan el tamaño de cada INSERT del script SQL generado.
+# En las tablas con marca incremental se descartan las filas con Id menor o igual que marca y
+# se devuelve, junto al fichero generado, el mayor Id leído del volcado.
+# columnar usa la transformación por columnas en los scripts SQL (los ficheros TSV necesitan los valores separados).
+# También se devuelven las medidas del fichero: segundos de cada etapa (leer, analizar, transformar y escribir), filas y bytes.
+# Con compresion ('gzip' o 'zstd') el fichero se escribe comprimido según se genera.
+# Con resumir se guarda junto al fichero el resumen de sus filas con el que se verifica la carga (módulo Verificacion)
+def transformar_fichero(fichero, formato='sql', filas_por_lote=None, bytes_por_lote=None, marca=None, columnar=False, compresion=None,
+                        resumir=False):
+    # Se importa aquí porque Verificacion usa las funciones de este módulo
+    import Verificacion
+
+    # El tiempo que no se pasa leyendo, analizando ni transformando es de la escritura del fichero modificado
+    cronometro = informe.Cronometro('escribir')
+
+    # Generar documento de INSERT por cada fichero con las modificaciones de su mapeo
+    script_sql = cronometro.medir(generarScript(leer_fichero_sql(fichero)), 'leer')
+    marca = {'desde': marca, 'hasta': marca}
+
+    mapeo = MAPEOS[fichero]
+    resumen = Verificacion.nuevo_resumen(Verificacion.posiciones_verificacion(mapeo)) if resumir else None
+    script_sql = cronometro.medir(transformar_sentencias(mapeo, script_sql, marca, columnar and formato == 'sql', cronometro,
+                                                         resumen=resumen), 'transformar')
+
+    # Guardar el fichero modificado según se genera cada sentencia.
+    # Se escribe en un fichero temporal que sustituye al anterior al terminar, sin modificar el fichero que pueda
+    # compartir con la caché de transformaciones. El resumen del fichero anterior deja de valer
+    fichero_modificado = nombre_fichero_modificado(fichero, formato, compresion)
+    ruta_modificado = obtener_ruta('FicherosModificados_Datos', fichero_modificado)
+    Verificacion.borrar_resumen(ruta_modificado)
+    escribir_fichero_modificado(script_sql, ruta_modificado + '.tmp', formato, filas_por_lote, bytes_por_lote, compresion)
+    os.replace(ruta_modificado + '.tmp', ruta_modificado)
+    if resumen is not None:
+        Verificacion.guardar_resumen(ruta_modificado, resumen)
+
+    medidas = cronometro.terminar()
+    medidas['filas'] = cronometro.filas
+    medidas['bytes_leidos'] = os.path.getsize(obtener_ruta('DumpFolder', fichero))
+    medidas['bytes_escritos'] = os.path.getsize(ruta_modificado)
+    return fichero_modificado, marca['hasta'], medidas
+
+# Función que obtiene el nombre del fichero transformado de un volcado según su formato y su compresión
+def nombre_fichero_modificado(fichero, formato='sql', compresion=None):
+    fichero = MAPEOS[fichero].fichero_modificado or fichero
+    extension = EXTENSIONES_COMPRESION[compresion] if compresion else ''
+    return fichero.replace('.sql', f'_modificado.{formato}') + extension
+
+# Función que guarda las sentencias transformadas en el formato indicado.
+# cabecera solo se usa en los ficheros TSV (ver escribir_fichero_tsv)
+def escribir_fichero_modificado(sentencias, ruta_guardar, formato='sql', filas_por_lote=None, bytes_por_lote=None, compresion=None,
+                                cabecera=None):
+    if formato == 'tsv':
+        escribir_fichero_tsv(sentencias, ruta_guardar, compresion, cabecera)
+    else:
+        escribir_fichero_sql(sentencias, ruta_guardar, filas_por_lote, bytes_por_lote, compresion)
+
+# Función que descarta las filas ya migradas en una ejecución anterior y guarda en la marca el mayor Id leído.
+# Solo se usa en tablas cuyo Id del volcado siempre crece (las filas nuevas se añaden al final)
+def filtrar_marca(filas, marca, indice=0):
+    desde = marca['desde']
+    hasta = marca['hasta']
+    for valores in filas:
+        identificador = valores[indice]
+        if hasta is None or identificador > hasta:
+            hasta = identificador
+        if desde is None or identificador > desde:
+            yield valores
+    marca['hasta'] = hasta
+
+# Función que guarda las sentencias transformadas en un script SQL.
+# Sin límites de lote se mantiene un INSERT por cada INSERT del volcado
+def escribir_fichero_sql(sentencias, ruta_guardar, filas_por_lote=None, bytes_por_lote=None, compresion=None):
+    if filas_por_lote or bytes_por_lote:
+        sentencias = dividir_inserciones(sentencias, filas_por_lote, bytes_por_lote)
+
+    with abrir_fichero(ruta_guardar, 'wt', compresion, encoding='utf-8') as file:
+        for sentencia in sentencias:
+            if isinstance(sentencia, Insercion):
+                sentencia = formatear_insercion(sentencia)
+            file.write(sentencia + '\n')
+
+# Función que guarda las filas de los INSERT transformados en un fichero para LOAD DATA.
+# Los bloqueos de tablas no se guardan porque la carga masiva no los necesita.
+# La cabecera con las columnas se toma del primer INSERT; si se indica cabecera se escribe esa en su lugar
+# ('' para no escribir ninguna, en las partes de un fichero que no son la primera)
+def escribir_fichero_tsv(sentencias, ruta_guardar, compresion=None, cabecera=None):
+    with abrir_fichero(ruta_guardar, 'wt', compresion, encoding='utf-8', newline='\n') as file:
+        if cabecera is not None:
+            file.write(cabecera)
+        cabecera = cabecera is not None
+        for sentencia in sentencias:
+            if not isinstance(sentencia, Insercion):
+                if not sentencia.startswith("INSERT INTO"):
+                    continue
+                sentencia = leer_insercion(sentencia)
+
+            if not cabecera:
+                file.write('\t'.join(sentencia.columnas or []) + '\n')
+                cabecera = True
+
+            file.writelines(formatear_fila_tsv(valores) for valores in sentencia.filas)
+
+        # Un volcado sin filas genera igualmente la cabecera
+        if not cabecera:
+            file.write('\n')
+
+# Función que filtra las sentencias del volcado dejando solo los bloqueos y los INSERT
+def generarScript(sentencias):
+    for linea in sentencias:
         # Incluir linea para bloquear y desbloquear tablas
-        if "INSERT INTO" in linea:
-            bandera = 0
-
-            # Modificar el orden del centro de coste SAP
-            sentencias = re.findall(r"\(([^()]*?(?:'[^']*'[^()]*)*?)\)", linea)
-            valores_modificados = []
-            for sentencia in sentencias:
-                if bandera == 0:
-                    bandera = 1
-
-                valores = sentencia.split(',')
-                centroCosteSAP = valores.pop(1)
-                valores.insert(3, centroCosteSAP)
-                valores_modificados.append(f"({','.join(valores)})")
-
-                if bandera == 1:
-                    bandera = 2
-                    valores_modificados[0] = f"INSERT INTO `centrosdecostes` (Id, DescripcionES, DescripcionEN, CentroCosteSAP, IdPlanta) VALUES " + valores_modificados[0]
-
-            lineas_modificadas.append({','.join(valores_modificados) + ';'})
-        else:
-            # Incluir estas líneas tal y cómo están
-            lineas_modificadas.append(linea)
-    
-    return '\n'.join(str(linea).strip('{""}') for linea in lineas_modificadas)
-
-# Función que cambia el orden de la localizacion SAP
-def Localizaciones(script_sql):
-    lineas_modificadas = []
-    for linea in script_sql.splitlines():
-        # Incluir linea para bloquear y desbloquear tablas
-        if "INSERT INTO" in linea:
-            bandera = 0
-
-            # Modificar el orden de la localizacion SAP
-            sentencias = re.findall(r"\(([^()]*?(?:'[^']*'[^()]*)*?)\)", linea)
-            valores_modificados = []
-            for sentencia in sentencias:
-                if bandera == 0:
-                    bandera = 1
-
-                valores = sentencia.split(',')
-                valores_modificados.append(f"({','.join(valores)})")
-
-                if bandera == 1:
-                    bandera = 2
-                    valores_modificados[0] = f"INSERT INTO `localizaciones` (Id, DescripcionES, DescripcionEN, LocalizacionSAP, Latitud, Longitud, ContactoRepuestos, IdPlanta) VALUES " + valores_modificados[0]
-
-            lineas_modificadas.append({','.join(valores_modificados) + ';'})
-        else:
+        if linea.startswith(("LOCK TABLES", "INSERT INTO", "UNLOCK TABLES")):
             # Incluir estas líneas tal y cómo están
-            lineas_modificadas.append(linea)
-    
-    return '\n'.join(str(linea).strip('{""}') for linea in lineas_modificadas)
-
-# Función que cambia el nombre de la tabla TiposIncidencias
-def MecanismosDeFallo(script_sql):
-    lineas_modificadas = []
-    for linea in script_sql.splitlines():
-        if "LOCK TABLE" in linea:
-            lineas_modificadas.append(re.sub(r'`([^`]*)`', '`mecanismosdefallo`', linea))
-        elif "INSERT INTO" in linea:
-            lineas_modificadas.append(re.sub(r'`([^`]*)`', '`mecanismosdefallo` (Id, DescripcionES, DescripcionEN)', linea))
-        else:
-            lineas_modificadas.append(linea)
-
-    return '\n'.join(str(linea).strip('{""}') for linea in lineas_modificadas)
-
-# Función que cambia el nombre de la tabla Estados
-def EstadosOrden(script_sql):
-    lineas_modificadas = []
-    for linea in script_sql.splitlines():
-        if "LOCK TABLE" in linea or "INSERT INTO" in linea:
-            lineas_modificadas.append(re.sub(r'`([^`]*)`', '`estadosorden`', linea))
-        else:
-            lineas_modificadas.append(linea)
-
-    return '\n'.join(str(linea).strip('{""}') for linea in lineas_modificadas)
-
-# Función que cambia el nombre de la tabla Estados
-def UsuariosOrdenes(script_sql):
-    lineas_modificadas = []
-    for linea in script_sql.splitlines():
-        linea_insertar = ""
-        # Incluir linea para bloquear y desbloquear tablas
-        if "INSERT INTO" in linea:
-            bandera = 0
-
-            sentencias = re.findall(r"\(([^()]*?(?:'[^']*'[^()]*)*?)\)", linea)
-            valores_modificados = []
-            for sentencia in sentencias:
-                if bandera == 0:
-                    bandera = 1
-
-                valores = sentencia.split(',')
-                valores[0] = '"' + modificar_Usuario(valores[0], '') + '"'
-
-                valor_insertar = "(" + ",".join(valores) + ")"
-                valores_modificados.append(valor_insertar)
-
-                if bandera == 1:
-                    bandera = 2
-                    valores_modificados[0] = "INSERT INTO `usuarios_ordenes` VALUES " + valores_modificados[0]
-
-            linea_insertar = ",".join(valores_modificados) + ';'
-            lineas_modificadas.append(linea_insertar)
-        else:
-            if "WRITE;" in linea:
-                lineas_modificadas.append(re.sub(r'`([^`]*)`', '`usuarios_ordenes`', linea))
+            yield linea
+
+# Caracteres que mysqldump siempre escapa dentro de las cadenas, por lo que nunca aparecen tal cual en un INSERT.
+# Se usan para marcar las barras y comillas escapadas antes de separar la lista VALUES por las comillas
+MARCA_BARRA = '\0'
+MARCA_COMILLA = '\x1a'
+
+# Secuencias de escape que utiliza mysqldump dentro de las cadenas
+SECUENCIA_ESCAPE = re.compile(r"\x00|\x1a|\\(.)", re.S)
+ESCAPES_MYSQL = {'0': '\0', 'b': '\b', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\x1a'}
+CARACTERES_ESCAPAR = re.compile(r"[\\'\0\n\r\x1a]")
+ESCAPAR_MYSQL = str.maketrans({'\\': '\\\\', "'": "\\'", '\0': '\\0', '\n': '\\n', '\r': '\\r', '\x1a': '\\Z'})
+
+# Valor que ocupa el lugar de cada cadena en el texto de fuera de las cadenas. Los números, los NULL y los paréntesis
+# que quedan se leen como un array JSON, que json decodifica en C. Los decimales se leen como Decimal, igual que leer_numero
+VALOR_CADENA = 'true'
+DECODIFICADOR_VALORES = json.JSONDecoder(parse_float=Decimal)
+
+# Función que devuelve cada tupla con sus valores tipados de la lista VALUES de un INSERT
+def tokenizar_valores(linea):
+    """ Devuelve cada tupla como una lista: NULL -> None, números -> int/Decimal y cadenas -> str sin escapes. """
+    inicio = linea.find(' VALUES ')
+    if inicio == -1:
+        raise ValueError(f"La sentencia no contiene una lista VALUES: {linea[:100]}")
+    return separar_valores(linea[inicio + 8:].rstrip().rstrip(';'))
+
+# Función que separa la lista VALUES en el texto de fuera de las cadenas y el contenido de cada cadena.
+# Las barras y las comillas escapadas se marcan antes de separar por las comillas, y una comilla doblada ('') deja un trozo
+# vacío fuera de las cadenas que vuelve a unir la cadena con la siguiente. Devuelve los trozos de fuera y las cadenas sin escapes
+def separar_cadenas(lista):
+    escapada = '\\' in lista
+    if escapada:
+        lista = lista.replace('\\\\', MARCA_BARRA).replace("\\'", MARCA_COMILLA)
+
+    trozos = lista.split("'")
+    if len(trozos) % 2 == 0:
+        raise ValueError(f"Cadena sin cerrar en la lista VALUES: {lista[:100]}")
+    fuera = trozos[0::2]
+    cadenas = trozos[1::2]
+
+    if "''" in lista:
+        fuera = [fuera[0]]
+        unidas = []
+        for cadena, trozo in zip(cadenas, trozos[2::2]):
+            if unidas and not fuera[-1]:
+                unidas[-1] += MARCA_COMILLA + cadena
+                fuera[-1] = trozo
+                escapada = True
             else:
-                lineas_modificadas.append(linea)
-
-    return "\n".join(linea for linea in lineas_modificadas)
-
-# Función que cambia el nombre de la tabla Estados
-def HistorialUsuariosOrdenes(script_sql):
-    lineas_modificadas = []
-    for linea in script_sql.splitlines():
-        linea_insertar = ""
-        # Incluir linea para bloquear y desbloquear tablas
-        if "INSERT INTO" in linea:
-            bandera = 0
-
-            sentencias = re.findall(r"\(([^()]*?(?:'[^']*'[^()]*)*?)\)", linea)
-            valores_modificados = []
-            for sentencia in sentencias:
-                if bandera == 0:
-                    bandera = 1
-
-                valores = sentencia.split(',')
-                if valores[3] != 'NULL':
-                    valores[3] = '"' + modificar_Usuario(valores[3], '') + '"'
-                if valores[4] != 'NULL':
-                    valores[4] = '"' + modificar_Usuario(valores[4], '') + '"'
-
-                valor_insertar = "(" + ",".join(valores) + ")"
-                valores_modificados.append(valor_insertar)
-
-                if bandera == 1:
-                    bandera = 2
-                    valores_modificados[0] = "INSERT INTO `historialcambiosusuariosordenes` VALUES " + valores_modificados[0]
-
-            linea_insertar = ",".join(valores_modificados) + ';'
-            lineas_modificadas.append(linea_insertar)
-        else:
-            if "WRITE;" in linea:
-                lineas_modificadas.append(re.sub(r'`([^`]*)`', '`historialcambiosusuariosordenes`', linea))
-            else:
-                lineas_modificadas.append(linea)
-
-    return "\n".join(linea for linea in lineas_modificadas)
-
-# Función que cambia el nombre de la tabla TiposOrdenes
-def TiposOrdenes(script_sql):
-    lineas_modificadas = []
-    for linea in script_sql.splitlines():
-        if "LOCK TABLE" in linea or "INSERT INTO" in linea:
-            lineas_modificadas.append(re.sub(r'`([^`]*)`', '`tiposorden`', linea))
-        else:
-            lineas_modificadas.append(linea)
-
-    return '\n'.join(str(linea).strip('{""}') for linea in lineas_modificadas)
-
-# Función que cambia el nombre de la tabla TiposIncidencias
-def Resoluciones(script_sql):
-    lineas_modificadas = []
-    for linea in script_sql.splitlines():
-        if "INSERT INTO" in linea:
-            lineas_modificadas.append(re.sub(r'`([^`]*)`', '`resoluciones` (Id, DescripcionES, DescripcionEN)', linea))
-        else:
-            lineas_modificadas.append(linea)
-
-    return '\n'.join(str(linea).strip('{""}') for linea in lineas_modificadas)
-
-# Función que modificar los tipos de datos de los activos y los cambia según los diccionarios correspondientes
-def Activos(script_sql):
-    lineas_modificadas = []
-    for linea in script_sql.splitlines():
-        # Incluir linea para bloquear y desbloquear tablas
-        if "INSERT INTO" in linea:
-            bandera = 0
-
-            sentencias = re.findall(r"\(([^()]*?(?:'[^']*'[^()]*)*?)\)", linea)
-            valores_modificados = []
-            for sentencia in sentencias:
-                if bandera == 0:
-                    bandera = 1
-
-                valores = list(csv.reader([sentencia], quotechar="'", skipinitialspace=True))[0]
-
-                for i in range(2, 4):
-                    valores[i] = "'" + valores[i] + "'"
-
-                for i in range(4, 8):
-                    if valores[i] == "" or valores[i] == "NULL":
-                        valores[i] = "0"
-                    else:
-                        valores[i] = valores[i].strip("'")
-
-                if valores[8] == "NULL" or valores[8] == "":
-                    valores[8] = "0"
-                else:
-                    valores[8] = valores[8].replace('%', '').strip("'")  # Modificar valor de valor_criticidad
-                
-                valores[9] = modificar_IdCriticidad(valores[9])  # Modificar valor de criticidad
-                valores[13] = modificar_Actividad(valores[13])  # Modificar valor de actividad
-                valores.pop(12)  # Eliminamos el valor de nivel_maximo
-
-                valores_modificados.append(f"({','.join(valores)})")
-
-                if bandera == 1:
-                    bandera = 2
-                    valores_modificados[0] = "INSERT INTO `activos` (Id, ActivoSAP, DescripcionES, DescripcionEN, Redundancia, Hse, Usabilidad, Coste, ValorCriticidad, IdCriticidad, IdLocalizacion, IdCentroCoste, IdEstadoActivo) VALUES " + valores_modificados[0]
-
-            lineas_modificadas.append({','.join(valores_modificados) + ';'})
+                unidas.append(cadena)
+                fuera.append(trozo)
+        cadenas = unidas
+
+    if escapada:
+        cadenas = [SECUENCIA_ESCAPE.sub(desescapar_caracter, cadena)
+                   if '\\' in cadena or MARCA_BARRA in cadena or MARCA_COMILLA in cadena else cadena
+                   for cadena in cadenas]
+    return fuera, cadenas
+
+# Función que recorre la lista VALUES y devuelve sus tuplas tipadas. Las cadenas se separan primero, así que las comas,
+# paréntesis y NULL que contienen no se confunden con los de fuera
+def separar_valores(lista):
+    fuera, cadenas = separar_cadenas(lista)
+    texto = VALOR_CADENA.join(fuera)
+    if texto.count(VALOR_CADENA) != len(cadenas):
+        raise ValueError(f"Valor no reconocido en la lista VALUES: {lista[:100]}")
+    try:
+        filas = DECODIFICADOR_VALORES.decode('[' + texto.replace('NULL', 'null').replace('(', '[').replace(')', ']') + ']')
+    except ValueError:
+        raise ValueError(f"Valor no reconocido en la lista VALUES: {lista[:100]}") from None
+    if not cadenas:
+        return filas
+    siguiente = iter(cadenas).__next__
+    return [[siguiente() if valor is True else valor for valor in valores] for valores in filas]
+
+# Función que devuelve el primer valor (el Id) de la última fila de un INSERT
+def ultimo_id(linea):
+    ultima = None
+    for ultima in tokenizar_valores(linea):
+        pass
+    return ultima[0] if ultima else None
+
+# Función que sustituye una secuencia de escape de mysqldump por su carácter
+def desescapar_caracter(secuencia):
+    caracter = secuencia.group(1)
+    if caracter is None:
+        return '\\' if secuencia.group(0) == MARCA_BARRA else "'"
+    return ESCAPES_MYSQL.get(caracter, caracter)
+
+# Función que convierte un número del volcado manteniendo su precisión
+def leer_numero(texto):
+    try:
+        return int(texto)
+    except ValueError:
+        try:
+            return Decimal(texto)
+        except InvalidOperation:
+            raise ValueError(f"Valor no reconocido en el volcado: {texto}") from None
+
+# Función que convierte a número un valor del volcado, tomando los valores vacíos como 0
+def convertir_numero(valor, caracteres_eliminar=''):
+    if valor is None or valor == '':
+        return 0
+
+    if isinstance(valor, str):
+        for caracter in caracteres_eliminar:
+            valor = valor.replace(caracter, '')
+        return leer_numero(valor.strip())
+
+    return valor
+
+# Función que escribe un valor tipado como literal SQL
+def formatear_valor(valor):
+    if valor is None:
+        return 'NULL'
+
+    if valor.__class__ is str:
+        return "'" + (valor.translate(ESCAPAR_MYSQL) if CARACTERES_ESCAPAR.search(valor) else valor) + "'"
+
+    return str(valor)
+
+# Función que escribe una tupla de valores tipados para la lista VALUES de un INSERT
+def formatear_tupla(valores):
+    # Se resuelven aquí los casos más comunes para no llamar a formatear_valor por cada valor
+    return '(' + ','.join(['NULL' if valor is None else str(valor) if valor.__class__ is not str else formatear_valor(valor) for valor in valores]) + ')'
+
+# Sentencia INSERT separada en la tabla, las columnas (None si son todas) y las filas tipadas
+Insercion = namedtuple('Insercion', ['tabla', 'columnas', 'filas'])
+
+# Expresión que separa la tabla y la lista de columnas de la cabecera de un INSERT
+CABECERA_INSERT = re.compile(r"INSERT INTO `([^`]*)`\s*(?:\(([^)]*)\)\s*)?VALUES ")
+
+# Función que convierte el texto de un INSERT en una Insercion
+def leer_insercion(linea):
+    cabecera = CABECERA_INSERT.match(linea)
+    if cabecera is None:
+        raise ValueError(f"No se reconoce la cabecera del INSERT: {linea[:100]}")
+
+    columnas = [columna.strip(' `') for columna in cabecera.group(2).split(',')] if cabecera.group(2) else None
+    return Insercion(cabecera.group(1), columnas, tokenizar_valores(linea))
+
+# Función que escribe una Insercion como sentencia INSERT
+def formatear_insercion(insercion):
+    columnas = f" ({', '.join(insercion.columnas)})" if insercion.columnas else ''
+    return f"INSERT INTO `{insercion.tabla}`{columnas} VALUES " + ','.join([formatear_tupla(valores) for valores in insercion.filas]) + ';'
+
+# Función que reparte las filas de los INSERT en sentencias de como máximo filas_por_lote filas y bytes_por_lote bytes.
+# Las filas de INSERT consecutivos de la misma tabla se juntan para que todos los lotes tengan el tamaño indicado
+def dividir_inserciones(sentencias, filas_por_lote=None, bytes_por_lote=None):
+    cabecera = None
+    lote = []
+    tamano = 0
+    for sentencia in sentencias:
+        if not isinstance(sentencia, Insercion):
+            if not sentencia.startswith("INSERT INTO"):
+                if lote:
+                    yield cabecera + ','.join(lote) + ';'
+                    lote = []
+                yield sentencia
+                continue
+            sentencia = leer_insercion(sentencia)
+
+        columnas = f" ({', '.join(sentencia.columnas)})" if sentencia.columnas else ''
+        nueva_cabecera = f"INSERT INTO `{sentencia.tabla}`{columnas} VALUES "
+        if nueva_cabecera != cabecera:
+            if lote:
+                yield cabecera + ','.join(lote) + ';'
+                lote = []
+            cabecera = nueva_cabecera
+
+        for valores in sentencia.filas:
+            tupla = formatear_tupla(valores)
+            # La coma o el punto y coma que acompaña a cada tupla cuenta como un byte más
+            bytes_tupla = (len(tupla) if tupla.isascii() else len(tupla.encode('utf-8'))) + 1
+
+            if lote and ((filas_por_lote and len(lote) >= filas_por_lote) or
+                         (bytes_por_lote and tamano + bytes_tupla > bytes_por_lote)):
+                yield cabecera + ','.join(lote) + ';'
+                lote = []
+
+            if not lote:
+                tamano = len(cabecera.encode('utf-8'))
+            lote.append(tupla)
+            tamano += bytes_tupla
+
+    if lote:
+        yield cabecera + ','.join(lote) + ';'
+
+# Caracteres que hay que escapar en los ficheros de carga masiva (formato por defecto de LOAD DATA)
+CARACTERES_ESCAPAR_TSV = re.compile(r"[\\\t\n\r\0\x1a]")
+ESCAPAR_TSV = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\0': '\\0', '\x1a': '\\Z'})
+SECUENCIA_ESCAPE_TSV = re.compile(r"\\(.)", re.S)
+
+# Función que escribe una fila tipada como línea de un fichero de carga masiva
+def formatear_fila_tsv(valores):
+    return '\t'.join(['\\N' if valor is None else str(valor) if valor.__class__ is not str
+                      else valor.translate(ESCAPAR_TSV) if CARACTERES_ESCAPAR_TSV.search(valor) else valor
+                      for valor in valores]) + '\n'
+
+# Función que obtiene el valor de un campo de un fichero de carga masiva
+def leer_campo_tsv(campo):
+    return None if campo == '\\N' else SECUENCIA_ESCAPE_TSV.sub(desescapar_caracter, campo) if '\\' in campo else campo
+
+# Función que lee un fichero de carga masiva. La primera línea contiene las columnas y el resto las filas
+def leer_fichero_tsv(ruta_fichero):
+    with abrir_fichero(ruta_fichero, 'rt', compresion_fichero(ruta_fichero), encoding='utf-8', newline='\n') as file:
+        file.readline()
+        for linea in file:
+            yield [leer_campo_tsv(campo) for campo in linea[:-1].split('\t')]
+
+# Función que lee las columnas de la cabecera de un fichero de carga masiva
+def leer_columnas_tsv(ruta_fichero):
+    with abrir_fichero(ruta_fichero, 'rt', compresion_fichero(ruta_fichero), encoding='utf-8', newline='\n') as file:
+        cabecera = file.readline().rstrip('\n')
+    return cabecera.split('\t') if cabecera else None
+
+# Descripción de cómo se migra cada fichero del volcado:
+#  - tabla: tabla de destino
+#  - columnas: columnas de destino en el orden del INSERT (None si se insertan todas las de la tabla)
+#  - origen: posición en la fila del volcado de cada columna de destino (None si se copian todas en su orden).
+#    Las posiciones del volcado que no aparecen se descartan
+#  - conversores: conversor de cada posición del volcado: 'texto', 'numero', 'porcentaje' o el nombre de una tabla de reemplazo
+#  - marca: posición del Id creciente que sirve de marca para la migración incremental
+#  - fichero_modificado: nombre con el que se guarda el fichero transformado, si no es el del volcado
+#  - clave_generada: clave primaria AUTO_INCREMENT que no está en el fichero y genera MySQL al insertar. Sus filas no se pueden
+#    repetir con upserts, por lo que al reanudar su carga se borran las que se insertaron tras el último punto de control
+#  - obligatorias: posiciones del volcado con conversor cuya columna de destino es parte de la clave o NOT NULL. Un valor sin
+#    reemplazo (o un NULL en las que se insertan como texto) detiene la transformación en lugar de insertarse como NULL
+#  - clave_verificacion: posiciones en la fila transformada de las columnas con las que se verifica la carga (módulo
+#    Verificacion). Por defecto solo la primera
+Mapeo = namedtuple('Mapeo', ['tabla', 'columnas', 'origen', 'conversores', 'marca', 'fichero_modificado', 'clave_generada',
+                             'obligatorias', 'clave_verificacion'],
+                   defaults=[None, None, None, None, None, None, None, None])
+
+# Mapeo de cada fichero del volcado. Para migrar una tabla nueva basta con añadir aquí su mapeo
+MAPEOS = {
+    'hitachi_empresas.sql': Mapeo('empresas'),
+    'hitachi_plantas.sql': Mapeo('plantas', ['Id', 'Descripcion', 'StmpConfig', 'Latitud', 'Longitud', 'IdEmpresa']),
+    # Se cambia el orden del centro de coste SAP
+    'hitachi_centrosdecostes.sql': Mapeo('centrosdecostes', ['Id', 'DescripcionES', 'DescripcionEN', 'CentroCosteSAP', 'IdPlanta'],
+                                         origen=[0, 2, 3, 1, 4]),
+    'hitachi_localizaciones.sql': Mapeo('localizaciones', ['Id', 'DescripcionES', 'DescripcionEN', 'LocalizacionSAP', 'Latitud', 'Longitud', 'ContactoRepuestos', 'IdPlanta']),
+    'hitachi_tiposincidencias.sql': Mapeo('mecanismosdefallo', ['Id', 'DescripcionES', 'DescripcionEN'],
+                                          fichero_modificado='hitachi_mecanismosdefallo.sql'),
+    'hitachi_incidencias.sql': Mapeo('incidencias', ['Id', 'DescripcionES', 'DescripcionEN', 'IdMecanismoFallo']),
+    'hitachi_resoluciones.sql': Mapeo('resoluciones', ['Id', 'DescripcionES', 'DescripcionEN']),
+    # Se descarta el nivel máximo (12) y se traducen la criticidad y la actividad
+    'hitachi_activos.sql': Mapeo('activos', ['Id', 'ActivoSAP', 'DescripcionES', 'DescripcionEN', 'Redundancia', 'Hse', 'Usabilidad', 'Coste', 'ValorCriticidad', 'IdCriticidad', 'IdLocalizacion', 'IdCentroCoste', 'IdEstadoActivo'],
+                                 origen=[0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 13],
+                                 conversores={2: 'texto', 3: 'texto', 4: 'numero', 5: 'numero', 6: 'numero', 7: 'numero',
+                                              8: 'porcentaje', 9: 'criticidad', 13: 'actividad'},
+                                 obligatorias=[2, 9, 13]),
+    'hitachi_componentes.sql': Mapeo('componentes', ['Id', 'Denominacion', 'DescripcionES', 'DescripcionEN', 'IdComponentePadre']),
+    'hitachi_activo_componentes.sql': Mapeo('activo_componentes', clave_verificacion=[0, 1]),
+    'hitachi_estados.sql': Mapeo('estadosorden'),
+    'hitachi_tipos_ordenes.sql': Mapeo('tiposorden'),
+    # Las fechas, comentarios y el tiempo de parada se insertan como texto y se descarta la fecha de anulación (14)
+    'hitachi_ordenes.sql': Mapeo('ordenes', ['Id', 'IdSAP', 'FechaCreacion', 'FechaApertura', 'ComentarioOrden', 'FechaCierre', 'ComentarioResolucion', 'TiempoParada', 'Confirmada', 'IdActivo', 'IdEstadoOrden', 'IdUsuarioCreador', 'IdTipoOrden', 'Materiales'],
+                                 origen=list(range(14)),
+                                 conversores={1: 'texto', 2: 'texto', 3: 'texto', 4: 'texto', 5: 'texto', 6: 'texto', 7: 'texto',
+                                              11: 'usuarios_creadores', 13: 'texto'},
+                                 obligatorias=[11]),
+    # Se descartan el Id Auto_increment (0), que genera MySQL, y el repuesto (7). El Id del volcado sirve de marca para no repetir incidencias.
+    # Como el Id no está en el fichero, la carga se verifica con la orden, el componente y la incidencia
+    'hitachi_orden_incidencias_resolucion.sql': Mapeo('incidenciasordenes', ['FechaDeteccion', 'IdOrden', 'IdComponente', 'IdIncidencia', 'IdResolucion', 'FechaResolucion', 'ParoMaquina', 'CambioPieza', 'AfectaProduccion'],
+                                                      origen=[1, 2, 3, 4, 5, 6, 8, 9, 10],
+                                                      conversores={1: 'texto', 6: 'texto'}, marca=0, clave_generada='Id',
+                                                      clave_verificacion=[1, 2, 3]),
+    'hitachi_usuarios_orden.sql': Mapeo('usuarios_ordenes', conversores={0: 'usuarios'}, obligatorias=[0], clave_verificacion=[0, 1]),
+    'hitachi_historial_modificaciones_usuarios_ordenes.sql': Mapeo('historialcambiosusuariosordenes', conversores={3: 'usuarios', 4: 'usuarios'}, marca=0)
+}
+
+# Variable de entorno con un fichero JSON de mapeos que se añaden a MAPEOS o cambian los suyos, para migrar los volcados de
+# otras fuentes (la usa MigracionFuentes). Al ser del entorno la heredan también los procesos que transforman los ficheros
+VARIABLE_MAPEOS = 'MIGRACION_MAPEOS'
+
+# Función que aplica los mapeos de un fichero JSON. Cada entrada es un fichero del volcado con los campos de su Mapeo que cambian;
+# con 'base' se parte del mapeo de otro fichero (por ejemplo, el de Hitachi de la misma tabla) en lugar del suyo
+def aplicar_mapeos(ruta_mapeos):
+    with open(ruta_mapeos, 'r', encoding='utf-8') as file:
+        cambios = json.load(file)
+
+    for fichero, campos in cambios.items():
+        campos = dict(campos)
+        base = campos.pop('base', fichero)
+        if base not in MAPEOS and base != fichero:
+            raise ValueError(f"El mapeo de {fichero} parte del de {base}, que no existe")
+        # Las posiciones de los conversores son claves de texto en JSON
+        if campos.get('conversores') is not None:
+            campos['conversores'] = {int(indice): nombre for indice, nombre in campos['conversores'].items()}
+        mapeo = MAPEOS.get(base, Mapeo(None))
+        if base != fichero:
+            # El nombre del fichero transformado de la base es el de su volcado
+            mapeo = mapeo._replace(fichero_modificado=None)
+        mapeo = mapeo._replace(**campos)
+        if not mapeo.tabla:
+            raise ValueError(f"El mapeo de {fichero} no indica su tabla")
+        MAPEOS[fichero] = mapeo
+
+if os.environ.get(VARIABLE_MAPEOS):
+    aplicar_mapeos(os.environ[VARIABLE_MAPEOS])
+
+# Expresión que localiza el nombre de la tabla en una sentencia del volcado
+NOMBRE_TABLA = re.compile(r'`([^`]*)`')
+
+# Función que convierte a texto un valor del volcado, manteniendo los NULL
+def convertir_texto(valor):
+    return None if valor is None else str(valor)
+
+# Función que convierte a número un porcentaje del volcado
+def convertir_porcentaje(valor):
+    return convertir_numero(valor, '%')
+
+# Conversores que no dependen de una tabla de reemplazo
+CONVERSORES = {
+    'texto': convertir_texto,
+    'numero': convertir_numero,
+    'porcentaje': convertir_porcentaje
+}
+
+# Función que describe la columna de destino de una posición del volcado para los mensajes de error
+def describir_columna(mapeo, indice):
+    posicion = indice if mapeo.origen is None else mapeo.origen.index(indice)
+    return f"{mapeo.tabla}.{mapeo.columnas[posicion]}" if mapeo.columnas else f"{mapeo.tabla} (columna {posicion + 1})"
+
+# Función que devuelve la columna de destino de una posición si es obligatoria, para los mensajes de error, o None si no lo es
+def columna_obligatoria(mapeo, indice):
+    return describir_columna(mapeo, indice) if indice in (mapeo.obligatorias or ()) else None
+
+# Función que convierte a texto el valor de una columna obligatoria, que no puede ser NULL
+def convertir_texto_obligatorio(valor, columna):
+    if valor is None:
+        raise ValueError(f"Valor NULL en la columna obligatoria {columna}")
+    return str(valor)
+
+# Función que crea el conversor de una posición. Los que no son de CONVERSORES traducen el valor con su tabla de reemplazo.
+# columna es la columna de destino si es obligatoria (ver columna_obligatoria)
+def crear_conversor(nombre, desconocidos, columna=None):
+    if nombre == 'texto' and columna is not None:
+        return lambda valor: convertir_texto_obligatorio(valor, columna)
+    if nombre in CONVERSORES:
+        return CONVERSORES[nombre]
+
+    reemplazos = leer_reemplazos(nombre)
+    return lambda valor: reemplazar(reemplazos, valor, nombre, desconocidos, columna)
+
+# Plan de columnas de una tabla:
+#  - selector: función que toma de la fila del volcado las columnas de destino en su orden (None si se copian todas)
+#  - textos: columnas de destino que se convierten a texto, que se resuelven sin llamar a ningún conversor
+#  - conversiones: resto de columnas de destino con su conversor
+PlanColumnas = namedtuple('PlanColumnas', ['selector', 'textos', 'conversiones'])
+
+# Función que calcula una sola vez por tabla el plan de columnas del mapeo
+def compilar_plan(mapeo, desconocidos):
+    # Posición en la fila de destino de cada posición del volcado que se conserva
+    if mapeo.origen is None:
+        selector = None
+        destino = lambda indice: indice
+    else:
+        selector = operator.itemgetter(*mapeo.origen) if len(mapeo.origen) > 1 else lambda valores: (valores[mapeo.origen[0]],)
+        destino = mapeo.origen.index
+
+    textos = []
+    conversiones = []
+    for indice, nombre in (mapeo.conversores or {}).items():
+        if mapeo.origen is not None and indice not in mapeo.origen:
+            continue
+        columna = columna_obligatoria(mapeo, indice)
+        if nombre == 'texto' and columna is None:
+            textos.append(destino(indice))
         else:
-            # Incluir estas líneas tal y cómo están
-            lineas_modificadas.append(linea)
-    
-    return '\n'.join(str(linea).strip('{""}') for linea in lineas_modificadas)
-
-# Función que modifica los datos para insertar en la tabla Ordenes
-def Ordenes(script_sql):
-    lineas_modificadas = []
-    for linea in script_sql.splitlines():
-        linea_insertar = ""
-        # Incluir linea para bloquear y desbloquear tablas
-        if "INSERT INTO" in linea:
-            bandera = 0
+            conversiones.append((destino(indice), crear_conversor(nombre, desconocidos, columna)))
+
+    return PlanColumnas(selector, textos, conversiones)
+
+# Función que aplica a las sentencias del volcado el mapeo de su tabla.
+# Si el mapeo solo cambia el nombre y las columnas de la tabla, los INSERT se reescriben sin separar sus filas.
+# Con columnar los INSERT se transforman por columnas con NumPy (módulo Columnar) cuando el mapeo lo permite.
+# El cronómetro separa el tiempo de analizar los INSERT del de transformarlos y cuenta las filas generadas.
+# Si se pasa desconocidos, los valores sin reemplazo se acumulan ahí para informar de ellos junto a los de otras partes del fichero.
+# Si se pasa resumen (Verificacion.nuevo_resumen) se acumulan en él los tramos de las filas generadas para verificar la carga
+def transformar_sentencias(mapeo, sentencias, marca=None, columnar=False, cronometro=None, desconocidos=None, resumen=None):
+    marca = marca or {'desde': None, 'hasta': None}
+    cronometro = cronometro or informe.Cronometro('transformar')
+    informar = desconocidos is None
+    desconocidos = Counter() if informar else desconocidos
+    selector, textos, conversiones = compilar_plan(mapeo, desconocidos)
+    solo_cabecera = selector is None and not textos and not conversiones and mapeo.marca is None
+
+    plan_columnar = None
+    if columnar:
+        # Se importa aquí porque Columnar usa las funciones de este módulo y NumPy es opcional
+        import Columnar
+        plan_columnar = Columnar.compilar_plan(mapeo, desconocidos)
+
+    acumular = None
+    if resumen is not None:
+        # Se importa aquí porque Verificacion usa las funciones de este módulo
+        import Verificacion
+        acumular = Verificacion.acumular_insercion
+
+    lista_columnas = f" ({', '.join(mapeo.columnas)})" if mapeo.columnas else ''
+    cabecera = f"INSERT INTO `{mapeo.tabla}`{lista_columnas} VALUES "
+
+    for linea in sentencias:
+        if linea.startswith("INSERT INTO"):
+            # En los INSERT que no se separan en filas, las filas se cuentan por sus separadores
+            if solo_cabecera:
+                cronometro.filas += linea.count('),(') + 1
+                sentencia = cabecera + linea[linea.index(' VALUES ') + 8:]
+                if acumular is not None:
+                    acumular(resumen, sentencia)
+                yield sentencia
+                continue
+
+            if plan_columnar is not None:
+                transformada = Columnar.transformar_insercion(plan_columnar, linea, marca)
+                if transformada is not None:
+                    sentencia, filas = transformada
+                    if filas:
+                        cronometro.filas += filas
+                        if acumular is not None:
+                            acumular(resumen, sentencia)
+                        yield sentencia
+                    continue
+
+            cronometro.cambiar('analizar')
+            try:
+                filas = list(tokenizar_valores(linea))
+            finally:
+                cronometro.cambiar()
+            if mapeo.marca is not None:
+                filas = filtrar_marca(filas, marca, mapeo.marca)
 
-            sentencias = re.findall(r"\(([^()]*?(?:'[^']*'[^()]*)*?)\)", linea)
             valores_modificados = []
-            for sentencia in sentencias:
-                if bandera == 0:
-                    bandera = 1
-
-                valores = list(csv.reader([sentencia], quotechar="'", skipinitialspace=True))[0]
-
-                for i in range(1, 8):
-                    if valores[i] != "NULL":
-                        valores[i] = '"' + valores[i] + '"'
-
-                if valores[13] != "NULL":
-                    valores[13] = '"' + valores[13] + '"'
-
-                valores[11] = '"' + modificar_Usuario(valores[11], 'creador') + '"'
-                valores.pop(14)  # Eliminamos el valor de fecha_anulacion
-
-                valor_insertar = "(" + ",".join(valores) + ")"
-                valores_modificados.append(valor_insertar)
-
-                if bandera == 1:
-                    bandera = 2
-                    valores_modificados[0] = "INSERT INTO `ordenes` (Id, IdSAP, FechaCreacion, FechaApertura, ComentarioOrden, FechaCierre, ComentarioResolucion, TiempoParada, Confirmada, IdActivo, IdEstadoOrden, IdUsuarioCreador, IdTipoOrden, Materiales) VALUES " + valores_modificados[0]
-
-            linea_insertar = ",".join(valores_modificados) + ';'
-            lineas_modificadas.append(linea_insertar)
+            for valores in filas:
+                if selector is not None:
+                    valores = list(selector(valores))
+                for indice in textos:
+                    valor = valores[indice]
+                    if valor is not None and valor.__class__ is not str:
+                        valores[indice] = str(valor)
+                for indice, conversor in conversiones:
+                    valores[indice] = conversor(valores[indice])
+                valores_modificados.append(valores)
+
+            # En modo incremental un INSERT puede quedarse sin filas nuevas
+            if valores_modificados:
+                cronometro.filas += len(valores_modificados)
+                insercion = Insercion(mapeo.tabla, mapeo.columnas, valores_modificados)
+                if acumular is not None:
+                    acumular(resumen, insercion)
+                yield insercion
+        elif linea.startswith("LOCK TABLES"):
+            yield NOMBRE_TABLA.sub(f'`{mapeo.tabla}`', linea, count=1)
         else:
             # Incluir estas líneas tal y cómo están
-            lineas_modificadas.append(linea)
-    
-    return "\n".join(linea for linea in lineas_modificadas)
-
-# Función que modifica los datos para insertar en la tabla IncidenciasOrden
-def IncidenciasOrdenes(script_sql):
-    lineas_modificadas = []
-    for linea in script_sql.splitlines():
-        linea_insertar = ""
-        # Incluir linea para bloquear y desbloquear tablas
-        if "INSERT INTO" in linea:
-            bandera = 0
-
-            sentencias = re.findall(r"\(([^()]*?(?:'[^']*'[^()]*)*?)\)", linea)
-            valores_modificados = []
+            yield linea
+
+    if informar:
+        informar_desconocidos(mapeo.tabla, desconocidos)
+
+# Fichero con las tablas de reemplazo de los valores del volcado que se traducen a identificadores de GSMAO
+FICHERO_REEMPLAZOS = 'reemplazos.json'
+
+# Tablas de reemplazo ya leídas en este proceso
+tablas_reemplazo = None
+
+# Función que devuelve una tabla de reemplazo. El fichero se lee una sola vez por proceso
+def leer_reemplazos(nombre):
+    global tablas_reemplazo
+    if tablas_reemplazo is None:
+        with open(obtener_ruta('Scripts', FICHERO_REEMPLAZOS), 'r', encoding='utf-8') as file:
+            tablas_reemplazo = json.load(file)
+    return tablas_reemplazo[nombre]
+
+# Función que sustituye un valor del volcado según una tabla de reemplazo.
+# Los NULL sin reemplazo se mantienen y el resto de valores que no están en la tabla se cuentan en desconocidos y se dejan a NULL.
+# En una columna obligatoria (columna es su nombre) cualquier valor sin reemplazo, también NULL, es un error
+def reemplazar(reemplazos, valor, nombre, desconocidos, columna=None):
+    clave = 'NULL' if valor is None else str(valor)
+    try:
+        return reemplazos[clave]
+    except KeyError:
+        if columna is not None:
+            raise ValueError(f"Valor sin reemplazo en la columna obligatoria {columna}: {nombre} '{clave}'. "
+                             f"Añádelo a {FICHERO_REEMPLAZOS}") from None
+        if valor is not None:
+            desconocidos[(nombre, clave)] += 1
+        return None
+
+# Función que informa de los valores del volcado que no tenían reemplazo
+def informar_desconocidos(tabla, desconocidos):
+    for (nombre, clave), filas in sorted(desconocidos.items()):
+        print(f"Valor sin reemplazo en {tabla}: {nombre} '{clave}' en {filas} filas, se inserta NULL")
+
+# Función que ejecuta el script de MySQL con una conexión del pool
+def ejecutar_script_mysql(pool, sentencias, lotes_por_commit=None, al_confirmar=None, medidas=None):
+    """ Ejecutar en la base de datos MySQL las sentencias según se van generando.
+    Con lotes_por_commit se confirma la transacción cada vez que se ejecuta ese número de INSERT
+    y se llama a al_confirmar con el número de lotes confirmados y la conexión.
+    En medidas se van sumando las filas insertadas, para el informe y la barra de progreso. """
+    try:
+        with pool.conexion() as conexion:
+            cursor = conexion.cursor()
+            lotes = 0
+            # Imprimir el resultado de cada sentencia es lento en los scripts grandes: solo se hace con el nivel detalle
+            detalle = informe.activo('detalle')
+            # Se ejecuta sentencia a sentencia para no tener el script completo en memoria
             for sentencia in sentencias:
-                if bandera == 0:
-                    bandera = 1
-
-                valores = list(csv.reader([sentencia], quotechar="'", skipinitialspace=True))[0]
-
-                valores.pop(0)  # Eliminamos el valor de Id Auto_increment
-                valores.pop(-4)  # Eliminamos el valor de repuesto_id
-
-                if valores[0] != "NULL":
-                    valores[0] = "'" + valores[0] + "'"
-
-                if valores[5] != "NULL":
-                    valores[5] = "'" + valores[5] + "'"
-
-                valor_insertar = "(" + ",".join(valores) + ")"
-                valores_modificados.append(valor_insertar)
+                # Los scripts con SET (limpiar_BBDD.sql vuelve a activar FOREIGN_KEY_CHECKS) cambian la sesión de la conexión:
+                # el pool vuelve a fijar sus variables al recuperarla, antes de que la reutilice otra carga
+                if sentencia.startswith("SET "):
+                    pool.sesion_modificada(conexion)
+                cursor.execute(sentencia)
+                if cursor.with_rows:
+                    # Las filas devueltas se leen siempre para poder ejecutar la siguiente sentencia
+                    filas = cursor.fetchall()
+                    if detalle:
+                        print(f"Filas devueltas: {filas}")
+                elif detalle:
+                    print(f"Afectadas: {cursor.rowcount}")
+
+                if sentencia.startswith("INSERT INTO"):
+                    if medidas is not None:
+                        medidas['filas'] += max(cursor.rowcount, 0)
+                    lotes += 1
+                    if lotes_por_commit and lotes % lotes_por_commit == 0:
+                        conexion.commit()
+                        if al_confirmar is not None:
+                            al_confirmar(lotes, conexion)
+            conexion.commit()
+            cursor.close()
 
-                if bandera == 1:
-                    bandera = 2
-                    valores_modificados[0] = "INSERT INTO `incidenciasordenes` (FechaDeteccion, IdOrden, IdComponente, IdIncidencia, IdResolucion, FechaResolucion, ParoMaquina, CambioPieza, AfectaProduccion) VALUES " + valores_modificados[0]
+        return True
+    except Error as e:
+        return(f"Error conectando a la base de datos: {e}")
 
-            linea_insertar = ",".join(valores_modificados) + ';'
-            lineas_modificadas.append(linea_insertar)
+# Función que consulta con una conexión el mayor valor de la clave generada de una tabla (0 si está vacía)
+def leer_maximo_id(conexion, tabla, clave):
+    cursor = conexion.cursor()
+    cursor.execute(f"SELECT MAX(`{clave}`) FROM `{tabla}`")
+    fila = cursor.fetchone()
+    cursor.close()
+    return fila[0] if fila and fila[0] is not None else 0
+
+# Función que consulta con una conexión del pool el mayor valor de la clave generada de una tabla
+def consultar_maximo_id(pool, tabla, clave):
+    with pool.conexion() as conexion:
+        return leer_maximo_id(conexion, tabla, clave)
+
+# Función que borra las filas de una tabla con la clave generada mayor que ultimo_id: las que se insertaron tras el último
+# punto de control de una carga interrumpida y se van a volver a cargar
+def borrar_filas_posteriores(pool, tabla, clave, ultimo_id):
+    try:
+        with pool.conexion() as conexion:
+            cursor = conexion.cursor()
+            cursor.execute(f"DELETE FROM `{tabla}` WHERE `{clave}` > %s", (ultimo_id,))
+            borradas = cursor.rowcount
+            conexion.commit()
+            cursor.close()
+        informe.registrar(f"Se han borrado {max(borradas, 0)} filas de {tabla} cargadas tras el último punto de control.")
+        return True
+    except Error as e:
+        return(f"Error borrando las filas de {tabla} posteriores al último punto de control: {e}")
+
+# Función que consulta las columnas de una tabla de destino, en su orden, y las que forman su clave primaria
+def leer_columnas_tabla(pool, tabla):
+    with pool.conexion() as conexion:
+        cursor = conexion.cursor()
+        cursor.execute(
+            "SELECT COLUMN_NAME, COLUMN_KEY FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY ORDINAL_POSITION", (tabla,))
+        filas = cursor.fetchall()
+        cursor.close()
+
+    if not filas:
+        raise ValueError(f"No se encuentran las columnas de la tabla {tabla}")
+    return [columna for columna, _ in filas], {columna for columna, clave in filas if clave == 'PRI'}
+
+# Función que genera la cláusula que convierte un INSERT en un upsert sobre la clave primaria.
+# Si todas las columnas forman parte de la clave, la fila existente se deja como está
+def clausula_actualizacion(columnas, claves):
+    actualizar = [columna for columna in columnas if columna not in claves] or columnas[:1]
+    return " ON DUPLICATE KEY UPDATE " + ', '.join([f"{columna} = VALUES({columna})" for columna in actualizar])
+
+# Función que convierte los INSERT de un script en upserts para la carga incremental.
+# columnas_tabla se usa en los INSERT que no indican sus columnas
+def convertir_upserts(sentencias, columnas_tabla, claves):
+    clausulas = {}
+    for sentencia in sentencias:
+        if sentencia.startswith("INSERT INTO"):
+            lista_columnas = CABECERA_INSERT.match(sentencia).group(2)
+            if lista_columnas not in clausulas:
+                columnas = [columna.strip(' `') for columna in lista_columnas.split(',')] if lista_columnas else columnas_tabla
+                clausulas[lista_columnas] = clausula_actualizacion(columnas, claves)
+            sentencia = sentencia.rstrip(';') + clausulas[lista_columnas] + ';'
+        yield sentencia
+
+# Errores de MySQL que indican que LOAD DATA LOCAL INFILE está deshabilitado en el cliente o en el servidor:
+# ER_NOT_ALLOWED_COMMAND, CR_LOAD_DATA_LOCAL_INFILE_REJECTED y ER_CLIENT_LOCAL_FILES_DISABLED
+ERRORES_LOCAL_INFILE = (1148, 2068, 3948)
+
+# Error de MySQL de una tabla que no existe (ER_NO_SUCH_TABLE): las tablas de destino las crean las migraciones de GSMAO.Server
+ERROR_TABLA_INEXISTENTE = 1146
+
+# Función que carga un fichero TSV con LOAD DATA LOCAL INFILE. Si el servidor no lo permite, inserta las filas por lotes.
+# Las conexiones del pool deben abrirse con allow_local_infile.
+# En modo incremental las filas se cargan en una tabla temporal y se pasan a la tabla con un upsert.
+# En medidas se suman las filas cargadas
+def cargar_fichero_tsv(pool, tabla, fichero_modificado, filas_por_lote=None, lotes_por_commit=None, incremental=False, medidas=None):
+    """ Cargar un fichero de carga masiva en la tabla indicada. """
+    ruta_fichero = obtener_ruta('FicherosModificados_Datos', fichero_modificado)
+    columnas = leer_columnas_tsv(ruta_fichero)
+    lista_columnas = f" ({', '.join(columnas)})" if columnas else ''
+    try:
+        if incremental:
+            columnas_tabla, claves = leer_columnas_tabla(pool, tabla)
+            columnas_upsert = columnas or columnas_tabla
+            destino = f"{tabla}_incremental"
         else:
-            if "WRITE;" in linea:
-                lineas_modificadas.append(re.sub(r'`([^`]*)`', '`incidenciasordenes`', linea))
-            else:
-                lineas_modificadas.append(linea)
-    
-    return "\n".join(linea for linea in lineas_modificadas)
-
-# Función que sustituye los datos de Criticidad por el IdCriticidad
-def modificar_IdCriticidad(valor):
-    valoresCriticidad = declararReemplazosCriticidad()
-    return valoresCriticidad[valor]
-
-# Función que sustituye los datos de Actividad por el IdEstadoActivo
-def modificar_Actividad(valor):
-    valoresActividad = declararReemplazosActividad()
-    return valoresActividad[valor]
-
-# Función que sustituye los datos de Creador por el IdUsuarioCreador
-def modificar_Usuario(valor, campo):
-    valoresUsuarios = declararReemplazosUsuarios(campo)
-    return valoresUsuarios[valor]
-
-# Función que declara el listado de reemplazos para la criticidad
-def declararReemplazosCriticidad():
-    # Diccionario de palabras a reemplazar para criticidad
-    reemplazos = {
-        "MC": '1',
-        "CA": '2',
-        "CM": '3',
-        "CB": '4',
-        "SC": '5',
-        "NULL": '5'
-    }
-
-    return reemplazos
-
-# Función que declara el listado de reemplazos para la actividad
-def declararReemplazosActividad():
-    # Diccionario de palabras a reemplazar para actividad
-    reemplazos = {
-        '0': '1',
-        '1': '2',
-        '2': '3'
-    }
+            destino = tabla
 
-    return reemplazos
-
-# Función que declara el listado de reemplazos para los identificadores de los usuarios
-def declararReemplazosUsuarios(campo):
-    if campo == 'creador':
-        # Diccionario de palabras a reemplazar para usuarios creadores
-        reemplazos = {
-            '1': '81e47e59-a3d5-4c7b-b3f7-077da98a369f',
-            '2': 'eedc8529-76e8-4dfc-93c8-1dd0dbfa85d1',
-            '3': 'bf368d2b-7199-47ad-8524-3f3db3e9461a',
-            '4': 'e3649caf-53ee-440b-b887-cae785448c25',
-            '5': 'b63bc715-6fb6-4121-8877-9ccc477614b3',
-            '6': 'd350b266-910c-4262-8b87-6fcebe3ce465',
-            '7': 'bf73fcbe-ba8f-4fc3-8f71-ad28157b5dca',
-            '8': '73776e05-11d6-4b04-9c4a-09e00ed90965',
-            '9': 'e1fc54bd-605c-4e6b-a314-b10e1f1b073e',
-            '10': '83fe4b80-5932-4aed-87e4-bd75d27ce694',
-            '11': 'a7fac1e5-c319-433a-acbc-52dfa8fc2829',
-            '12': '500698e0-5b0a-4e26-88df-957eb018696b',
-            '13': 'a7fac1e5-c319-433a-acbc-52dfa8fc2829',
-            '15': '59d2ef0d-a562-4d56-8429-aeddaf35a546',
-            '16': '13525e67-6853-438d-984a-7a6b647aebd9',
-            '17': '492b03f9-3bd8-4396-a20f-7eb8d1dcd364',
-            '18': '562559aa-fbc4-4f82-a533-224e3d5f8c34',
-            '19': 'dec0f3d2-278f-4e5a-8763-d3e275dff091',
-            '20': 'ac8fa91b-013f-4f67-aa45-ce6f2cd33339',
-            '21': 'c88f4e63-1597-4d80-afda-f8e9906516c5',
-            '22': '6b2d48b4-eb40-4c86-b728-330b69bef14f',
-            '23': '5a602495-d87f-4823-932e-193484a939df',
-            '24': '6078c069-2d1f-44b4-b419-e2ff12d9af05',
-            '25': 'a7fac1e5-c319-433a-acbc-52dfa8fc2829',
-            '26': '1d781f50-7fbc-4109-a715-94ca9cde1b5e',
-            '27': 'e94641cf-3886-48a4-8db5-f5bb82ac3fa2',
-            '28': 'd6a07a3b-c844-40df-8f44-da616cccd16e',
-            '29': '4242dc66-15d0-42aa-bc8c-a9cfaf79bb75',
-            '30': 'f7840970-2a26-47b8-a5c9-1289a668ceca',
-            '31': '8ba7cbaf-532f-4abd-8c99-c541071e1c0a',
-            '32': 'a7fac1e5-c319-433a-acbc-52dfa8fc2829',
-            'NULL': 'eedc8529-76e8-4dfc-93c8-1dd0dbfa85d1'
-        }
-    else:        
-        # Diccionario de palabras a reemplazar para usuarios no creadores
-        reemplazos = {
-            '1': '81e47e59-a3d5-4c7b-b3f7-077da98a369f',
-            '2': 'eedc8529-76e8-4dfc-93c8-1dd0dbfa85d1',
-            '3': 'bf368d2b-7199-47ad-8524-3f3db3e9461a',
-            '4': 'e3649caf-53ee-440b-b887-cae785448c25',
-            '5': 'b63bc715-6fb6-4121-8877-9ccc477614b3',
-            '6': 'd350b266-910c-4262-8b87-6fcebe3ce465',
-            '7': 'bf73fcbe-ba8f-4fc3-8f71-ad28157b5dca',
-            '8': '73776e05-11d6-4b04-9c4a-09e00ed90965',
-            '9': 'e1fc54bd-605c-4e6b-a314-b10e1f1b073e',
-            '10': '83fe4b80-5932-4aed-87e4-bd75d27ce694',
-            '11': 'a7fac1e5-c319-433a-acbc-52dfa8fc2829',
-            '12': '500698e0-5b0a-4e26-88df-957eb018696b',
-            '13': 'a7fac1e5-c319-433a-acbc-52dfa8fc2829',
-            '14': 'a7fac1e5-c319-433a-acbc-52dfa8fc2829',
-            '15': '59d2ef0d-a562-4d56-8429-aeddaf35a546',
-            '16': '13525e67-6853-438d-984a-7a6b647aebd9',
-            '17': '492b03f9-3bd8-4396-a20f-7eb8d1dcd364',
-            '18': '562559aa-fbc4-4f82-a533-224e3d5f8c34',
-            '19': 'dec0f3d2-278f-4e5a-8763-d3e275dff091',
-            '20': 'ac8fa91b-013f-4f67-aa45-ce6f2cd33339',
-            '21': 'c88f4e63-1597-4d80-afda-f8e9906516c5',
-            '22': '6b2d48b4-eb40-4c86-b728-330b69bef14f',
-            '23': '5a602495-d87f-4823-932e-193484a939df',
-            '24': '6078c069-2d1f-44b4-b419-e2ff12d9af05',
-            '25': 'a7fac1e5-c319-433a-acbc-52dfa8fc2829',
-            '26': '1d781f50-7fbc-4109-a715-94ca9cde1b5e',
-            '27': 'e94641cf-3886-48a4-8db5-f5bb82ac3fa2',
-            '28': 'd6a07a3b-c844-40df-8f44-da616cccd16e',
-            '29': '4242dc66-15d0-42aa-bc8c-a9cfaf79bb75',
-            '30': 'f7840970-2a26-47b8-a5c9-1289a668ceca',
-            '31': '8ba7cbaf-532f-4abd-8c99-c541071e1c0a',
-            '32': 'a7fac1e5-c319-433a-acbc-52dfa8fc2829'
-        }
-
-    return reemplazos
-
-# Función que ejecuta el script de MySQL
-def ejecutar_script_mysql(mysql_config, script_sql):
-    """ Ejecutar un script SQL en la base de datos MySQL. """
-    try:
-        conexion = mysql.connector.connect(**mysql_config)
-        if conexion.is_connected():
+        with pool.conexion() as conexion:
             cursor = conexion.cursor()
-            for resultado in cursor.execute(script_sql, multi=True):  # multi=True para múltiples sentencias
-                if resultado.with_rows:
-                    print(f"Filas devueltas: {resultado.fetchall()}")
-                else:
-                    print(f"Afectadas: {resultado.rowcount}")
+            if incremental:
+                cursor.execute(f"CREATE TEMPORARY TABLE `{destino}` LIKE `{tabla}`")
+
+            # Los índices secundarios no se desactivan aquí: en InnoDB ALTER TABLE ... DISABLE KEYS no tiene efecto.
+            # Con --diferir-indices se quitan antes de la carga y se vuelven a crear al terminar (IndicesDiferidos)
+            ruta_carga = ruta_fichero
+            try:
+                try:
+                    # LOAD DATA LOCAL INFILE solo lee ficheros sin comprimir
+                    if compresion_fichero(ruta_fichero) is not None:
+                        ruta_carga = descomprimir_fichero(ruta_fichero)
+                    cursor.execute(
+                        f"LOAD DATA LOCAL INFILE %s INTO TABLE `{destino}` CHARACTER SET utf8mb4 "
+                        "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+                        f"IGNORE 1 LINES{lista_columnas}", (ruta_carga,))
+                    informe.registrar(f"Afectadas: {cursor.rowcount}", 'detalle')
+                    if medidas is not None:
+                        medidas['filas'] += max(cursor.rowcount, 0)
+                except Error as e:
+                    if e.errno not in ERRORES_LOCAL_INFILE:
+                        raise
+
+                    print(f"LOAD DATA LOCAL INFILE no disponible en {tabla}, se insertan las filas por lotes")
+                    conexion.rollback()
+                    insertar_filas(conexion, cursor, destino, columnas, leer_fichero_tsv(ruta_fichero), filas_por_lote or 1000, lotes_por_commit,
+                                   medidas)
+            finally:
+                if ruta_carga != ruta_fichero and os.path.exists(ruta_carga):
+                    os.remove(ruta_carga)
+
+            if incremental:
+                try:
+                    cursor.execute(
+                        f"INSERT INTO `{tabla}` ({', '.join(columnas_upsert)}) SELECT {', '.join(columnas_upsert)} FROM `{destino}`"
+                        + clausula_actualizacion(columnas_upsert, claves))
+                    informe.registrar(f"Afectadas: {cursor.rowcount}", 'detalle')
+                finally:
+                    cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS `{destino}`")
+
             conexion.commit()
             cursor.close()
 
@@ -538,6 +939,30 @@ def ejecutar_script_mysql(mysql_config, script_sql):
     except Error as e:
         return(f"Error conectando a la base de datos: {e}")
 
-    finally:
-        if conexion.is_connected():
-            conexion.close()
\ No newline at end of file
+# Función que descomprime un fichero transformado junto al original y devuelve la ruta del fichero descomprimido
+def descomprimir_fichero(ruta_fichero):
+    ruta_descomprimido = ruta_fichero + '.carga'
+    with abrir_fichero(ruta_fichero, 'rb', compresion_fichero(ruta_fichero)) as lectura, open(ruta_descomprimido, 'wb') as escritura:
+        for bloque in iter(lambda: lectura.read(1024 * 1024), b''):
+            escritura.write(bloque)
+    return ruta_descomprimido
+
+# Función que inserta las filas con executemany en lotes del tamaño indicado, confirmando cada lotes_por_commit lotes
+def insertar_filas(conexion, cursor, tabla, columnas, filas, filas_por_lote, lotes_por_commit=None, medidas=None):
+    lista_columnas = f" ({', '.join(columnas)})" if columnas else ''
+    filas = iter(filas)
+    lote = list(itertools.islice(filas, filas_por_lote))
+    if not lote:
+        return
+
+    sentencia = f"INSERT INTO `{tabla}`{lista_columnas} VALUES ({', '.join(['%s'] * len(lote[0]))})"
+    lotes = 0
+    while lote:
+        cursor.executemany(sentencia, lote)
+        informe.registrar(f"Afectadas: {cursor.rowcount}", 'detalle')
+        if medidas is not None:
+            medidas['filas'] += len(lote)
+        lotes += 1
+        if lotes_por_commit and lotes % lotes_por_commit == 0:
+            conexion.commit()
+        lote = list(itertools.islice(filas, filas_por_lote))
@@ -0,0 +1,146 @@
+import os
+import time
+import shutil
+import itertools
+from collections import Counter
+from concurrent.futures import wait
+import Migrations as funcs
+import Indice as indices
+import Verificacion as verificador
+import Informe as informe
+
+# Transformación de un volcado grande repartido en partes: cada parte es un rango de tuplas del índice del volcado
+# que se transforma en un proceso del pool. Las partes se unen en orden en el fichero transformado
+
+# Bytes del volcado que debe tener como mínimo cada parte: por debajo, repartir cuesta más de lo que se gana
+BYTES_MINIMOS_PARTE = 16 * 1024 ** 2
+
+# Función que calcula en cuántas partes se reparte la transformación de un volcado (1 si no se reparte)
+def numero_partes(fichero, partes):
+    if not partes or partes < 2:
+        return 1
+    tamano = os.path.getsize(funcs.obtener_ruta('DumpFolder', fichero))
+    return max(1, min(partes, tamano // BYTES_MINIMOS_PARTE))
+
+# Función que obtiene la ruta del fichero temporal de una parte del fichero transformado
+def ruta_parte(ruta_modificado, parte):
+    return f"{ruta_modificado}.parte{parte:03d}.tmp"
+
+# Función que lee las sentencias del volcado entre dos posiciones fuera de los INSERT (los bloqueos de la tabla)
+def leer_sentencias_fuera(volcado, desde, hasta):
+    return funcs.generarScript(funcs.agrupar_sentencias(str(volcado[desde:hasta], 'utf-8').splitlines()))
+
+# Función que transforma las tuplas desde-hasta del volcado y las guarda en el fichero de su parte.
+# La primera parte incluye lo que hay antes del primer INSERT y la última lo que hay después del último.
+# En los ficheros TSV la cabecera con las columnas solo se escribe en la primera parte.
+# Se ejecuta en un proceso del pool: devuelve el fichero de la parte, la marca, las medidas, los valores sin reemplazo y,
+# con resumir, el resumen de las filas de la parte (None sin resumir)
+def transformar_parte(fichero, parte, desde, hasta, formato='sql', filas_por_lote=None, bytes_por_lote=None, marca=None,
+                      columnar=False, compresion=None, resumir=False):
+    cronometro = informe.Cronometro('escribir')
+    mapeo = funcs.MAPEOS[fichero]
+    marca = {'desde': marca, 'hasta': marca}
+    desconocidos = Counter()
+    resumen = verificador.nuevo_resumen(verificador.posiciones_verificacion(mapeo)) if resumir else None
+
+    ruta_volcado = funcs.obtener_ruta('DumpFolder', fichero)
+    ruta_modificado = funcs.obtener_ruta('FicherosModificados_Datos', funcs.nombre_fichero_modificado(fichero, formato, compresion))
+    cabecera = None
+    if formato == 'tsv':
+        cabecera = '\t'.join(mapeo.columnas or []) + '\n' if parte == 0 else ''
+
+    # El índice ya lo ha generado el proceso principal: aquí solo se lee
+    indice = indices.obtener_indice(ruta_volcado)
+    with indices.proyectar_volcado(ruta_volcado) as volcado:
+        tuplas = indices.leer_tuplas(volcado, indice, desde, hasta)
+        try:
+            script_sql = tuplas
+            if desde == 0:
+                script_sql = itertools.chain(leer_sentencias_fuera(volcado, 0, indice.sentencias[0]), script_sql)
+            if hasta == len(indice.tuplas):
+                script_sql = itertools.chain(script_sql, leer_sentencias_fuera(volcado, indice.sentencias[-1], len(volcado)))
+
+            script_sql = cronometro.medir(script_sql, 'leer')
+            script_sql = cronometro.medir(funcs.transformar_sentencias(mapeo, script_sql, marca, columnar and formato == 'sql',
+                                                                       cronometro, desconocidos, resumen), 'transformar')
+            funcs.escribir_fichero_modificado(script_sql, ruta_parte(ruta_modificado, parte), formato, filas_por_lote, bytes_por_lote,
+                                              compresion, cabecera)
+        finally:
+            # La vista del volcado debe liberarse antes de cerrar la proyección
+            tuplas.close()
+
+    medidas = cronometro.terminar()
+    medidas['filas'] = cronometro.filas
+    return ruta_parte(ruta_modificado, parte), marca['hasta'], medidas, desconocidos, resumen
+
+# Función que transforma un volcado repartiendo sus tuplas en partes que se transforman en los procesos de ejecutor.
+# Se ejecuta en un hilo del proceso principal y devuelve lo mismo que Migrations.transformar_fichero.
+# Las medidas suman las etapas de todas las partes e incluyen las partes, los segundos de unirlas y los segundos reales (reloj).
+# Con resumir los resúmenes de las partes se suman en el del fichero
+def transformar_fichero(fichero, ejecutor, partes, formato='sql', filas_por_lote=None, bytes_por_lote=None, marca=None,
+                        columnar=False, compresion=None, resumir=False):
+    inicio = time.perf_counter()
+    ruta_volcado = funcs.obtener_ruta('DumpFolder', fichero)
+    indice = indices.obtener_indice(ruta_volcado)
+    segundos_indice = time.perf_counter() - inicio
+
+    rangos = indices.dividir_tuplas(indice, partes)
+    if len(rangos) < 2:
+        return ejecutor.submit(funcs.transformar_fichero, fichero, formato, filas_por_lote, bytes_por_lote, marca, columnar,
+                               compresion, resumir).result()
+
+    futuros = [ejecutor.submit(transformar_parte, fichero, parte, desde, hasta, formato, filas_por_lote, bytes_por_lote, marca,
+                               columnar, compresion, resumir)
+               for parte, (desde, hasta) in enumerate(rangos)]
+
+    fichero_modificado = funcs.nombre_fichero_modificado(fichero, formato, compresion)
+    ruta_modificado = funcs.obtener_ruta('FicherosModificados_Datos', fichero_modificado)
+    verificador.borrar_resumen(ruta_modificado)
+    resumen = verificador.nuevo_resumen(verificador.posiciones_verificacion(funcs.MAPEOS[fichero])) if resumir else None
+    medidas = Counter()
+    desconocidos = Counter()
+    nueva_marca = marca
+    segundos_unir = 0
+    try:
+        # Cada parte se añade en cuanto terminan ella y las anteriores, mientras se siguen transformando las demás.
+        # Las partes comprimidas se pueden unir tal cual: gzip y zstd admiten varios bloques seguidos en un fichero
+        with open(ruta_modificado + '.tmp', 'wb') as destino:
+            for futuro in futuros:
+                ruta, marca_parte, medidas_parte, desconocidos_parte, resumen_parte = futuro.result()
+                inicio_unir = time.perf_counter()
+                with open(ruta, 'rb') as origen:
+                    shutil.copyfileobj(origen, destino, 1024 * 1024)
+                os.remove(ruta)
+                segundos_unir += time.perf_counter() - inicio_unir
+
+                medidas.update(medidas_parte)
+                desconocidos.update(desconocidos_parte)
+                if resumen is not None:
+                    verificador.sumar_resumen(resumen, resumen_parte)
+                if marca_parte is not None and (nueva_marca is None or marca_parte > nueva_marca):
+                    nueva_marca = marca_parte
+        os.replace(ruta_modificado + '.tmp', ruta_modificado)
+        if resumen is not None:
+            verificador.guardar_resumen(ruta_modificado, resumen)
+    except BaseException:
+        # Si falla una parte no se espera a las que aún no han empezado y se borran los ficheros de las demás
+        for futuro in futuros:
+            futuro.cancel()
+        wait(futuros)
+        for parte in range(len(rangos)):
+            if os.path.exists(ruta_parte(ruta_modificado, parte)):
+                os.remove(ruta_parte(ruta_modificado, parte))
+        if os.path.exists(ruta_modificado + '.tmp'):
+            os.remove(ruta_modificado + '.tmp')
+        raise
+
+    funcs.informar_desconocidos(funcs.MAPEOS[fichero].tabla, desconocidos)
+
+    medidas = {etapa: round(valor, 3) if isinstance(valor, float) else valor for etapa, valor in medidas.items()}
+    medidas['partes'] = len(rangos)
+    medidas['indexar'] = round(segundos_indice, 3)
+    medidas['unir'] = round(segundos_unir, 3)
+    medidas['reloj'] = round(time.perf_counter() - inicio, 3)
+    medidas['bytes_leidos'] = os.path.getsize(ruta_volcado)
+    medidas['bytes_escritos'] = os.path.getsize(ruta_modificado)
+    return fichero_modificado, nueva_marca, medidas
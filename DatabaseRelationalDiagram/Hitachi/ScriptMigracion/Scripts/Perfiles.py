@@ -0,0 +1,119 @@
+import io
+import os
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from collections import namedtuple
+import Migrations as funcs
+
+# Perfilado de la transformación y la carga de las tablas elegidas con cProfile ('cpu') y tracemalloc ('memoria').
+# Por cada tabla y etapa se guarda en PerfilesMigracion el perfil de cProfile (.prof, se abre con pstats o snakeviz)
+# y un resumen (.txt) con las funciones que más tiempo consumen, el pico de memoria y las líneas con más memoria reservada
+
+# Modos de perfilado de la opción --perfil
+MODOS = {'cpu': ('cpu',), 'memoria': ('memoria',), 'ambos': ('cpu', 'memoria')}
+
+# Opciones del perfilado:
+#  - modos: perfiladores que se usan ('cpu', 'memoria')
+#  - tablas: ficheros del volcado o tablas de destino que se perfilan (None para todas)
+#  - top: funciones y líneas de cada resumen
+#  - marca: prefijo de los ficheros de la ejecución
+Perfil = namedtuple('Perfil', ['modos', 'tablas', 'top', 'marca'])
+
+# Funciones y líneas que se guardan en el informe de la migración
+MAXIMO_INFORME = 5
+
+# Solo puede haber un perfilador activo en el proceso (desde Python 3.12, activar un segundo cProfile lanza ValueError)
+# y tracemalloc mide todo el proceso, así que las etapas perfiladas de un mismo proceso se ejecutan de una en una
+bloqueo_perfil = threading.Lock()
+
+# Función que indica si se perfilan las etapas de una tabla
+def perfilada(perfil, tabla, fichero=None):
+    return perfil is not None and (perfil.tablas is None or tabla in perfil.tablas or fichero in perfil.tablas)
+
+# Función que escribe las funciones con más tiempo propio y acumulado y devuelve las primeras para el informe
+def resumir_cpu(perfilador, top, lineas):
+    buffer = io.StringIO()
+    estadisticas = pstats.Stats(perfilador, stream=buffer)
+    for orden, titulo in (('tottime', 'tiempo propio'), ('cumulative', 'tiempo acumulado')):
+        buffer.write(f"Funciones con más {titulo}\n")
+        estadisticas.sort_stats(orden).print_stats(top)
+    lineas.append(buffer.getvalue())
+
+    funciones = sorted(estadisticas.stats.items(), key=lambda elemento: elemento[1][2], reverse=True)[:MAXIMO_INFORME]
+    return [f"{funcion} ({os.path.basename(fichero)}:{linea}) {round(datos[2], 3)} s"
+            for (fichero, linea, funcion), datos in funciones]
+
+# Función que escribe las líneas que más memoria han reservado durante la etapa y siguen reservada al terminar, junto al pico
+# de memoria del proceso, y devuelve las primeras para el informe
+def resumir_memoria(antes, despues, pico, top, lineas):
+    filtros = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, '<frozen importlib._bootstrap*>')]
+    diferencias = despues.filter_traces(filtros).compare_to(antes.filter_traces(filtros), 'lineno')
+    lineas.append(f"Pico de memoria del proceso: {round(pico / 1024 / 1024, 1)} MB")
+    lineas.append("Líneas con más memoria reservada al terminar la etapa")
+    lineas.extend(str(diferencia) for diferencia in diferencias[:top])
+    lineas.append('')
+    return [str(diferencia) for diferencia in diferencias[:MAXIMO_INFORME]]
+
+# Función que ejecuta una etapa de una tabla con los perfiladores del perfil, en el proceso o el hilo de la etapa.
+# Las etapas perfiladas del proceso esperan su turno en bloqueo_perfil, por lo que dos tablas perfiladas no se cargan a la vez.
+# cProfile solo mide el hilo de la etapa; el pico de tracemalloc es el del proceso durante la etapa, que incluye lo que
+# reserven a la vez las etapas sin perfilar de otros hilos.
+# Guarda el perfil y su resumen en PerfilesMigracion y devuelve el resultado de la etapa y las medidas del perfil
+def perfilar(perfil, tabla, etapa, funcion, *argumentos):
+    nombre = f"{perfil.marca}_{tabla}_{etapa}"
+    medidas = {}
+    perfilador = cProfile.Profile() if 'cpu' in perfil.modos else None
+    memoria = 'memoria' in perfil.modos
+
+    with bloqueo_perfil:
+        # Si tracemalloc ya estaba activo (python -X tracemalloc) solo se reinicia su pico
+        iniciar_memoria = memoria and not tracemalloc.is_tracing()
+        if iniciar_memoria:
+            tracemalloc.start()
+        elif memoria:
+            tracemalloc.reset_peak()
+        try:
+            if memoria:
+                antes = tracemalloc.take_snapshot()
+            inicio = time.perf_counter()
+            if perfilador is not None:
+                perfilador.enable()
+            try:
+                resultado = funcion(*argumentos)
+            finally:
+                if perfilador is not None:
+                    perfilador.disable()
+            medidas['segundos'] = round(time.perf_counter() - inicio, 3)
+            if memoria:
+                pico = tracemalloc.get_traced_memory()[1]
+                despues = tracemalloc.take_snapshot()
+        finally:
+            if iniciar_memoria:
+                tracemalloc.stop()
+
+    lineas = [f"Perfil de la etapa {etapa} de la tabla {tabla}: {medidas['segundos']} s", '']
+    if perfilador is not None:
+        medidas['perfil'] = funcs.obtener_ruta('PerfilesMigracion', nombre + '.prof')
+        perfilador.dump_stats(medidas['perfil'])
+        medidas['funciones'] = resumir_cpu(perfilador, perfil.top, lineas)
+    if memoria:
+        medidas['pico_memoria_mb'] = round(pico / 1024 / 1024, 1)
+        medidas['memoria'] = resumir_memoria(antes, despues, pico, perfil.top, lineas)
+
+    medidas['resumen'] = funcs.obtener_ruta('PerfilesMigracion', nombre + '.txt')
+    with open(medidas['resumen'], 'w', encoding='utf-8') as file:
+        file.write('\n'.join(lineas) + '\n')
+    return resultado, medidas
+
+# Función que imprime dónde están los perfiles de cada tabla y sus funciones más lentas
+def imprimir_perfiles(informe_tablas):
+    for tabla, datos in informe_tablas.items():
+        for etapa, medidas in datos.get('perfil', {}).items():
+            print(f"\nPerfil de {tabla} ({etapa}, {medidas['segundos']} s): {medidas['resumen']}")
+            for funcion in medidas.get('funciones', [])[:3]:
+                print(f"    {funcion}")
+            if 'pico_memoria_mb' in medidas:
+                print(f"    Pico de memoria del proceso: {medidas['pico_memoria_mb']} MB")
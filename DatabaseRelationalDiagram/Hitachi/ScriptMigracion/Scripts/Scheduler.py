@@ -0,0 +1,638 @@
+import os
+import json
+import time
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+import Migrations as funcs
+import Cache as cache
+import Particiones as particiones
+import CargaAsincrona as carga_asincrona
+import IndicesDiferidos as indices_diferidos
+import ClavesExternas as claves_externas
+import JerarquiaComponentes as jerarquia
+import Indicadores as indicadores
+import Perfiles as perfiles
+import Informe as informe
+
+# Tabla de destino de cada fichero del volcado
+TABLAS_FICHEROS = {fichero: mapeo.tabla for fichero, mapeo in funcs.MAPEOS.items()}
+
+# Claves externas entre las tablas que vacía limpiar_BBDD.sql: cada tabla indica las tablas que deben estar cargadas antes.
+# Las claves hacia tablas que no se migran (usuarios, criticidades, estados de activo) no condicionan el orden
+DEPENDENCIAS = {
+    'empresas': [],
+    'plantas': ['empresas'],
+    'centrosdecostes': ['plantas'],
+    'localizaciones': ['plantas'],
+    'mecanismosdefallo': [],
+    'incidencias': ['mecanismosdefallo'],
+    'resoluciones': [],
+    'activos': ['localizaciones', 'centrosdecostes'],
+    'componentes': [],
+    'activo_componentes': ['activos', 'componentes'],
+    'estadosorden': [],
+    'tiposorden': [],
+    'ordenes': ['activos', 'estadosorden', 'tiposorden'],
+    'incidenciasordenes': ['ordenes', 'componentes', 'incidencias', 'resoluciones'],
+    'usuarios_ordenes': ['ordenes'],
+    'historialcambiosusuariosordenes': ['ordenes'],
+    # Tabla de cierre que se calcula con el fichero de componentes (módulo JerarquiaComponentes), sin volcado propio
+    jerarquia.TABLA_JERARQUIA: ['componentes'],
+    # Tablas de indicadores que se calculan con los ficheros de ordenes e incidenciasordenes (módulo Indicadores), sin claves externas
+    indicadores.TABLA_ORDENES: [],
+    indicadores.TABLA_INCIDENCIAS: []
+}
+
+# Tablas que se calculan con los ficheros transformados de otras tablas: se cargan siempre completas
+TABLAS_CALCULADAS = {jerarquia.TABLA_JERARQUIA, *indicadores.TABLAS_INDICADORES}
+
+# Función que obtiene el fichero transformado de una tabla con el que se calcula otra: el que está listo para cargarse,
+# el que ya se está cargando o, si la tabla se cargó en la migración anterior, el de su punto de control.
+# Devuelve None si aún no está listo y False si ya no existe
+def fichero_origen(tabla, transformadas, informe_tablas, puntos):
+    fichero_modificado = transformadas.get(tabla) or informe_tablas[tabla].get('fichero_modificado')
+    if fichero_modificado is None and informe_tablas[tabla].get('cargada_antes'):
+        fichero_modificado = puntos[tabla].get('fichero')
+        if not fichero_modificado or not os.path.exists(funcs.obtener_ruta('FicherosModificados_Datos', fichero_modificado)):
+            return False
+    return fichero_modificado
+
+# Función que carga en la base de datos un fichero ya transformado con una conexión del pool.
+# En modo incremental los INSERT se convierten en upserts sobre la clave primaria de la tabla.
+# Los scripts SQL se cargan desde la posición desde y cada commit intermedio queda registrado como punto de control.
+# En medidas se guardan las filas y bytes cargados, los segundos de la carga y su ritmo.
+# Con escritores los scripts SQL se cargan con ese número de conexiones asíncronas (módulo CargaAsincrona).
+# Las tablas con clave_generada se cargan siempre con una sola conexión: así sus Id crecen en el orden de los commits y cada
+# punto de control guarda el mayor Id confirmado, hasta el que se conservan las filas al reanudar.
+# confirmadas son las posiciones tras los INSERT que ya se confirmaron por delante de desde, que no se vuelven a ejecutar
+def cargar_fichero(pool, tabla, fichero_modificado, filas_por_lote=None, lotes_por_commit=None, incremental=False, desde=0, medidas=None,
+                   escritores=None, clave_generada=None, confirmadas=()):
+    medidas = {'filas': 0} if medidas is None else medidas
+    inicio = time.perf_counter()
+
+    if funcs.formato_fichero(fichero_modificado) == 'tsv':
+        resultado = funcs.cargar_fichero_tsv(pool, tabla, fichero_modificado, filas_por_lote, lotes_por_commit, incremental, medidas)
+        medidas['bytes'] = os.path.getsize(funcs.obtener_ruta('FicherosModificados_Datos', fichero_modificado))
+        informe.calcular_ritmo(medidas, time.perf_counter() - inicio)
+        return resultado
+
+    # La posición leída y la confirmada solo son distintas en la carga asíncrona
+    progreso = {'posicion': desde, 'sentencia': None}
+    lectura = dict(progreso) if escritores else progreso
+    sentencias = funcs.leer_fichero_modificado(fichero_modificado, desde, lectura)
+    if confirmadas:
+        confirmadas = set(confirmadas)
+        sentencias = (sentencia for sentencia in sentencias if lectura['posicion'] not in confirmadas)
+    if incremental:
+        sentencias = funcs.convertir_upserts(sentencias, *funcs.leer_columnas_tabla(pool, tabla))
+
+    # Al confirmar un lote se guarda la posición del fichero tras la última sentencia ejecutada y el Id de su última fila
+    # o, si la tabla genera sus Id, el mayor Id confirmado. La carga asíncrona pasa en estado su propia copia del progreso,
+    # con los INSERT que ha confirmado por delante de la posición, a los que se suman los saltados que siguen por delante
+    def al_confirmar(lote, conexion=None, estado=None):
+        estado = progreso if estado is None else estado
+        ultimo_id = (funcs.leer_maximo_id(conexion, tabla, clave_generada) if clave_generada
+                     else funcs.ultimo_id(estado['sentencia']))
+        adelantadas = set(estado.get('confirmadas', ()))
+        adelantadas.update(posicion for posicion in confirmadas if posicion > estado['posicion'])
+        registrar_punto_control(tabla, 'cargando', fichero=fichero_modificado, lote=lote, posicion=estado['posicion'],
+                                ultimo_id=ultimo_id, confirmadas=sorted(adelantadas))
+
+    if escritores and not clave_generada:
+        medidas['escritores'] = escritores
+        resultado = carga_asincrona.ejecutar_script_asincrono(pool.mysql_config, sentencias, lectura, escritores, lotes_por_commit,
+                                                              al_confirmar, medidas, progreso, pool.sesion)
+    else:
+        resultado = funcs.ejecutar_script_mysql(pool, sentencias, lotes_por_commit, al_confirmar, medidas)
+    medidas['bytes'] = progreso['posicion'] - desde
+    informe.calcular_ritmo(medidas, time.perf_counter() - inicio)
+    return resultado
+
+# Función que lanza en un hilo de carga la creación de los índices quitados de una tabla, con sus medidas en el informe
+def lanzar_indices(cargadores, pool, tabla, indices, informe_tablas):
+    medidas = informe_tablas.setdefault(tabla, {}).setdefault('indices', {})
+    return cargadores.submit(indices_diferidos.crear_indices, pool, tabla, indices, medidas)
+
+# Fichero con el progreso de la migración en curso: una línea JSON por tabla y lote confirmado
+FICHERO_PUNTOS_CONTROL = 'puntos_control.jsonl'
+bloqueo_puntos_control = threading.Lock()
+
+# Función que añade un punto de control con el estado de una tabla
+def registrar_punto_control(tabla, estado, **datos):
+    punto = {'tabla': tabla, 'estado': estado, **datos}
+    with bloqueo_puntos_control:
+        with open(funcs.obtener_ruta('EstadoMigracion', FICHERO_PUNTOS_CONTROL), 'a', encoding='utf-8') as file:
+            file.write(json.dumps(punto, default=str) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+
+# Función que devuelve el estado de cada tabla juntando sus puntos de control en orden.
+# Una última línea a medias se ignora
+def leer_puntos_control():
+    ruta_puntos = funcs.obtener_ruta('EstadoMigracion', FICHERO_PUNTOS_CONTROL)
+    puntos = {}
+    if os.path.exists(ruta_puntos):
+        with open(ruta_puntos, 'r', encoding='utf-8') as file:
+            for linea in file:
+                try:
+                    punto = json.loads(linea)
+                except ValueError:
+                    continue
+                puntos.setdefault(punto['tabla'], {}).update(punto)
+    return puntos
+
+# Función que borra los puntos de control al empezar una migración nueva
+def borrar_puntos_control():
+    ruta_puntos = funcs.obtener_ruta('EstadoMigracion', FICHERO_PUNTOS_CONTROL)
+    if os.path.exists(ruta_puntos):
+        os.remove(ruta_puntos)
+
+# Fichero que acompaña a los ficheros transformados sin cargar (modo transformar) con lo que necesita su carga posterior
+FICHERO_MANIFIESTO = 'manifiesto.json'
+
+# Función que guarda el manifiesto de los ficheros transformados: por tabla, su fichero, la marca y las filas,
+# y las opciones con las que se han transformado
+def guardar_manifiesto(tablas, formato, compresion, incremental):
+    ruta_manifiesto = funcs.obtener_ruta('FicherosModificados_Datos', FICHERO_MANIFIESTO)
+    manifiesto = {'formato': formato, 'compresion': compresion, 'incremental': incremental, 'tablas': tablas}
+    with open(ruta_manifiesto + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump(manifiesto, file, indent=4, default=str)
+    os.replace(ruta_manifiesto + '.tmp', ruta_manifiesto)
+
+# Función que obtiene las filas del fichero transformado de una tabla según su informe, sin las sacadas a cuarentena
+def filas_transformadas(datos):
+    filas = datos['transformacion'].get('filas')
+    validacion = datos.get('validacion', {})
+    if filas is not None and validacion.get('cuarentena'):
+        filas -= validacion['filas_huerfanas']
+    return filas
+
+# Función que borra el manifiesto de los ficheros transformados
+def borrar_manifiesto():
+    ruta_manifiesto = funcs.obtener_ruta('FicherosModificados_Datos', FICHERO_MANIFIESTO)
+    if os.path.exists(ruta_manifiesto):
+        os.remove(ruta_manifiesto)
+
+# Función que lee el manifiesto de los ficheros transformados (None si no hay)
+def leer_manifiesto():
+    ruta_manifiesto = funcs.obtener_ruta('FicherosModificados_Datos', FICHERO_MANIFIESTO)
+    if not os.path.exists(ruta_manifiesto):
+        return None
+    with open(ruta_manifiesto, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+# Fichero en el que se guarda, por tabla, el mayor Id del volcado ya migrado
+FICHERO_MARCAS = 'marcas_incrementales.json'
+
+# Función que lee las marcas de la última migración
+def leer_marcas():
+    ruta_marcas = funcs.obtener_ruta('EstadoMigracion', FICHERO_MARCAS)
+    if not os.path.exists(ruta_marcas):
+        return {}
+    with open(ruta_marcas, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+# Función que guarda las marcas. Se escribe un fichero temporal y se renombra para no dejarlo a medias
+def guardar_marcas(marcas):
+    ruta_marcas = funcs.obtener_ruta('EstadoMigracion', FICHERO_MARCAS)
+    with open(ruta_marcas + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump(marcas, file, indent=4, sort_keys=True)
+    os.replace(ruta_marcas + '.tmp', ruta_marcas)
+
+# Función que comprueba que las dependencias entre las tablas a migrar no tienen ciclos
+def comprobar_dependencias(tablas):
+    pendientes = set(tablas)
+    while pendientes:
+        preparadas = {tabla for tabla in pendientes if not (set(DEPENDENCIAS[tabla]) & pendientes)}
+        if not preparadas:
+            raise ValueError(f"Dependencias circulares entre las tablas: {', '.join(sorted(pendientes))}")
+        pendientes -= preparadas
+
+# Opciones de una migración (ver ejecutar_migracion):
+#  - procesos: procesos que transforman los ficheros (None para usar todos los núcleos)
+#  - conexiones: hilos de carga, cada uno con una conexión del pool
+#  - carga_masiva: transformar las tablas a ficheros TSV y cargarlas con LOAD DATA LOCAL INFILE
+#  - lotes: tamaño de los INSERT (filas_por_lote, bytes_por_lote) y cada cuántos se confirma (lotes_por_commit)
+#  - incremental: no vaciar las tablas, leer solo las filas posteriores a la marca de cada tabla y cargarlas con upserts
+#  - reanudar: continuar la migración interrumpida desde sus puntos de control
+#  - limite_cache: tamaño máximo de la caché de transformaciones (None para no usarla)
+#  - columnar: transformar por columnas con NumPy las tablas que lo permiten
+#  - progreso: mostrar una barra con el avance de las tablas
+#  - modo: 'completo', 'transformar' (solo genera los ficheros y su manifiesto) o 'cargar' (carga los ficheros del manifiesto)
+#  - compresion: compresión de los ficheros transformados
+#  - partes: número de partes en las que se reparten los volcados grandes para transformarlos en varios procesos
+#  - escritores: conexiones asíncronas con las que se carga cada script SQL, además de las del pool
+#  - diferir_indices: quitar los índices secundarios de las tablas que se cargan completas y crearlos al terminar cada una
+#  - validacion: None, 'informar' o 'cuarentena' (módulo ClavesExternas)
+#  - perfil: tablas y mediciones que se perfilan (módulo Perfiles)
+#  - verificar: la carga se verifica al terminar (módulo Verificacion)
+OpcionesMigracion = namedtuple('OpcionesMigracion', ['procesos', 'conexiones', 'carga_masiva', 'lotes', 'incremental', 'reanudar',
+                                                     'limite_cache', 'columnar', 'progreso', 'modo', 'compresion', 'partes',
+                                                     'escritores', 'diferir_indices', 'validacion', 'perfil', 'verificar'],
+                               defaults=[None, 4, False, None, False, False, cache.LIMITE_CACHE, False, False, 'completo', None, 1,
+                                         None, False, None, None, False])
+
+# Función que migra los ficheros en paralelo respetando el orden de las claves externas. Las opciones se pasan por nombre
+# (ver OpcionesMigracion).
+# Las transformaciones se reparten en un pool de procesos y cada tabla se carga en un hilo con una conexión del pool
+# en cuanto su fichero está transformado y las tablas de las que depende ya están cargadas.
+# Con carga_masiva las tablas se transforman a ficheros TSV y se cargan con LOAD DATA LOCAL INFILE.
+# Con incremental no se vacían las tablas: solo se leen las filas posteriores a la marca de cada tabla y se cargan con upserts.
+# En ambos modos la marca de cada tabla se actualiza cuando termina su carga.
+# Con reanudar se continúa la migración interrumpida: las tablas terminadas no se vuelven a cargar y las que
+# se quedaron a medias siguen desde su último punto de control con upserts, por si el último lote llegó a confirmarse.
+# En las tablas con clave generada se borran antes las filas con Id mayor que el del punto de control. Si ya no existe
+# el fichero transformado del punto de control, la tabla se transforma de nuevo y se carga entera de la misma forma.
+# Los ficheros cuyo volcado no ha cambiado se toman de la caché de transformaciones, salvo con limite_cache None.
+# En informe_migracion se guardan por tabla su estado, el fichero que se carga y las medidas de su transformación y de su carga.
+# modo 'transformar' solo genera los ficheros transformados (comprimidos con compresion) y su manifiesto, sin usar el pool;
+# modo 'cargar' carga los ficheros del manifiesto sin transformar nada. Las marcas se actualizan al cargar.
+# Con diferir_indices los índices quitados se crean de nuevo en paralelo con el resto de cargas. Los índices que una migración
+# interrumpida dejó sin crear se crean siempre.
+# Con validacion 'informar' o 'cuarentena' se comprueban las claves externas de cada fichero transformado antes de cargarlo
+# y se informa de las filas huérfanas; con 'cuarentena' además se sacan del fichero y no se cargan.
+# La carga incremental no se valida: las tablas padre ya tienen filas que no están en sus ficheros.
+# Al migrar componentes se calcula con su fichero transformado la tabla de cierre de su jerarquía, que se carga completa tras ella.
+# Al migrar ordenes e incidenciasordenes se calculan con sus ficheros los indicadores diarios (módulo Indicadores), salvo en la
+# carga incremental: sus ficheros solo tienen las filas nuevas.
+# Con perfil (módulo Perfiles) la transformación y la carga de las tablas elegidas se miden con cProfile y/o tracemalloc.
+# Con verificar, y siempre en el modo 'transformar' por si la carga posterior se verifica, cada fichero transformado se guarda
+# con el resumen de sus filas que usa la verificación (módulo Verificacion). La carga incremental no se verifica
+def ejecutar_migracion(pool, ficheros, *, informe_migracion=None, **opciones):
+    migracion = Migracion(pool, ficheros, OpcionesMigracion(**opciones), {} if informe_migracion is None else informe_migracion)
+    resultado = migracion.planificar()
+    if resultado is not True:
+        return resultado
+    return migracion.ejecutar()
+
+# Migración en curso: las tablas a migrar, sus opciones y lo que se ha hecho con cada tabla.
+# planificar decide qué hay que hacer con cada tabla y ejecutar reparte el trabajo entre los pools de procesos y de hilos:
+# lanza las transformaciones, validaciones, cálculos y cargas en cuanto están listas y recoge sus resultados
+class Migracion:
+    def __init__(self, pool, ficheros, opciones, informe_migracion):
+        self.pool = pool
+        self.opciones = opciones
+        lotes = opciones.lotes or {}
+        self.filas_por_lote = lotes.get('filas_por_lote')
+        self.bytes_por_lote = lotes.get('bytes_por_lote')
+        self.lotes_por_commit = lotes.get('lotes_por_commit')
+        self.informe_migracion = informe_migracion
+        self.informe_tablas = informe_migracion.setdefault('tablas', {})
+
+        self.tablas = {TABLAS_FICHEROS[fichero]: fichero for fichero in ficheros}
+        comprobar_dependencias(self.tablas)
+
+        # Fichero modificado y nueva marca de cada tabla transformada que aún no se ha cargado
+        self.transformadas = {}
+        self.nuevas_marcas = {}
+        self.cargadas = set()
+        # Tareas lanzadas en los pools, con su etapa y su tabla
+        self.en_curso = {}
+        # Posición desde la que continuar la carga de las tablas que se quedaron a medias
+        self.reanudadas = {}
+        # Tablas cuyas claves externas se validan, ficheros transformados pendientes de validar e Id de las tablas padre ya validadas
+        self.validables = set()
+        self.por_validar = {}
+        self.ids_tablas = {}
+        # Tareas perfiladas, que devuelven además del resultado de su etapa las medidas del perfil
+        self.perfilados = set()
+
+    # Función que lee el manifiesto, las marcas y los puntos de control y decide qué tablas calculadas hay que obtener.
+    # Devuelve True o el mensaje de error si la migración no se puede hacer
+    def planificar(self):
+        opciones = self.opciones
+        self.manifiesto = None
+        if opciones.modo != 'cargar':
+            # Los ficheros transformados se van a sustituir: el manifiesto anterior ya no vale
+            borrar_manifiesto()
+        else:
+            self.manifiesto = leer_manifiesto()
+            if self.manifiesto is None:
+                return f"No hay ficheros transformados que cargar: falta {FICHERO_MANIFIESTO} en FicherosModificados_Datos"
+            faltan = [tabla for tabla in self.tablas if tabla not in self.manifiesto['tablas']]
+            if faltan:
+                return f"El manifiesto de los ficheros transformados no incluye las tablas: {', '.join(faltan)}"
+
+        self.marcas = leer_marcas()
+        if opciones.reanudar:
+            self.puntos = leer_puntos_control()
+            if not self.puntos:
+                return "No hay ninguna migración que reanudar"
+        else:
+            self.puntos = {}
+            # Los puntos de control son de las cargas: el modo transformar no los toca
+            if opciones.modo != 'transformar':
+                borrar_puntos_control()
+
+        # Índices quitados de cada tabla que hay que volver a crear cuando termine su carga
+        self.diferidos = indices_diferidos.leer_diferidos() if opciones.modo != 'transformar' else {}
+        # La jerarquía de componentes se calcula de nuevo salvo si ya se cargó en la migración reanudada
+        self.jerarquia_pendiente = (jerarquia.TABLA_COMPONENTES in self.tablas
+                                    and self.puntos.get(jerarquia.TABLA_JERARQUIA, {}).get('estado') != 'terminada')
+        # Los indicadores se calculan de nuevo salvo si ya se cargaron en la migración reanudada
+        self.indicadores_pendientes = (not opciones.incremental and all(tabla in self.tablas for tabla in indicadores.TABLAS_ORIGEN)
+                                       and any(self.puntos.get(tabla, {}).get('estado') != 'terminada'
+                                               for tabla in indicadores.TABLAS_INDICADORES))
+        # Columnas de los ficheros transformados de las tablas cuyas claves externas se pueden validar
+        self.columnas_validacion = {}
+        if opciones.validacion and not opciones.incremental:
+            for tabla, fichero in self.tablas.items():
+                if claves_externas.validable(tabla):
+                    columnas = claves_externas.columnas_fichero(self.pool, tabla, fichero)
+                    if isinstance(columnas, str):
+                        return columnas
+                    self.columnas_validacion[tabla] = columnas
+        return True
+
+    # Función que ejecuta la migración planificada. Devuelve True o el mensaje de error de la primera tarea que falla
+    def ejecutar(self):
+        opciones = self.opciones
+        barra = (informe.BarraProgreso(self.informe_migracion, len(self.tablas) + self.jerarquia_pendiente +
+                                       self.indicadores_pendientes * len(indicadores.TABLAS_INDICADORES)) if opciones.progreso else None)
+        self.transformadores = ProcessPoolExecutor(max_workers=opciones.procesos or os.cpu_count())
+        self.cargadores = ThreadPoolExecutor(max_workers=opciones.conexiones)
+        # Hilos que reparten los volcados grandes entre los procesos y unen sus partes
+        self.coordinadores = ThreadPoolExecutor(max_workers=len(self.tablas) or 1)
+        try:
+            if barra is not None:
+                barra.iniciar()
+
+            for tabla in self.tablas:
+                self.preparar_tabla(tabla)
+            self.quitar_indices()
+
+            while True:
+                self.lanzar_validaciones()
+                self.lanzar_jerarquia()
+                self.lanzar_indicadores()
+                resultado = self.lanzar_cargas()
+                if resultado is not True:
+                    return resultado
+
+                if not self.en_curso:
+                    break
+
+                terminadas, _ = wait(self.en_curso, return_when=FIRST_COMPLETED)
+                for futuro in terminadas:
+                    resultado = self.recoger(futuro)
+                    if resultado is not True:
+                        return resultado
+
+            if opciones.modo == 'transformar':
+                guardar_manifiesto({tabla: {'fichero': fichero_modificado, 'marca': self.nuevas_marcas[tabla],
+                                            'filas': filas_transformadas(self.informe_tablas[tabla])}
+                                    for tabla, fichero_modificado in self.transformadas.items()},
+                                   'tsv' if opciones.carga_masiva else 'sql', opciones.compresion, opciones.incremental)
+                informe.registrar(f"Ficheros transformados sin cargar; el manifiesto está en FicherosModificados_Datos/{FICHERO_MANIFIESTO}")
+            return True
+        finally:
+            # Si la migración se interrumpe no se lanza ninguna tarea más. Las partes pendientes se cancelan antes de esperar
+            # a los hilos que reparten los volcados, que si no esperarían a que se transformasen todas
+            self.transformadores.shutdown(wait=False, cancel_futures=True)
+            self.coordinadores.shutdown(cancel_futures=True)
+            self.transformadores.shutdown(cancel_futures=True)
+            self.cargadores.shutdown(cancel_futures=True)
+            if barra is not None:
+                barra.detener()
+
+    # Función que decide qué se hace con una tabla al empezar: nada si ya se cargó en la migración reanudada, seguir con su
+    # fichero transformado si aún existe, tomar el del manifiesto en el modo cargar o lanzar su transformación
+    def preparar_tabla(self, tabla):
+        opciones = self.opciones
+        fichero = self.tablas[tabla]
+        self.informe_tablas[tabla] = {'fichero': fichero, 'estado': 'pendiente'}
+        punto = self.puntos.get(tabla)
+        if punto is not None and punto['estado'] == 'terminada':
+            self.cargadas.add(tabla)
+            self.informe_tablas[tabla].update(estado='terminada', cargada_antes=True)
+            informe.registrar(f"La tabla {tabla} ya se cargó en la migración anterior.")
+            return
+        if punto is not None and os.path.exists(funcs.obtener_ruta('FicherosModificados_Datos', punto['fichero'])):
+            # El fichero transformado se reutiliza para que la posición del punto de control siga siendo válida
+            self.transformadas[tabla] = punto['fichero']
+            self.nuevas_marcas[tabla] = punto['marca']
+            self.reanudadas[tabla] = punto['posicion']
+            self.informe_tablas[tabla].update(estado='transformada', transformacion={'reanudada': True})
+            return
+        if punto is not None:
+            # La tabla quedó a medias pero su fichero ya no existe: se carga entero sobre las filas ya cargadas
+            self.reanudadas[tabla] = 0
+        if opciones.validacion and not opciones.incremental and claves_externas.validable(tabla):
+            self.validables.add(tabla)
+        if self.manifiesto is not None:
+            artefacto = self.manifiesto['tablas'][tabla]
+            (self.por_validar if tabla in self.validables else self.transformadas)[tabla] = artefacto['fichero']
+            self.nuevas_marcas[tabla] = artefacto['marca']
+            self.informe_tablas[tabla].update(estado='transformada', transformacion={'manifiesto': True, 'filas': artefacto['filas']})
+            return
+        self.lanzar_transformacion(tabla)
+
+    # Función que lanza la transformación del volcado de una tabla
+    def lanzar_transformacion(self, tabla):
+        opciones = self.opciones
+        fichero = self.tablas[tabla]
+        # Las tablas perfiladas se transforman siempre y sin repartir, para que el perfil mida toda su transformación
+        perfilar = perfiles.perfilada(opciones.perfil, tabla, fichero)
+        partes_tabla = 1 if perfilar else particiones.numero_partes(fichero, opciones.partes)
+        resumir = (opciones.verificar or opciones.modo == 'transformar') and not opciones.incremental
+        argumentos = (fichero, 'tsv' if opciones.carga_masiva else 'sql', self.filas_por_lote, self.bytes_por_lote,
+                      self.marcas.get(tabla) if opciones.incremental else None, None if perfilar else opciones.limite_cache,
+                      opciones.columnar, opciones.compresion, resumir)
+        if perfilar:
+            futuro = self.transformadores.submit(perfiles.perfilar, opciones.perfil, tabla, 'transformar', cache.transformar_fichero,
+                                                 *argumentos)
+            self.perfilados.add(futuro)
+        elif partes_tabla > 1:
+            futuro = self.coordinadores.submit(cache.transformar_fichero, *argumentos, partes_tabla, self.transformadores)
+        else:
+            futuro = self.transformadores.submit(cache.transformar_fichero, *argumentos)
+        self.en_curso[futuro] = ('transformar', tabla)
+
+    # Función que quita los índices de las tablas que se van a cargar completas, si se difieren, y lanza ya la creación
+    # de los índices pendientes de las tablas que no se van a cargar
+    def quitar_indices(self):
+        opciones = self.opciones
+        # Los índices no se quitan en la carga incremental: recrearlos sobre toda la tabla cuesta más que las filas nuevas
+        if opciones.diferir_indices and opciones.modo != 'transformar' and not opciones.incremental:
+            for tabla in self.tablas:
+                if tabla not in self.cargadas and tabla not in self.diferidos:
+                    indices = indices_diferidos.quitar_indices(self.pool, tabla)
+                    if indices:
+                        self.diferidos[tabla] = indices
+                        informe.registrar(f"Se han quitado {len(indices)} índices de la tabla {tabla} hasta terminar su carga.")
+
+        for tabla in list(self.diferidos):
+            if tabla in self.cargadas or tabla not in self.tablas:
+                self.lanzar_indices(tabla)
+
+    # Función que lanza en un hilo de carga la creación de los índices quitados de una tabla
+    def lanzar_indices(self, tabla):
+        self.en_curso[lanzar_indices(self.cargadores, self.pool, tabla, self.diferidos.pop(tabla), self.informe_tablas)] = ('indexar', tabla)
+
+    # Función que valida las tablas transformadas cuyas tablas padre ya tienen sus Id. Si falta la validación de un padre
+    # (porque se cargó en la migración anterior o no se migra) esa clave externa no se comprueba
+    def lanzar_validaciones(self):
+        for tabla in list(self.por_validar):
+            padres = [clave.padre for clave in claves_externas.CLAVES_EXTERNAS.get(tabla, [])]
+            if all(padre in self.ids_tablas or padre not in self.validables for padre in padres):
+                self.en_curso[self.transformadores.submit(claves_externas.validar_fichero, tabla, self.columnas_validacion[tabla],
+                                                          self.por_validar.pop(tabla),
+                                                          {padre: self.ids_tablas[padre] for padre in padres if padre in self.ids_tablas},
+                                                          self.opciones.validacion == 'cuarentena')] = ('validar', tabla)
+
+    # Función que calcula la jerarquía en cuanto el fichero de componentes está listo para cargarse. Si los componentes
+    # se cargaron en la migración anterior se usa su fichero, si aún existe
+    def lanzar_jerarquia(self):
+        if not self.jerarquia_pendiente:
+            return
+        fichero_componentes = fichero_origen(jerarquia.TABLA_COMPONENTES, self.transformadas, self.informe_tablas, self.puntos)
+        if fichero_componentes is False:
+            print(f"No se puede calcular {jerarquia.TABLA_JERARQUIA}: ya no existe el fichero transformado de componentes")
+            self.jerarquia_pendiente = False
+        elif fichero_componentes is not None:
+            self.jerarquia_pendiente = False
+            self.en_curso[self.transformadores.submit(jerarquia.construir_jerarquia, self.tablas[jerarquia.TABLA_COMPONENTES],
+                                                      fichero_componentes)] = ('jerarquia', jerarquia.TABLA_JERARQUIA)
+
+    # Función que calcula los indicadores en cuanto están listos los ficheros de sus tablas de origen que se migran
+    def lanzar_indicadores(self):
+        if not self.indicadores_pendientes:
+            return
+        origenes = {tabla: fichero_origen(tabla, self.transformadas, self.informe_tablas, self.puntos)
+                    for tabla in indicadores.TABLAS_ORIGEN + indicadores.TABLAS_PLANTAS if tabla in self.tablas}
+        perdidos = [tabla for tabla, fichero_modificado in origenes.items() if fichero_modificado is False]
+        if perdidos:
+            print(f"No se pueden calcular los indicadores: ya no existe el fichero transformado de {', '.join(perdidos)}")
+            self.indicadores_pendientes = False
+        elif None not in origenes.values():
+            self.indicadores_pendientes = False
+            self.en_curso[self.transformadores.submit(indicadores.calcular_indicadores,
+                                                      {tabla: (self.tablas[tabla], fichero_modificado)
+                                                       for tabla, fichero_modificado in origenes.items()})] = ('indicadores', None)
+
+    # Función que lanza la carga de las tablas transformadas cuyas dependencias ya están cargadas.
+    # Devuelve True o el mensaje de error si alguna no se ha podido preparar
+    def lanzar_cargas(self):
+        if self.opciones.modo == 'transformar':
+            return True
+        for tabla in list(self.transformadas):
+            if all(padre in self.cargadas or padre not in self.tablas for padre in DEPENDENCIAS[tabla]):
+                resultado = self.lanzar_carga(tabla)
+                if resultado is not True:
+                    self.informe_tablas[tabla]['estado'] = 'error'
+                    return resultado
+        return True
+
+    # Función que prepara la carga de una tabla y la lanza en un hilo de carga. Devuelve True o el mensaje de error
+    def lanzar_carga(self, tabla):
+        opciones = self.opciones
+        fichero_modificado = self.transformadas.pop(tabla)
+        desde = self.reanudadas.get(tabla, 0)
+        if tabla in TABLAS_CALCULADAS:
+            # Se vacía la tabla, que crean las migraciones de la base de datos
+            resultado = (jerarquia.preparar_tabla(self.pool) if tabla == jerarquia.TABLA_JERARQUIA
+                         else indicadores.preparar_tabla(self.pool, tabla))
+            if resultado is not True:
+                return resultado
+        clave_generada = None if tabla in TABLAS_CALCULADAS else funcs.MAPEOS[self.tablas[tabla]].clave_generada
+        ids = {}
+        if clave_generada:
+            ids = self.preparar_clave_generada(tabla, clave_generada, desde)
+            if isinstance(ids, str):
+                return ids
+        # Los INSERT confirmados por delante del punto de control se saltan al reanudar desde él
+        confirmadas = [posicion for posicion in self.puntos[tabla].get('confirmadas', []) if posicion > desde] if desde else []
+        registrar_punto_control(tabla, 'cargando', fichero=fichero_modificado, marca=self.nuevas_marcas[tabla], posicion=desde,
+                                confirmadas=confirmadas, **ids)
+        self.informe_tablas[tabla].update(estado='cargando', fichero_modificado=fichero_modificado, carga={'filas': 0})
+        argumentos = (self.pool, tabla, fichero_modificado, self.filas_por_lote, self.lotes_por_commit,
+                      (opciones.incremental or tabla in self.reanudadas) and tabla not in TABLAS_CALCULADAS, desde,
+                      self.informe_tablas[tabla]['carga'], opciones.escritores, clave_generada, confirmadas)
+        if perfiles.perfilada(opciones.perfil, tabla, self.tablas.get(tabla)):
+            futuro = self.cargadores.submit(perfiles.perfilar, opciones.perfil, tabla, 'cargar', cargar_fichero, *argumentos)
+            self.perfilados.add(futuro)
+        else:
+            futuro = self.cargadores.submit(cargar_fichero, *argumentos)
+        self.en_curso[futuro] = ('cargar', tabla)
+        return True
+
+    # Función que obtiene los Id que guarda el punto de control de una tabla que genera sus Id: el mayor al empezar, tras borrar
+    # lo cargado después del punto de control si se reanuda, para poder volver a ese punto si la carga se interrumpe antes de un
+    # commit. Las cargas desde el principio del fichero guardan también el Id inicial, hasta el que se borra si se reanuda
+    # desde el principio. Devuelve los Id o el mensaje de error
+    def preparar_clave_generada(self, tabla, clave_generada, desde):
+        if tabla in self.reanudadas:
+            ultimo_id = self.puntos[tabla].get('ultimo_id' if desde else 'id_inicial')
+            if not isinstance(ultimo_id, int):
+                return f"No se puede reanudar la tabla {tabla}: su punto de control no indica el último Id cargado"
+            resultado = funcs.borrar_filas_posteriores(self.pool, tabla, clave_generada, ultimo_id)
+            if resultado is not True:
+                return resultado
+        ids = {'ultimo_id': funcs.consultar_maximo_id(self.pool, tabla, clave_generada)}
+        if not desde:
+            ids['id_inicial'] = ids['ultimo_id']
+        return ids
+
+    # Función que recoge el resultado de una tarea terminada y lanza lo que sigue a su etapa.
+    # Devuelve True o el mensaje de error de la tarea
+    def recoger(self, futuro):
+        etapa, tabla = self.en_curso.pop(futuro)
+        resultado = futuro.result()
+        if futuro in self.perfilados:
+            self.perfilados.discard(futuro)
+            resultado, self.informe_tablas[tabla].setdefault('perfil', {})[etapa] = resultado
+
+        if etapa == 'transformar':
+            fichero_modificado, self.nuevas_marcas[tabla], medidas = resultado
+            (self.por_validar if tabla in self.validables else self.transformadas)[tabla] = fichero_modificado
+            # El ritmo de la transformación se calcula sobre la suma de sus etapas, sin la espera en el pool.
+            # En los volcados repartidos las etapas suman el tiempo de todos los procesos: se usa el tiempo real
+            informe.calcular_ritmo(medidas, medidas.get('reloj') or
+                                   sum(medidas.get(nombre, 0) for nombre in ('leer', 'analizar', 'transformar', 'escribir')))
+            self.informe_tablas[tabla].update(estado='transformada', transformacion=medidas)
+        elif etapa == 'jerarquia':
+            self.transformadas[tabla], medidas = resultado
+            self.nuevas_marcas[tabla] = None
+            self.informe_tablas[tabla] = {'fichero': None, 'estado': 'transformada', 'transformacion': medidas}
+            jerarquia.imprimir_jerarquia(medidas)
+        elif etapa == 'indicadores':
+            ficheros_indicadores, medidas = resultado
+            for tabla_indicadores, fichero_indicadores in ficheros_indicadores.items():
+                self.transformadas[tabla_indicadores] = fichero_indicadores
+                self.nuevas_marcas[tabla_indicadores] = None
+                self.informe_tablas[tabla_indicadores] = {'fichero': None, 'estado': 'transformada',
+                                                          'transformacion': dict(medidas, filas=medidas['filas'][tabla_indicadores])}
+            indicadores.imprimir_indicadores(medidas)
+        elif etapa == 'validar':
+            self.transformadas[tabla], ids, self.informe_tablas[tabla]['validacion'] = resultado
+            if ids is not None:
+                self.ids_tablas[tabla] = ids
+            claves_externas.imprimir_validacion(tabla, self.informe_tablas[tabla]['validacion'])
+        elif resultado is not True:
+            self.informe_tablas[tabla]['estado'] = 'error'
+            return resultado
+        elif etapa == 'indexar':
+            if self.informe_tablas[tabla].get('estado') == 'indexando':
+                self.informe_tablas[tabla]['estado'] = 'terminada'
+            informe.registrar(f"Se han vuelto a crear los índices de la tabla {tabla}.")
+        else:
+            self.terminar_carga(tabla)
+        return True
+
+    # Función que da por cargada una tabla: guarda su punto de control y su marca y lanza la creación de sus índices diferidos
+    def terminar_carga(self, tabla):
+        self.cargadas.add(tabla)
+        self.informe_tablas[tabla]['estado'] = 'terminada'
+        registrar_punto_control(tabla, 'terminada')
+        if self.nuevas_marcas[tabla] is not None:
+            self.marcas[tabla] = self.nuevas_marcas[tabla]
+            guardar_marcas(self.marcas)
+        elif not self.opciones.incremental and self.marcas.pop(tabla, None) is not None:
+            # La tabla se ha vaciado y el volcado no tiene filas: la marca anterior ya no vale
+            guardar_marcas(self.marcas)
+        informe.registrar(f"Se ha terminado la ejecucion de la tabla {tabla}.")
+        if tabla in self.diferidos:
+            # Las tablas que dependen de esta ya pueden cargarse mientras se crean sus índices
+            self.informe_tablas[tabla]['estado'] = 'indexando'
+            self.lanzar_indices(tabla)
@@ -0,0 +1,253 @@
+import os
+import re
+import json
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import Migrations as funcs
+import Informe as informe
+
+# Verificación de la carga: se compara por tramos de la primera columna de la clave el número de filas y la suma de
+# los CRC32 de la clave de cada fila, en los ficheros transformados y en las tablas de destino.
+# Los tramos de los ficheros se acumulan al transformarlos y se guardan en un resumen junto a cada fichero
+# (<fichero>.resumen.json), para no tener que volver a leerlo después de la carga
+
+# Ids de cada tramo en los que se comparan las filas
+TAMANO_TRAMO = 10000
+
+# Rangos distintos que se guardan como máximo por tabla en el informe
+MAXIMO_RANGOS = 20
+
+# Extensión del resumen de los tramos que se guarda junto a cada fichero transformado
+EXTENSION_RESUMEN = '.resumen.json'
+
+# Expresión que recorre un INSERT saltando las cadenas y captura el primer valor de cada tupla si es un número o NULL
+PRIMER_VALOR = re.compile(r"'(?:[^'\\]|\\.)*'|(?:VALUES |\),)(\()(-?\d+|NULL)?")
+
+# Expresión de los valores enteros, los únicos que se reparten en tramos
+ENTERO = re.compile(r'-?\d+')
+
+# Función que calcula el tramo y el CRC32 de la clave de una fila, con el mismo resultado que la consulta de destino:
+# FLOOR(primera / TAMANO_TRAMO) y CRC32(CONCAT_WS('#', ...)), que se salta los NULL.
+# Las filas cuya primera columna no es un entero (NULL, códigos de texto) van todas al tramo None
+def resumir_clave(valores, tamano_tramo):
+    if not valores:
+        return None, 0
+    primera = valores[0]
+    tramo = int(primera) // tamano_tramo if primera is not None and ENTERO.fullmatch(str(primera)) else None
+    return tramo, zlib.crc32('#'.join([str(valor) for valor in valores if valor is not None]).encode('utf-8'))
+
+# Función que obtiene de un INSERT del fichero transformado los valores de las columnas de la clave de cada fila.
+# Si la clave es solo la primera columna y es numérica se captura sin separar el resto de valores
+def leer_claves_sql(sentencia, posiciones):
+    if posiciones == [0]:
+        valores = [valor for inicio, valor in PRIMER_VALOR.findall(sentencia) if inicio]
+        if all(valores):
+            return [[None if valor == 'NULL' else valor] for valor in valores]
+    return [[fila[posicion] for posicion in posiciones] for fila in funcs.tokenizar_valores(sentencia)]
+
+# Función que obtiene de una línea de un fichero de carga masiva los valores de las columnas de la clave
+def leer_claves_tsv(linea, posiciones):
+    campos = linea.rstrip('\n').split('\t')
+    return [funcs.leer_campo_tsv(campos[posicion]) for posicion in posiciones]
+
+# Función que lee de cada fila de un fichero transformado, en su orden, los valores de las columnas de las posiciones indicadas
+def leer_claves_fichero(fichero_modificado, posiciones):
+    if funcs.formato_fichero(fichero_modificado) == 'tsv':
+        ruta_fichero = funcs.obtener_ruta('FicherosModificados_Datos', fichero_modificado)
+        return (leer_claves_tsv(linea, posiciones) for linea in leer_lineas_tsv(ruta_fichero))
+    return (claves for sentencia in funcs.leer_fichero_modificado(fichero_modificado) if sentencia.startswith("INSERT INTO")
+            for claves in leer_claves_sql(sentencia, posiciones))
+
+# Función que acumula en tramos las filas y la suma de los CRC32 de las claves indicadas. Con signo -1 las claves se descuentan
+def acumular_tramos(tramos, claves, tamano_tramo=TAMANO_TRAMO, signo=1):
+    for valores in claves:
+        tramo, crc = resumir_clave(valores, tamano_tramo)
+        resumen = tramos.get(tramo)
+        if resumen is None:
+            tramos[tramo] = [signo, signo * crc]
+        else:
+            resumen[0] += signo
+            resumen[1] += signo * crc
+
+# Función que recorre un fichero transformado y devuelve por tramo sus filas y la suma de los CRC32 de sus claves.
+# posiciones son las columnas de la clave en las filas del fichero; sin posiciones solo se cuentan las filas.
+# Se ejecuta en un proceso independiente por tabla
+def resumir_fichero(fichero_modificado, posiciones, tamano_tramo=TAMANO_TRAMO):
+    tramos = {}
+    acumular_tramos(tramos, leer_claves_fichero(fichero_modificado, posiciones), tamano_tramo)
+    return tramos
+
+# Función que obtiene las posiciones en las filas del fichero transformado de un volcado de las columnas con las que se verifica
+def posiciones_verificacion(mapeo):
+    return mapeo.clave_verificacion or [0]
+
+# Resumen de un fichero transformado que se acumula al transformarlo: posiciones de la clave, tamaño de los tramos y
+# filas y suma de los CRC32 de cada tramo
+def nuevo_resumen(posiciones, tamano_tramo=TAMANO_TRAMO):
+    return {'posiciones': posiciones, 'tamano_tramo': tamano_tramo, 'tramos': {}}
+
+# Función que acumula en el resumen las filas de un INSERT transformado, separadas (Insercion) o en su texto
+def acumular_insercion(resumen, sentencia):
+    posiciones = resumen['posiciones']
+    if isinstance(sentencia, funcs.Insercion):
+        claves = ([fila[posicion] for posicion in posiciones] for fila in sentencia.filas)
+    else:
+        claves = leer_claves_sql(sentencia, posiciones)
+    acumular_tramos(resumen['tramos'], claves, resumen['tamano_tramo'])
+
+# Función que suma a un resumen los tramos de otro, como los de las partes de un mismo fichero
+def sumar_resumen(resumen, otro):
+    for tramo, (filas, suma) in otro['tramos'].items():
+        actual = resumen['tramos'].setdefault(tramo, [0, 0])
+        actual[0] += filas
+        actual[1] += suma
+
+# Función que obtiene la ruta del resumen de un fichero transformado
+def ruta_resumen(ruta_modificado):
+    return ruta_modificado + EXTENSION_RESUMEN
+
+# Función que guarda el resumen junto al fichero transformado ya escrito, con su tamaño para detectar si el fichero cambia
+def guardar_resumen(ruta_modificado, resumen):
+    datos = {'posiciones': resumen['posiciones'], 'tamano_tramo': resumen['tamano_tramo'], 'bytes': os.path.getsize(ruta_modificado),
+             'tramos': [[tramo, filas, suma] for tramo, (filas, suma) in resumen['tramos'].items() if filas]}
+    with open(ruta_resumen(ruta_modificado) + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump(datos, file)
+    os.replace(ruta_resumen(ruta_modificado) + '.tmp', ruta_resumen(ruta_modificado))
+
+# Función que lee el resumen de un fichero transformado. Devuelve None si no tiene o si el fichero ha cambiado desde que se guardó
+def leer_resumen(ruta_modificado):
+    try:
+        with open(ruta_resumen(ruta_modificado), 'r', encoding='utf-8') as file:
+            datos = json.load(file)
+        if datos['bytes'] != os.path.getsize(ruta_modificado):
+            return None
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+    datos['tramos'] = {tramo: [filas, suma] for tramo, filas, suma in datos['tramos']}
+    return datos
+
+# Función que borra el resumen de un fichero transformado que se va a sustituir
+def borrar_resumen(ruta_modificado):
+    if os.path.exists(ruta_resumen(ruta_modificado)):
+        os.remove(ruta_resumen(ruta_modificado))
+
+# Función que lee las filas de un fichero de carga masiva sin separar sus valores
+def leer_lineas_tsv(ruta_fichero):
+    with funcs.abrir_fichero(ruta_fichero, 'rt', funcs.compresion_fichero(ruta_fichero), encoding='utf-8', newline='\n') as file:
+        file.readline()
+        yield from file
+
+# Función que calcula en la base de datos los mismos tramos que resumir_fichero
+def resumir_tabla(pool, tabla, columnas_clave, tamano_tramo=TAMANO_TRAMO):
+    if columnas_clave:
+        primera = f"`{columnas_clave[0]}`"
+        consulta = (f"SELECT CASE WHEN {primera} REGEXP '^-?[0-9]+$' THEN FLOOR({primera} / {int(tamano_tramo)}) END AS tramo, COUNT(*), "
+                    f"SUM(CRC32(CONCAT_WS('#', {', '.join(f'`{columna}`' for columna in columnas_clave)}))) "
+                    f"FROM `{tabla}` GROUP BY tramo")
+    else:
+        consulta = f"SELECT NULL, COUNT(*), 0 FROM `{tabla}`"
+
+    with pool.conexion() as conexion:
+        cursor = conexion.cursor()
+        cursor.execute(consulta)
+        filas = cursor.fetchall()
+        cursor.close()
+    return {None if tramo is None else int(tramo): [int(numero), int(suma or 0)] for tramo, numero, suma in filas if numero}
+
+# Función que elige las columnas de la clave con las que se verifica una tabla y su posición en el fichero transformado.
+# Las tablas con volcado se verifican con las columnas de su mapeo (posiciones_verificacion), las mismas de su resumen.
+# Las tablas sin volcado (fichero None) tienen en su fichero todas las columnas de la tabla y se verifican con su clave
+# primaria; sin clave primaria solo se cuentan filas
+def elegir_clave(pool, tabla, fichero):
+    columnas_tabla, claves = funcs.leer_columnas_tabla(pool, tabla)
+    if fichero is None:
+        clave = [columna for columna in columnas_tabla if columna in claves]
+        return clave, [columnas_tabla.index(columna) for columna in clave]
+    mapeo = funcs.MAPEOS[fichero]
+    columnas_fichero = mapeo.columnas or columnas_tabla
+    posiciones = posiciones_verificacion(mapeo)
+    return [columnas_fichero[posicion] for posicion in posiciones], posiciones
+
+# Función que compara los tramos del fichero y de la tabla y junta los tramos distintos consecutivos en rangos de Ids
+def comparar_tramos(origen, destino, tamano_tramo=TAMANO_TRAMO):
+    rangos = []
+    for tramo in sorted(set(origen) | set(destino), key=lambda tramo: (tramo is not None, tramo or 0)):
+        filas_origen, suma_origen = origen.get(tramo, [0, 0])
+        filas_destino, suma_destino = destino.get(tramo, [0, 0])
+        if filas_origen == filas_destino and suma_origen == suma_destino:
+            continue
+
+        if tramo is None:
+            rangos.append({'desde': None, 'hasta': None, 'filas_origen': filas_origen, 'filas_destino': filas_destino})
+        elif rangos and rangos[-1]['hasta'] is not None and rangos[-1]['hasta'] + 1 == tramo * tamano_tramo:
+            rangos[-1]['hasta'] = (tramo + 1) * tamano_tramo - 1
+            rangos[-1]['filas_origen'] += filas_origen
+            rangos[-1]['filas_destino'] += filas_destino
+        else:
+            rangos.append({'desde': tramo * tamano_tramo, 'hasta': (tramo + 1) * tamano_tramo - 1,
+                           'filas_origen': filas_origen, 'filas_destino': filas_destino})
+    return rangos
+
+# Función que verifica las tablas cargadas comparando sus ficheros transformados con la base de datos.
+# Se usa el resumen de cada fichero guardado al transformarlo; los ficheros sin resumen válido (de una transformación sin
+# resumir, por ejemplo) se recorren en varios procesos. Las consultas se lanzan a la vez con las conexiones del pool.
+# Las tablas de una carga incremental no se pueden comparar con su fichero y se omiten.
+# Devuelve por tabla su estado ('correcta', 'distinta' u 'omitida'), las filas de cada lado, la clave, los rangos distintos
+# y si se ha usado el resumen de la transformación
+def verificar_migracion(pool, informe_tablas, procesos=None, conexiones=4, incremental=False, tamano_tramo=TAMANO_TRAMO):
+    verificacion = {}
+    pendientes = {}
+    for tabla, datos in informe_tablas.items():
+        if datos.get('estado') != 'terminada' or not datos.get('fichero_modificado'):
+            verificacion[tabla] = {'estado': 'omitida', 'motivo': 'no se ha cargado en esta ejecución'}
+        elif incremental:
+            verificacion[tabla] = {'estado': 'omitida', 'motivo': 'carga incremental'}
+        else:
+            pendientes[tabla] = datos
+
+    claves = {tabla: elegir_clave(pool, tabla, datos['fichero']) for tabla, datos in pendientes.items()}
+    resumenes = {}
+    for tabla, datos in pendientes.items():
+        resumen = leer_resumen(funcs.obtener_ruta('FicherosModificados_Datos', datos['fichero_modificado']))
+        if resumen is not None and resumen['posiciones'] == claves[tabla][1] and resumen['tamano_tramo'] == tamano_tramo:
+            resumenes[tabla] = resumen['tramos']
+
+    with ProcessPoolExecutor(max_workers=procesos) as lectores, ThreadPoolExecutor(max_workers=conexiones) as consultas:
+        # Los ficheros se encargan antes que las consultas para que los procesos se creen antes que los hilos
+        origenes = {tabla: lectores.submit(resumir_fichero, datos['fichero_modificado'], claves[tabla][1], tamano_tramo)
+                    for tabla, datos in pendientes.items() if tabla not in resumenes}
+        destinos = {tabla: consultas.submit(resumir_tabla, pool, tabla, claves[tabla][0], tamano_tramo) for tabla in pendientes}
+
+        for tabla in pendientes:
+            clave = claves[tabla][0]
+            origen = resumenes[tabla] if tabla in resumenes else origenes[tabla].result()
+            destino = destinos[tabla].result()
+            rangos = comparar_tramos(origen, destino, tamano_tramo)
+            verificacion[tabla] = {
+                'estado': 'distinta' if rangos else 'correcta',
+                'clave': clave,
+                'filas_origen': sum(filas for filas, _ in origen.values()),
+                'filas_destino': sum(filas for filas, _ in destino.values()),
+                'rangos_distintos': rangos[:MAXIMO_RANGOS],
+                'rangos_omitidos': max(0, len(rangos) - MAXIMO_RANGOS),
+                'resumen_transformacion': tabla in resumenes
+            }
+    return verificacion
+
+# Función que imprime el resultado de la verificación: las tablas distintas siempre y el resto con el nivel info
+def imprimir_verificacion(verificacion):
+    for tabla, resultado in verificacion.items():
+        if resultado['estado'] == 'distinta':
+            print(f"Verificación de {tabla}: {resultado['filas_origen']} filas en el fichero y {resultado['filas_destino']} en la tabla")
+            for rango in resultado['rangos_distintos']:
+                if rango['desde'] is None:
+                    ids = f"{resultado['clave'][0]} no entero o NULL" if resultado['clave'] else 'Toda la tabla'
+                else:
+                    ids = f"{resultado['clave'][0]} {rango['desde']}-{rango['hasta']}"
+                print(f"    {ids}: {rango['filas_origen']} filas en el fichero, {rango['filas_destino']} en la tabla")
+            if resultado['rangos_omitidos']:
+                print(f"    ... y {resultado['rangos_omitidos']} rangos más")
+        elif resultado['estado'] == 'correcta':
+            informe.registrar(f"Verificación de {tabla}: {resultado['filas_destino']} filas correctas")
+        else:
+            informe.registrar(f"Verificación de {tabla} omitida: {resultado['motivo']}")
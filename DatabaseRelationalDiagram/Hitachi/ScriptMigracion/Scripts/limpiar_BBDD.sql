@@ -8,6 +8,7 @@ TRUNCATE TABLE incidencias;
 TRUNCATE TABLE resoluciones;
 TRUNCATE TABLE activos;
 TRUNCATE TABLE componentes;
+TRUNCATE TABLE componentes_jerarquia;
 TRUNCATE TABLE activo_componentes;
 TRUNCATE TABLE estadosorden;
 TRUNCATE TABLE tiposorden;
@@ -15,4 +16,6 @@ TRUNCATE TABLE ordenes;
 TRUNCATE TABLE incidenciasordenes;
 TRUNCATE TABLE usuarios_ordenes;
 TRUNCATE TABLE historialcambiosusuariosordenes;
+TRUNCATE TABLE indicadores_ordenes_diarias;
+TRUNCATE TABLE indicadores_incidencias_diarias;
 SET FOREIGN_KEY_CHECKS=1;
\ No newline at end of file
@@ -0,0 +1,3 @@
+@echo off
+python Scripts\MigracionFuentes.py
+pause
@@ -0,0 +1,21 @@
+import os
+import sys
+import shutil
+import pytest
+
+# Los scripts de la migración se importan por su nombre desde la carpeta Scripts
+CARPETA_SCRIPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'Scripts')
+sys.path.insert(0, os.path.abspath(CARPETA_SCRIPTS))
+
+import Migrations as funcs
+
+# Carpeta raíz de la migración en un directorio temporal, con las tablas de reemplazo de Scripts
+@pytest.fixture
+def raiz(tmp_path, monkeypatch):
+    os.makedirs(tmp_path / 'Scripts')
+    os.makedirs(tmp_path / 'DumpFolder')
+    shutil.copy(os.path.join(CARPETA_SCRIPTS, funcs.FICHERO_REEMPLAZOS), tmp_path / 'Scripts' / funcs.FICHERO_REEMPLAZOS)
+    monkeypatch.setenv(funcs.VARIABLE_RAIZ, str(tmp_path))
+    monkeypatch.delenv(funcs.VARIABLE_VOLCADOS, raising=False)
+    monkeypatch.setattr(funcs, 'tablas_reemplazo', None)
+    return tmp_path
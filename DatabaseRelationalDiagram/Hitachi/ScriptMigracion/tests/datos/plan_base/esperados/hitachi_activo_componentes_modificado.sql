@@ -0,0 +1,3 @@
+LOCK TABLES `activo_componentes` WRITE;
+INSERT INTO `activo_componentes` VALUES (7,5),(7,3),(10,10);
+UNLOCK TABLES;
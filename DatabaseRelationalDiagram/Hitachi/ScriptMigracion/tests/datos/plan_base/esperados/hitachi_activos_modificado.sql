@@ -0,0 +1,3 @@
+LOCK TABLES `activos` WRITE;
+INSERT INTO `activos` (Id, ActivoSAP, DescripcionES, DescripcionEN, Redundancia, Hse, Usabilidad, Coste, ValorCriticidad, IdCriticidad, IdLocalizacion, IdCentroCoste, IdEstadoActivo) VALUES (1,'A000001','Bomba 1 (principal)','Pump 1',3,0,3,0,10,4,91,4,2),(2,'A000002','Bomba 2 (principal)','Pump 2',3,1,2,1,23,4,126,38,2),(3,'A000003','Bomba 3 (principal)','Pump 3',0,0,3,1,35,1,74,25,3);
+UNLOCK TABLES;
@@ -0,0 +1,3 @@
+LOCK TABLES `centrosdecostes` WRITE;
+INSERT INTO `centrosdecostes` (Id, DescripcionES, DescripcionEN, CentroCosteSAP, IdPlanta) VALUES (1,'Centro de coste 1','Cost centre 1','CC00001',7),(2,'Centro de coste 2','Cost centre 2','CC00002',10),(3,'Centro de coste 3','Cost centre 3','CC00003',4);
+UNLOCK TABLES;
@@ -0,0 +1,3 @@
+LOCK TABLES `empresas` WRITE;
+INSERT INTO `empresas` VALUES (1,'Empresa 1'),(2,'Empresa 2'),(3,'Empresa 3');
+UNLOCK TABLES;
@@ -0,0 +1,3 @@
+LOCK TABLES `historialcambiosusuariosordenes` WRITE;
+INSERT INTO `historialcambiosusuariosordenes` VALUES (1,'2020-01-01 06:07:00',2,'83fe4b80-5932-4aed-87e4-bd75d27ce694','dec0f3d2-278f-4e5a-8763-d3e275dff091'),(2,'2020-01-01 06:14:00',2,'8ba7cbaf-532f-4abd-8c99-c541071e1c0a','a7fac1e5-c319-433a-acbc-52dfa8fc2829'),(3,'2020-01-01 06:21:00',2,'a7fac1e5-c319-433a-acbc-52dfa8fc2829','c88f4e63-1597-4d80-afda-f8e9906516c5');
+UNLOCK TABLES;
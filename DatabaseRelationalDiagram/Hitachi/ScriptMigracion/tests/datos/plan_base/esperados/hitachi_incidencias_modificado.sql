@@ -0,0 +1,3 @@
+LOCK TABLES `incidencias` WRITE;
+INSERT INTO `incidencias` (Id, DescripcionES, DescripcionEN, IdMecanismoFallo) VALUES (1,'Incidencia 1','Incident 1',16),(2,'Incidencia 2','Incident 2',14),(3,'Incidencia 3','Incident 3',2);
+UNLOCK TABLES;
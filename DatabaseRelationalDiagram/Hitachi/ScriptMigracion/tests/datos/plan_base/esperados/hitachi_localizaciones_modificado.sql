@@ -0,0 +1,3 @@
+LOCK TABLES `localizaciones` WRITE;
+INSERT INTO `localizaciones` (Id, DescripcionES, DescripcionEN, LocalizacionSAP, Latitud, Longitud, ContactoRepuestos, IdPlanta) VALUES (1,'Localización 1','Location 1','L00001',37.8,-4.7,'Almacén central',5),(2,'Localización 2','Location 2','L00002',37.8,-4.7,'Almacén central',9),(3,'Localización 3','Location 3','L00003',37.8,-4.7,'Almacén central',10);
+UNLOCK TABLES;
@@ -0,0 +1,3 @@
+LOCK TABLES `mecanismosdefallo` WRITE;
+INSERT INTO `mecanismosdefallo` (Id, DescripcionES, DescripcionEN) VALUES (1,'Descripción 1','Description 1'),(2,'Descripción 2','Description 2'),(3,'Descripción 3','Description 3');
+UNLOCK TABLES;
@@ -0,0 +1,3 @@
+LOCK TABLES `incidenciasordenes` WRITE;
+INSERT INTO `incidenciasordenes` (FechaDeteccion, IdOrden, IdComponente, IdIncidencia, IdResolucion, FechaResolucion, ParoMaquina, CambioPieza, AfectaProduccion) VALUES ('2020-01-01 06:07:00',2,1,11,3,'2020-01-01 16:07:00',1,1,0),('2020-01-01 06:14:00',1,6,121,1,'2020-01-01 16:14:00',1,1,1),('2020-01-01 06:21:00',2,4,143,15,'2020-01-01 16:21:00',0,1,1);
+UNLOCK TABLES;
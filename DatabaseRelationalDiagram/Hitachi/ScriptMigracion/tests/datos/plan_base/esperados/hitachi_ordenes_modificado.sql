@@ -0,0 +1,3 @@
+LOCK TABLES `ordenes` WRITE;
+INSERT INTO `ordenes` (Id, IdSAP, FechaCreacion, FechaApertura, ComentarioOrden, FechaCierre, ComentarioResolucion, TiempoParada, Confirmada, IdActivo, IdEstadoOrden, IdUsuarioCreador, IdTipoOrden, Materiales) VALUES (1,'SAP00000001','2020-01-01 06:07:00','2020-01-01 06:37:00','Parada por alarma de temperatura \\ sin causa aparente','2020-01-01 16:07:00','Sustituido y probado','0',1,5,1,'e3649caf-53ee-440b-b887-cae785448c25',4,NULL),(2,'SAP00000002','2020-01-01 06:14:00','2020-01-01 06:44:00','Parada por alarma de temperatura \\ sin causa aparente','2020-01-01 16:14:00','Sustituido y probado','1.5',1,9,2,'d6a07a3b-c844-40df-8f44-da616cccd16e',3,NULL),(3,'SAP00000003','2020-01-01 06:21:00','2020-01-01 06:51:00',NULL,'2020-01-01 16:21:00','Sustituido y probado','0',1,3,5,'a7fac1e5-c319-433a-acbc-52dfa8fc2829',3,NULL);
+UNLOCK TABLES;
@@ -0,0 +1,3 @@
+LOCK TABLES `plantas` WRITE;
+INSERT INTO `plantas` (Id, Descripcion, StmpConfig, Latitud, Longitud, IdEmpresa) VALUES (1,'Planta 1','smtp.planta.local',37.809999999999995,-4.71,1),(2,'Planta 2','smtp.planta.local',37.82,-4.72,3),(3,'Planta 3','smtp.planta.local',37.83,-4.73,1);
+UNLOCK TABLES;
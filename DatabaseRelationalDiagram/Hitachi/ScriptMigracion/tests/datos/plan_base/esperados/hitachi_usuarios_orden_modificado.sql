@@ -0,0 +1,3 @@
+LOCK TABLES `usuarios_ordenes` WRITE;
+INSERT INTO `usuarios_ordenes` VALUES ('6078c069-2d1f-44b4-b419-e2ff12d9af05',1),('bf73fcbe-ba8f-4fc3-8f71-ad28157b5dca',2),('500698e0-5b0a-4e26-88df-957eb018696b',3);
+UNLOCK TABLES;
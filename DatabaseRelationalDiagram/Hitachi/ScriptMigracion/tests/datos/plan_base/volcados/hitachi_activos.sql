@@ -0,0 +1,3 @@
+LOCK TABLES `activos` WRITE;
+INSERT INTO `activos` VALUES (1,'A000001','Bomba 1 (principal)','Pump 1','3',0,'3',0,'10%','CB',91,4,12,1),(2,'A000002','Bomba 2 (principal)','Pump 2','3',1,'2',1,'23%','CB',126,38,12,1),(3,'A000003','Bomba 3 (principal)','Pump 3','0',0,'3',1,'35%','MC',74,25,12,2);
+UNLOCK TABLES;
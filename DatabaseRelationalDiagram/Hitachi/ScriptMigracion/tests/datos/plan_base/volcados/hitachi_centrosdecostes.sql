@@ -0,0 +1,3 @@
+LOCK TABLES `centrosdecostes` WRITE;
+INSERT INTO `centrosdecostes` VALUES (1,'CC00001','Centro de coste 1','Cost centre 1',7),(2,'CC00002','Centro de coste 2','Cost centre 2',10),(3,'CC00003','Centro de coste 3','Cost centre 3',4);
+UNLOCK TABLES;
@@ -0,0 +1,3 @@
+LOCK TABLES `componentes` WRITE;
+INSERT INTO `componentes` VALUES (1,'K000001','Componente 1','Component 1',NULL),(2,'K000002','Componente 2','Component 2',1),(3,'K000003','Componente 3','Component 3',NULL);
+UNLOCK TABLES;
@@ -0,0 +1,3 @@
+LOCK TABLES `historial_modificaciones_usuarios_ordenes` WRITE;
+INSERT INTO `historial_modificaciones_usuarios_ordenes` VALUES (1,'2020-01-01 06:07:00',2,10,19),(2,'2020-01-01 06:14:00',2,31,32),(3,'2020-01-01 06:21:00',2,14,21);
+UNLOCK TABLES;
@@ -0,0 +1,3 @@
+LOCK TABLES `orden_incidencias_resolucion` WRITE;
+INSERT INTO `orden_incidencias_resolucion` VALUES (1,'2020-01-01 06:07:00',2,1,11,3,'2020-01-01 16:07:00',NULL,1,1,0),(2,'2020-01-01 06:14:00',1,6,121,1,'2020-01-01 16:14:00',NULL,1,1,1),(3,'2020-01-01 06:21:00',2,4,143,15,'2020-01-01 16:21:00',NULL,0,1,1);
+UNLOCK TABLES;
@@ -0,0 +1,3 @@
+LOCK TABLES `ordenes` WRITE;
+INSERT INTO `ordenes` VALUES (1,'SAP00000001','2020-01-01 06:07:00','2020-01-01 06:37:00','Parada por alarma de temperatura \\ sin causa aparente','2020-01-01 16:07:00','Sustituido y probado',0,1,5,1,4,4,NULL,NULL),(2,'SAP00000002','2020-01-01 06:14:00','2020-01-01 06:44:00','Parada por alarma de temperatura \\ sin causa aparente','2020-01-01 16:14:00','Sustituido y probado',1.5,1,9,2,28,3,NULL,NULL),(3,'SAP00000003','2020-01-01 06:21:00','2020-01-01 06:51:00',NULL,'2020-01-01 16:21:00','Sustituido y probado',0,1,3,5,11,3,NULL,NULL);
+UNLOCK TABLES;
@@ -0,0 +1,3 @@
+LOCK TABLES `usuarios_orden` WRITE;
+INSERT INTO `usuarios_orden` VALUES (24,1),(7,2),(12,3);
+UNLOCK TABLES;
@@ -0,0 +1,15 @@
+import random
+import pytest
+import Migrations as funcs
+import Benchmark as benchmark
+
+# Las columnas que se traducen con una tabla de reemplazo solo deben tener valores que esa tabla conoce
+@pytest.mark.parametrize('fichero', benchmark.calcular_tamanos(200))
+def test_los_valores_se_pueden_reemplazar(raiz, fichero):
+    tamanos = benchmark.calcular_tamanos(200)
+    mapeo = funcs.MAPEOS[fichero]
+    reemplazos = {indice: funcs.leer_reemplazos(conversor) for indice, conversor in (mapeo.conversores or {}).items()
+                  if conversor not in funcs.CONVERSORES}
+    for fila in benchmark.generar_filas(fichero, tamanos, random.Random(0)):
+        for indice, tabla in reemplazos.items():
+            assert str(fila[indice]) in tabla, f"{fichero}: {fila[indice]} no está en la tabla de reemplazo de la posición {indice}"
@@ -0,0 +1,58 @@
+import os
+import json
+import Migrations as funcs
+import Cache as cache
+import Verificacion as verificador
+
+FICHERO = 'hitachi_usuarios_orden.sql'
+
+# Función que transforma el volcado con la caché y devuelve si se ha reutilizado y el fichero transformado
+def transformar():
+    fichero_modificado, _, medidas = cache.transformar_fichero(FICHERO)
+    with open(funcs.obtener_ruta('FicherosModificados_Datos', fichero_modificado), 'r', encoding='utf-8') as file:
+        return medidas.get('cache', False), file.read()
+
+def test_cambiar_los_reemplazos_invalida_la_cache(raiz, monkeypatch):
+    with open(raiz / 'DumpFolder' / FICHERO, 'w', encoding='utf-8') as file:
+        file.write("INSERT INTO `usuarios_orden` VALUES (1,10),(2,11);\n")
+
+    assert transformar()[0] is False
+    reutilizado, anterior = transformar()
+    assert reutilizado is True
+
+    # Otra ejecución con el usuario 1 traducido a otro Id
+    ruta_reemplazos = raiz / 'Scripts' / funcs.FICHERO_REEMPLAZOS
+    reemplazos = json.loads(ruta_reemplazos.read_text(encoding='utf-8'))
+    reemplazos['usuarios']['1'] = 999
+    ruta_reemplazos.write_text(json.dumps(reemplazos), encoding='utf-8')
+    monkeypatch.setattr(funcs, 'tablas_reemplazo', None)
+
+    reutilizado, nuevo = transformar()
+    assert reutilizado is False
+    assert '(999,10)' in nuevo and nuevo != anterior
+    assert transformar() == (True, nuevo)
+
+def test_la_clave_depende_de_las_opciones(raiz):
+    (raiz / 'DumpFolder' / FICHERO).write_text("INSERT INTO `usuarios_orden` VALUES (1,10);\n", encoding='utf-8')
+    opciones = [FICHERO, 'sql', None, None, None, False, None]
+    clave = cache.clave_transformacion(*opciones)
+    assert cache.clave_transformacion(*opciones) == clave
+    for posicion, valor in ((1, 'tsv'), (2, 100), (4, 5), (5, True), (6, 'gzip')):
+        cambiadas = list(opciones)
+        cambiadas[posicion] = valor
+        assert cache.clave_transformacion(*cambiadas) != clave
+
+def test_el_resumen_se_guarda_con_la_transformacion_reutilizada(raiz):
+    with open(raiz / 'DumpFolder' / FICHERO, 'w', encoding='utf-8') as file:
+        file.write("INSERT INTO `usuarios_orden` VALUES (1,10),(2,11);\n")
+    fichero_modificado = cache.transformar_fichero(FICHERO)[0]
+    ruta = funcs.obtener_ruta('FicherosModificados_Datos', fichero_modificado)
+    assert verificador.leer_resumen(ruta) is None
+
+    # La entrada de la caché no tenía resumen: se resume el fichero reutilizado y se guarda también en la caché
+    assert cache.transformar_fichero(FICHERO, resumir=True)[2]['cache'] is True
+    resumen = verificador.leer_resumen(ruta)
+    assert resumen['tramos'] == verificador.resumir_fichero(fichero_modificado, [0, 1])
+    os.remove(verificador.ruta_resumen(ruta))
+    assert cache.transformar_fichero(FICHERO)[2]['cache'] is True
+    assert verificador.leer_resumen(ruta) == resumen
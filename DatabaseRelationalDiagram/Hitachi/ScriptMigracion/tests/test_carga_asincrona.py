@@ -0,0 +1,137 @@
+import json
+import asyncio
+import threading
+import pytest
+import Migrations as funcs
+import Scheduler as planificador
+import CargaAsincrona as carga_asincrona
+
+# Función que confirma los grupos de sentencias indicados y espera a que se guarden sus puntos de control
+def confirmar(grupos, al_confirmar):
+    progreso = {}
+    confirmaciones = carga_asincrona.Confirmaciones(progreso, al_confirmar)
+
+    async def ejecutar():
+        for grupo in grupos:
+            confirmaciones.confirmar(grupo)
+        await confirmaciones.esperar()
+
+    asyncio.run(ejecutar())
+    return progreso
+
+def test_confirmaciones_fuera_de_orden_se_guardan_en_otro_hilo():
+    guardados = []
+    def al_confirmar(lote, estado):
+        guardados.append((lote, estado, threading.current_thread() is threading.main_thread()))
+
+    progreso = confirmar([[(1, 20, 'INSERT INTO b'), (2, 30, 'INSERT INTO c')], [(0, 10, 'INSERT INTO a')]], al_confirmar)
+    assert progreso == {'posicion': 30, 'sentencia': 'INSERT INTO c'}
+    assert guardados == [
+        (1, {'posicion': None, 'sentencia': None, 'confirmadas': [20, 30]}, False),
+        (2, {'posicion': 30, 'sentencia': 'INSERT INTO c', 'confirmadas': []}, False)]
+
+def test_error_al_guardar_el_punto_de_control():
+    def al_confirmar(lote, estado):
+        raise OSError("Disco lleno")
+
+    with pytest.raises(OSError):
+        confirmar([[(0, 10, 'INSERT INTO a')]], al_confirmar)
+
+def test_la_carga_salta_los_insert_confirmados(raiz, monkeypatch):
+    sentencias = [f"INSERT INTO `t` VALUES ({numero},'fila');" for numero in range(1, 5)]
+    fichero = 'hitachi_prueba_modificado.sql'
+    with open(funcs.obtener_ruta('FicherosModificados_Datos', fichero), 'w', encoding='utf-8') as file:
+        file.write(''.join(sentencia + '\n' for sentencia in sentencias))
+    posiciones = [sum(len(sentencia) + 1 for sentencia in sentencias[:numero + 1]) for numero in range(4)]
+
+    ejecutadas = []
+    def ejecutar_script_mysql(pool, leidas, lotes_por_commit, al_confirmar, medidas):
+        for sentencia in leidas:
+            ejecutadas.append(sentencia)
+            al_confirmar(len(ejecutadas), None)
+        return True
+    monkeypatch.setattr(funcs, 'ejecutar_script_mysql', ejecutar_script_mysql)
+
+    # Se reanuda tras el primer INSERT con el tercero ya confirmado
+    assert planificador.cargar_fichero(None, 't', fichero, desde=posiciones[0], confirmadas=[posiciones[2]]) is True
+    assert ejecutadas == [sentencias[1], sentencias[3]]
+    # El tercero sigue por delante tras el primer commit y deja de estarlo tras el segundo
+    with open(funcs.obtener_ruta('EstadoMigracion', planificador.FICHERO_PUNTOS_CONTROL), encoding='utf-8') as file:
+        assert json.loads(file.readline())['confirmadas'] == [posiciones[2]]
+    assert planificador.leer_puntos_control()['t']['confirmadas'] == []
+
+# Conexión asíncrona de prueba. Con fallar_en se pierde la conexión al ejecutar ese número de sentencias
+class ConexionAsincronaPrueba:
+    def __init__(self, ejecutadas, fallar_en=None):
+        self.ejecutadas = ejecutadas
+        self.fallar_en = fallar_en
+        self.cerrada = False
+        self.sentencias = 0
+
+    def cursor(self):
+        return CursorAsincronoPrueba(self)
+
+    async def commit(self):
+        pass
+
+    def close(self):
+        self.cerrada = True
+
+class CursorAsincronoPrueba:
+    description = None
+    rowcount = 1
+
+    def __init__(self, conexion):
+        self.conexion = conexion
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *excepcion):
+        pass
+
+    async def execute(self, sentencia):
+        self.conexion.sentencias += 1
+        if self.conexion.sentencias == self.conexion.fallar_en:
+            raise ConnectionResetError("Connection lost")
+        # Cede el turno como la espera de la respuesta del servidor
+        await asyncio.sleep(0)
+        self.conexion.ejecutadas.append(sentencia)
+
+# Función que carga las sentencias con escritores de prueba en un hilo aparte y devuelve su resultado.
+# Si la carga se queda esperando, el hilo sigue vivo al terminar el tiempo de espera
+def cargar_con_escritores(monkeypatch, conexiones_prueba, sentencias):
+    abrir = iter(conexiones_prueba)
+    async def abrir_conexion(configuracion, sesion):
+        conexion = next(abrir)
+        if isinstance(conexion, Exception):
+            raise conexion
+        return conexion
+    monkeypatch.setattr(carga_asincrona, 'abrir_conexion', abrir_conexion)
+
+    resultado = []
+    lectura = {'posicion': 0}
+    hilo = threading.Thread(target=lambda: resultado.append(carga_asincrona.ejecutar_script_asincrono(
+        {}, iter(sentencias), lectura, len(conexiones_prueba), lotes_por_commit=2)), daemon=True)
+    hilo.start()
+    hilo.join(timeout=10)
+    assert not hilo.is_alive()
+    return resultado[0]
+
+def test_si_se_pierde_un_escritor_la_carga_termina_con_error(monkeypatch):
+    ejecutadas = []
+    conexiones_prueba = [ConexionAsincronaPrueba(ejecutadas), ConexionAsincronaPrueba(ejecutadas, fallar_en=3)]
+    # Muchas más sentencias de las que caben en la cola: la lectura tiene que cancelarse
+    sentencias = [f"INSERT INTO `t` VALUES ({numero});" for numero in range(200)]
+    resultado = cargar_con_escritores(monkeypatch, conexiones_prueba, sentencias)
+    assert resultado.startswith("Error") and "Connection lost" in resultado
+    assert len(ejecutadas) < len(sentencias)
+    assert all(conexion.cerrada for conexion in conexiones_prueba)
+
+def test_si_no_se_puede_abrir_un_escritor_la_carga_termina_con_error(monkeypatch):
+    ejecutadas = []
+    conexion = ConexionAsincronaPrueba(ejecutadas)
+    resultado = cargar_con_escritores(monkeypatch, [conexion, OSError("Connection refused")],
+                                      [f"INSERT INTO `t` VALUES ({numero});" for numero in range(200)])
+    assert resultado.startswith("Error") and "Connection refused" in resultado
+    assert conexion.cerrada
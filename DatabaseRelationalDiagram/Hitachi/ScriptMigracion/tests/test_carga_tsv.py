@@ -0,0 +1,114 @@
+import os
+import pytest
+import mysql.connector
+from mysql.connector import Error
+import Migrations as funcs
+import Conexiones as conexiones
+
+# Valores que LOAD DATA interpreta de forma especial si no se escapan: el texto \N (NULL sin escapar), tabuladores,
+# saltos de línea y la barra invertida
+VALORES = [1, '\\N', None, 'a\tb', 'línea 1\nlínea 2\r\n', 'C:\\datos\\', '\0\x1a', 'NULL', 2.5]
+
+# Conexión de prueba que guarda las sentencias ejecutadas. Con local_infile=False, LOAD DATA falla como en un servidor
+# que no lo permite
+class ConexionPrueba:
+    def __init__(self, sentencias, local_infile=True):
+        self.sentencias = sentencias
+        self.local_infile = local_infile
+        self.rowcount = 0
+
+    def cursor(self):
+        return self
+
+    def execute(self, sentencia, parametros=None):
+        if sentencia.startswith("LOAD DATA") and not self.local_infile:
+            raise Error("Loading local data is disabled", errno=3948)
+        self.sentencias.append((sentencia, parametros))
+        self.rowcount = 2
+
+    def executemany(self, sentencia, filas):
+        self.sentencias.append((sentencia, list(filas)))
+        self.rowcount = len(filas)
+
+    def is_connected(self):
+        return True
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+# Función que escribe un fichero de carga masiva con dos filas de VALORES y devuelve su nombre
+def escribir_tsv(raiz, compresion=None):
+    os.makedirs(raiz / 'FicherosModificados_Datos', exist_ok=True)
+    fichero = 'hitachi_prueba_modificado.tsv' + (funcs.EXTENSIONES_COMPRESION[compresion] if compresion else '')
+    columnas = [f"c{numero}" for numero in range(len(VALORES))]
+    funcs.escribir_fichero_modificado(iter([funcs.Insercion('prueba', columnas, [VALORES, VALORES])]),
+                                      funcs.obtener_ruta('FicherosModificados_Datos', fichero), 'tsv', compresion=compresion)
+    return fichero
+
+# Función que carga el fichero con un pool de prueba y devuelve las sentencias ejecutadas, sin las de la sesión
+def cargar(monkeypatch, fichero, **opciones):
+    sentencias = []
+    local_infile = opciones.pop('local_infile', True)
+    monkeypatch.setattr(mysql.connector, 'connect', lambda **configuracion: ConexionPrueba(sentencias, local_infile))
+    medidas = {'filas': 0}
+    assert funcs.cargar_fichero_tsv(conexiones.PoolConexiones({}, 1), 'prueba', fichero, medidas=medidas, **opciones) is True
+    return [(sentencia, parametros) for sentencia, parametros in sentencias if not sentencia.startswith("SET SESSION")], medidas
+
+def test_escapes_del_fichero_tsv():
+    linea = funcs.formatear_fila_tsv(VALORES)
+    assert linea == "1\t\\\\N\t\\N\ta\\tb\tlínea 1\\nlínea 2\\r\\n\tC:\\\\datos\\\\\t\\0\\Z\tNULL\t2.5\n"
+    # Una sola línea y tantos campos como valores: LOAD DATA no puede partir la fila
+    assert linea.count('\n') == 1 and len(linea.split('\t')) == len(VALORES)
+
+def test_el_fichero_tsv_se_lee_igual_que_se_escribe(raiz):
+    fichero = escribir_tsv(raiz)
+    ruta_fichero = funcs.obtener_ruta('FicherosModificados_Datos', fichero)
+    assert funcs.leer_columnas_tsv(ruta_fichero) == [f"c{numero}" for numero in range(len(VALORES))]
+    esperadas = [None if valor is None else str(valor) for valor in VALORES]
+    assert list(funcs.leer_fichero_tsv(ruta_fichero)) == [esperadas, esperadas]
+
+@pytest.mark.parametrize('compresion', [None, 'gzip'])
+def test_sentencia_load_data(raiz, monkeypatch, compresion):
+    fichero = escribir_tsv(raiz, compresion)
+    sentencias, medidas = cargar(monkeypatch, fichero)
+
+    assert len(sentencias) == 1
+    sentencia, parametros = sentencias[0]
+    columnas = ', '.join(f"c{numero}" for numero in range(len(VALORES)))
+    assert sentencia == ("LOAD DATA LOCAL INFILE %s INTO TABLE `prueba` CHARACTER SET utf8mb4 "
+                         "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+                         f"IGNORE 1 LINES ({columnas})")
+    # Los ficheros comprimidos se cargan desde una copia descomprimida que se borra al terminar
+    ruta_fichero = funcs.obtener_ruta('FicherosModificados_Datos', fichero)
+    assert parametros == ((ruta_fichero,) if compresion is None else (ruta_fichero + '.carga',))
+    assert not os.path.exists(ruta_fichero + '.carga')
+    assert medidas['filas'] == 2
+
+def test_sin_local_infile_se_insertan_las_filas(raiz, monkeypatch):
+    fichero = escribir_tsv(raiz)
+    sentencias, medidas = cargar(monkeypatch, fichero, local_infile=False, filas_por_lote=10)
+
+    assert [sentencia for sentencia, _ in sentencias] == [
+        f"INSERT INTO `prueba` ({', '.join(f'c{numero}' for numero in range(len(VALORES)))}) VALUES ({', '.join(['%s'] * len(VALORES))})"]
+    esperadas = [None if valor is None else str(valor) for valor in VALORES]
+    assert sentencias[0][1] == [esperadas, esperadas]
+    assert medidas['filas'] == 2
+
+def test_carga_incremental_con_tabla_temporal(raiz, monkeypatch):
+    fichero = escribir_tsv(raiz)
+    monkeypatch.setattr(funcs, 'leer_columnas_tabla', lambda pool, tabla: ([f"c{numero}" for numero in range(len(VALORES))], {'c0'}))
+    sentencias, _ = cargar(monkeypatch, fichero, incremental=True)
+
+    ejecutadas = [sentencia.split(' (')[0] if sentencia.startswith("INSERT") else sentencia.split(' CHARACTER')[0]
+                  for sentencia, _ in sentencias]
+    assert ejecutadas == ["CREATE TEMPORARY TABLE `prueba_incremental` LIKE `prueba`",
+                          "LOAD DATA LOCAL INFILE %s INTO TABLE `prueba_incremental`",
+                          "INSERT INTO `prueba`",
+                          "DROP TEMPORARY TABLE IF EXISTS `prueba_incremental`"]
+    assert sentencias[2][0].endswith("ON DUPLICATE KEY UPDATE " + ', '.join(f"c{numero} = VALUES(c{numero})" for numero in range(1, len(VALORES))))
@@ -0,0 +1,94 @@
+from mysql.connector import Error
+import Migrations as funcs
+import ClavesExternas as claves_externas
+
+def test_conjunto_claves():
+    conjunto = claves_externas.ConjuntoClaves()
+    for valor in [0, 7, 8, 1000, '42', -3, claves_externas.LIMITE_BITS, 'ABC']:
+        conjunto.agregar(valor)
+    # Los Id leídos como texto del fichero son los mismos que los enteros
+    assert 42 in conjunto and '1000' in conjunto and '0' in conjunto
+    assert -3 in conjunto and '-3' in conjunto and claves_externas.LIMITE_BITS in conjunto and 'ABC' in conjunto
+    assert 1 not in conjunto and 41 not in conjunto and 5000 not in conjunto and 'abc' not in conjunto
+    # Los valores fuera del mapa de bits se guardan aparte
+    assert conjunto.otras == {-3, claves_externas.LIMITE_BITS, 'ABC'}
+
+def test_conjunto_claves_compactar():
+    conjunto = claves_externas.ConjuntoClaves()
+    conjunto.agregar(3)
+    conjunto.agregar(100)
+    conjunto.agregar(20)
+    assert len(conjunto.compactar().bits) == 100 // 8 + 1
+    assert all(valor in conjunto for valor in [3, 20, 100]) and 101 not in conjunto
+
+# Función que devuelve un ConjuntoClaves con los Id indicados
+def conjunto_de(*ids):
+    conjunto = claves_externas.ConjuntoClaves()
+    for id_padre in ids:
+        conjunto.agregar(id_padre)
+    return conjunto
+
+# Función que lee las líneas de un fichero de FicherosModificados_Datos o de CuarentenaMigracion
+def leer(ruta):
+    with open(ruta, encoding='utf-8') as file:
+        return file.read().splitlines()
+
+COLUMNAS = ['Id', 'Descripcion', 'IdPadre']
+
+def test_validar_fichero_sql_con_cuarentena(raiz, monkeypatch):
+    sentencias = ["SET NAMES utf8mb4;",
+                  "INSERT INTO `hijas` (Id, Descripcion, IdPadre) VALUES (1,'a',10),(2,'b',99),(3,NULL,NULL);",
+                  "INSERT INTO `hijas` (Id, Descripcion, IdPadre) VALUES (4,'d',11);",
+                  "INSERT INTO `hijas` (Id, Descripcion, IdPadre) VALUES (5,'e',98),(6,'f',10);"]
+    with open(funcs.obtener_ruta('FicherosModificados_Datos', 'hijas.sql'), 'w', encoding='utf-8', newline='\n') as file:
+        file.write('\n'.join(sentencias) + '\n')
+    claves = [claves_externas.ClaveExterna('IdPadre', 'padres')]
+    monkeypatch.setitem(claves_externas.CLAVES_EXTERNAS, 'hijas', claves)
+    monkeypatch.setattr(claves_externas, 'TABLAS_PADRE', claves_externas.TABLAS_PADRE | {'hijas'})
+    fichero, ids, resultado = claves_externas.validar_fichero('hijas', COLUMNAS, 'hijas.sql', {'padres': conjunto_de(10, 11)}, True)
+
+    assert fichero == 'hijas.sql'
+    assert resultado['filas_huerfanas'] == 2
+    assert resultado['claves_externas']['IdPadre'] == {'padre': 'padres', 'filas': 2, 'valores': ['99', '98']}
+    # Los Id de las filas huérfanas no valen como padre de otras tablas
+    assert [id_hija for id_hija in range(1, 7) if id_hija in ids] == [1, 3, 4, 6]
+    # El INSERT sin huérfanas se copia tal cual y los demás se escriben sin las filas huérfanas
+    assert leer(funcs.obtener_ruta('FicherosModificados_Datos', 'hijas.sql')) == [
+        "SET NAMES utf8mb4;",
+        "INSERT INTO `hijas` (Id, Descripcion, IdPadre) VALUES (1,'a',10),(3,NULL,NULL);",
+        "INSERT INTO `hijas` (Id, Descripcion, IdPadre) VALUES (4,'d',11);",
+        "INSERT INTO `hijas` (Id, Descripcion, IdPadre) VALUES (6,'f',10);"]
+    assert leer(resultado['cuarentena']) == ['Id\tDescripcion\tIdPadre', '2\tb\t99', '5\te\t98']
+
+def test_validar_fichero_tsv_sin_cuarentena(raiz, monkeypatch):
+    lineas = ['Id\tDescripcion\tIdPadre', '1\ta\t10', '2\tb\t99', '3\t\\N\t\\N']
+    ruta = funcs.obtener_ruta('FicherosModificados_Datos', 'hijas.tsv')
+    with open(ruta, 'w', encoding='utf-8', newline='\n') as file:
+        file.write('\n'.join(lineas) + '\n')
+    monkeypatch.setitem(claves_externas.CLAVES_EXTERNAS, 'hijas', [claves_externas.ClaveExterna('IdPadre', 'padres')])
+    _, ids, resultado = claves_externas.validar_fichero('hijas', COLUMNAS, 'hijas.tsv', {'padres': conjunto_de(10)})
+    assert ids is None
+    assert resultado['filas_huerfanas'] == 1 and 'cuarentena' not in resultado
+    assert leer(ruta) == lineas
+
+def test_sacar_huerfanas_tsv(raiz):
+    ruta = funcs.obtener_ruta('FicherosModificados_Datos', 'hijas.tsv')
+    with open(ruta, 'w', encoding='utf-8', newline='\n') as file:
+        file.write('Id\tIdPadre\n1\t10\n2\t99\n3\t10\n4\t98\n')
+    ruta_cuarentena = claves_externas.sacar_huerfanas('hijas', 'hijas.tsv', [1, 3], ['Id', 'IdPadre'])
+    assert leer(ruta) == ['Id\tIdPadre', '1\t10', '3\t10']
+    assert leer(ruta_cuarentena) == ['Id\tIdPadre', '2\t99', '4\t98']
+
+def test_columnas_del_mapeo():
+    assert claves_externas.columnas_fichero(None, 'ordenes', 'hitachi_ordenes.sql') == funcs.MAPEOS['hitachi_ordenes.sql'].columnas
+
+def test_columnas_de_la_tabla_de_destino(monkeypatch):
+    # usuarios_ordenes inserta todas sus columnas: se toman de la base de datos en su orden
+    monkeypatch.setattr(funcs, 'leer_columnas_tabla', lambda pool, tabla: (['IdUsuario', 'IdOrden'], {'IdUsuario', 'IdOrden'}))
+    assert claves_externas.columnas_fichero(object(), 'usuarios_ordenes', 'hitachi_usuarios_orden.sql') == ['IdUsuario', 'IdOrden']
+    assert "mapeo de hitachi_usuarios_orden.sql" in claves_externas.columnas_fichero(None, 'usuarios_ordenes', 'hitachi_usuarios_orden.sql')
+
+    def fallar(pool, tabla):
+        raise Error("Access denied", errno=1142)
+    monkeypatch.setattr(funcs, 'leer_columnas_tabla', fallar)
+    assert "Access denied" in claves_externas.columnas_fichero(object(), 'usuarios_ordenes', 'hitachi_usuarios_orden.sql')
@@ -0,0 +1,53 @@
+import random
+import pytest
+import Migrations as funcs
+import Benchmark as benchmark
+
+Columnar = pytest.importorskip('Columnar')
+if not Columnar.disponible():
+    pytest.skip("NumPy no está instalado", allow_module_level=True)
+
+# Función que transforma las sentencias con el mapeo del fichero y devuelve el texto de los INSERT generados
+def transformar(fichero, sentencias, columnar, marca=None):
+    return [sentencia if isinstance(sentencia, str) else funcs.formatear_insercion(sentencia)
+            for sentencia in funcs.transformar_sentencias(funcs.MAPEOS[fichero], sentencias, marca, columnar)]
+
+# Función que genera INSERT del volcado sintético del benchmark
+def generar_inserciones(raiz, fichero, filas=60, por_insert=20):
+    generadas = list(benchmark.generar_filas(fichero, benchmark.calcular_tamanos(filas), random.Random(0)))
+    tabla = fichero[len('hitachi_'):-len('.sql')]
+    return [f"INSERT INTO `{tabla}` VALUES " + ','.join(funcs.formatear_tupla(valores) for valores in generadas[i:i + por_insert]) + ';'
+            for i in range(0, len(generadas), por_insert)]
+
+@pytest.mark.parametrize('fichero', ['hitachi_ordenes.sql', 'hitachi_historial_modificaciones_usuarios_ordenes.sql'])
+def test_columnar_igual_que_por_filas(raiz, fichero):
+    sentencias = generar_inserciones(raiz, fichero)
+    assert transformar(fichero, sentencias, True) == transformar(fichero, sentencias, False)
+
+@pytest.mark.parametrize('comentario', [
+    "it's", 'C:\\datos\\', "\\'", "\\\\'", "'", "a),(b", "NULL", "(lado A), 'revisar'", "ñandú ✓", "\n\r\0\x1a",
+])
+def test_columnar_con_escapes(raiz, comentario):
+    fila = [1, 'SAP00000001', '2024-01-01 10:00:00', '2024-01-01 10:30:00', comentario, None, comentario, 1.5, 1, 1, 1, 1, 1, None, None]
+    sentencias = ["INSERT INTO `ordenes` VALUES " + ','.join([funcs.formatear_tupla(fila)] * 3) + ';']
+    plan = Columnar.compilar_plan(funcs.MAPEOS['hitachi_ordenes.sql'], None)
+    assert Columnar.transformar_insercion(plan, sentencias[0], {'desde': None, 'hasta': None})
+    assert transformar('hitachi_ordenes.sql', sentencias, True) == transformar('hitachi_ordenes.sql', sentencias, False)
+
+# Escapes que mysqldump escribe y el camino por filas no: las comillas dobles, los tabuladores y los retrocesos
+@pytest.mark.parametrize('comentario', [
+    '\\"comillas\\"', 'a\\tb\\bc', '\\\\\\"', '\\\\"', 'it\\\'s \\"x\\"', '\\%\\_',
+])
+def test_columnar_normaliza_los_escapes(raiz, comentario):
+    fila = f"(1,'SAP00000001','2024-01-01 10:00:00','2024-01-01 10:30:00','{comentario}',NULL,'{comentario}',1.5,1,1,1,1,1,NULL,NULL)"
+    sentencias = ["INSERT INTO `ordenes` VALUES " + ','.join([fila] * 3) + ';']
+    plan = Columnar.compilar_plan(funcs.MAPEOS['hitachi_ordenes.sql'], None)
+    assert Columnar.transformar_insercion(plan, sentencias[0], {'desde': None, 'hasta': None})[1] == 3
+    assert transformar('hitachi_ordenes.sql', sentencias, True) == transformar('hitachi_ordenes.sql', sentencias, False)
+
+def test_columnar_con_marca(raiz):
+    fichero = 'hitachi_historial_modificaciones_usuarios_ordenes.sql'
+    sentencias = generar_inserciones(raiz, fichero)
+    marcas = [{'desde': 50, 'hasta': None}, {'desde': 50, 'hasta': None}]
+    assert transformar(fichero, sentencias, True, marcas[0]) == transformar(fichero, sentencias, False, marcas[1])
+    assert marcas[0] == marcas[1]
@@ -0,0 +1,124 @@
+import pytest
+import mysql.connector
+from mysql.connector import Error
+import Conexiones as conexiones
+import Migrations as funcs
+
+# Conexión de prueba que guarda las sentencias ejecutadas en todas sus sesiones.
+# errores indica el código del error que devuelve el servidor al ejecutar cada sentencia
+class ConexionPrueba:
+    def __init__(self, sentencias, errores=None):
+        self.sentencias = sentencias
+        self.errores = {} if errores is None else errores
+        self.conectada = True
+
+    def cursor(self):
+        return CursorPrueba(self)
+
+    def is_connected(self):
+        return self.conectada
+
+    def reconnect(self, attempts=1, delay=0):
+        self.sentencias.append('RECONNECT')
+        self.conectada = True
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.conectada = False
+
+class CursorPrueba:
+    def __init__(self, conexion):
+        self.conexion = conexion
+
+    def execute(self, sentencia, parametros=None):
+        self.conexion.sentencias.append(sentencia)
+        if sentencia in self.conexion.errores:
+            raise Error(msg="Error de prueba", errno=self.conexion.errores[sentencia])
+        self.with_rows = False
+        self.rowcount = 0
+
+    def close(self):
+        pass
+
+def test_los_scripts_con_set_no_cambian_la_sesion_del_pool(monkeypatch):
+    sentencias = []
+    monkeypatch.setattr(mysql.connector, 'connect', lambda **configuracion: ConexionPrueba(sentencias))
+    pool = conexiones.PoolConexiones({}, 1)
+
+    assert funcs.ejecutar_script_mysql(pool, iter(["SET FOREIGN_KEY_CHECKS=0;", "TRUNCATE TABLE empresas;",
+                                                   "SET FOREIGN_KEY_CHECKS=1;"])) is True
+
+    # La conexión que reutiliza la siguiente carga vuelve a tener las variables de SESION_CARGA
+    despues = sentencias[sentencias.index("SET FOREIGN_KEY_CHECKS=1;") + 1:]
+    assert despues == [f"SET SESSION {variable} = {valor}" for variable, valor in conexiones.SESION_CARGA.items()]
+
+def test_los_scripts_sin_set_no_repiten_la_sesion(monkeypatch):
+    sentencias = []
+    monkeypatch.setattr(mysql.connector, 'connect', lambda **configuracion: ConexionPrueba(sentencias))
+    pool = conexiones.PoolConexiones({}, 1)
+
+    assert funcs.ejecutar_script_mysql(pool, iter(["INSERT INTO `empresas` VALUES (1,'Hitachi');"])) is True
+    assert sentencias.count("SET SESSION foreign_key_checks = 0") == 1
+
+def test_el_binlog_solo_se_desactiva_si_se_pide():
+    assert 'sql_log_bin' not in conexiones.sesion_carga()
+    # sql_log_bin no se puede cambiar dentro de una transacción: se fija antes que autocommit
+    assert list(conexiones.sesion_carga(True)) == ['sql_log_bin', 'foreign_key_checks', 'unique_checks', 'autocommit']
+
+# Sin SUPER (1227) o con una transacción abierta (1694) no se puede cambiar sql_log_bin: la carga sigue con el valor del servidor
+@pytest.mark.parametrize('codigo', [conexiones.ERROR_PERMISO_VARIABLE, 1694])
+def test_sin_permiso_para_el_binlog_la_carga_continua(monkeypatch, codigo):
+    sentencias = []
+    monkeypatch.setattr(mysql.connector, 'connect',
+                        lambda **configuracion: ConexionPrueba(sentencias, {"SET SESSION sql_log_bin = 0": codigo}))
+    pool = conexiones.PoolConexiones({}, 1, conexiones.sesion_carga(True))
+
+    assert funcs.ejecutar_script_mysql(pool, iter(["INSERT INTO `empresas` VALUES (1,'Hitachi');"])) is True
+    assert sentencias[-1] == "INSERT INTO `empresas` VALUES (1,'Hitachi');"
+    assert "SET SESSION foreign_key_checks = 0" in sentencias
+
+def test_los_errores_de_las_demas_variables_no_se_ignoran(monkeypatch):
+    monkeypatch.setattr(mysql.connector, 'connect',
+                        lambda **configuracion: ConexionPrueba([], {"SET SESSION foreign_key_checks = 0": 1064}))
+    pool = conexiones.PoolConexiones({}, 1)
+    with pytest.raises(Error):
+        pool.obtener()
+    assert pool.abiertas == 0
+
+def test_la_sesion_se_restaura_al_devolver_la_conexion_tras_un_error(monkeypatch):
+    sentencias = []
+    monkeypatch.setattr(mysql.connector, 'connect', lambda **configuracion: ConexionPrueba(sentencias, {"TRUNCATE TABLE x;": 1146}))
+    pool = conexiones.PoolConexiones({}, 1)
+
+    assert funcs.ejecutar_script_mysql(pool, iter(["SET FOREIGN_KEY_CHECKS=1;", "TRUNCATE TABLE x;"])) is not True
+    assert sentencias[-len(conexiones.SESION_CARGA):] == [f"SET SESSION {variable} = {valor}"
+                                                          for variable, valor in conexiones.SESION_CARGA.items()]
+    assert pool.modificadas == set()
+
+    # Las conexiones que no cambian su sesión vuelven al pool sin repetirla
+    del sentencias[:]
+    with pool.conexion() as conexion:
+        conexion.cursor().execute("SELECT 1")
+    assert sentencias == ["SELECT 1"]
+
+def test_si_no_se_puede_restaurar_la_sesion_se_reconecta(monkeypatch):
+    sentencias = []
+    conexion = ConexionPrueba(sentencias)
+    monkeypatch.setattr(mysql.connector, 'connect', lambda **configuracion: conexion)
+    pool = conexiones.PoolConexiones({}, 1)
+
+    with pool.conexion():
+        pool.sesion_modificada(conexion)
+        conexion.errores["SET SESSION unique_checks = 0"] = 2013
+    # La conexión se cierra y se vuelve a abrir y configurar antes de entregarla otra vez
+    assert not conexion.is_connected()
+    del conexion.errores["SET SESSION unique_checks = 0"]
+    del sentencias[:]
+    with pool.conexion() as reutilizada:
+        assert reutilizada is conexion
+    assert sentencias == ['RECONNECT'] + [f"SET SESSION {variable} = {valor}" for variable, valor in conexiones.SESION_CARGA.items()]
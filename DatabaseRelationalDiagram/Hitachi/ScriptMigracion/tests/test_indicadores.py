@@ -0,0 +1,73 @@
+import os
+import Migrations as funcs
+import Indicadores as indicadores
+
+FECHA = '2024-01-02'
+
+# Filas transformadas de cada tabla con las columnas de su mapeo. Solo se rellenan las columnas que usan los indicadores
+def fila(fichero, **valores):
+    return [valores.get(columna) for columna in funcs.MAPEOS[fichero].columnas]
+
+ORDENES = [
+    fila('hitachi_ordenes.sql', Id=1, FechaApertura=f'{FECHA} 08:00:00', TiempoParada='1.5', Confirmada=1, IdActivo=10, IdEstadoOrden=2, IdTipoOrden=1),
+    fila('hitachi_ordenes.sql', Id=2, FechaApertura=f'{FECHA} 17:00:00', TiempoParada=None, Confirmada=1, IdActivo=10, IdEstadoOrden=2, IdTipoOrden=1),
+    # Sin activo y con un tiempo de parada que no es un número
+    fila('hitachi_ordenes.sql', Id=3, FechaApertura=f'{FECHA} 09:00:00', TiempoParada='n/a', Confirmada=0, IdActivo=None, IdEstadoOrden=1, IdTipoOrden=1),
+    # Sin fecha de apertura: no se agrega
+    fila('hitachi_ordenes.sql', Id=4, FechaApertura=None, Confirmada=1, IdActivo=10, IdEstadoOrden=2, IdTipoOrden=1),
+]
+
+INCIDENCIAS = [
+    # 89,99 minutos: TIMESTAMPDIFF trunca a 89 y las horas se redondean a 1
+    fila('hitachi_orden_incidencias_resolucion.sql', IdOrden=1, FechaDeteccion=f'{FECHA} 08:00:00', FechaResolucion=f'{FECHA} 09:29:59', ParoMaquina=1),
+    # 2,5 horas se redondean al par, 2
+    fila('hitachi_orden_incidencias_resolucion.sql', IdOrden=1, FechaDeteccion=f'{FECHA} 08:00:00', FechaResolucion=f'{FECHA} 10:30:00', ParoMaquina=0),
+    fila('hitachi_orden_incidencias_resolucion.sql', IdOrden=2, FechaDeteccion=f'{FECHA} 17:00:00', FechaResolucion=None, ParoMaquina=1),
+    # De una orden que no está en el fichero: no se agrega
+    fila('hitachi_orden_incidencias_resolucion.sql', IdOrden=99, FechaDeteccion=f'{FECHA} 08:00:00', FechaResolucion=None, ParoMaquina=1),
+]
+
+# Función que escribe los ficheros transformados de las tablas indicadas y devuelve, por tabla, su fichero del volcado y el transformado
+def escribir_ficheros(raiz, filas_tablas):
+    os.makedirs(raiz / 'FicherosModificados_Datos', exist_ok=True)
+    ficheros = {}
+    for fichero, filas in filas_tablas.items():
+        mapeo = funcs.MAPEOS[fichero]
+        fichero_modificado = f"{fichero[:-len('.sql')]}_modificado.sql"
+        funcs.escribir_fichero_modificado(iter([funcs.Insercion(mapeo.tabla, mapeo.columnas, filas)]),
+                                          funcs.obtener_ruta('FicherosModificados_Datos', fichero_modificado))
+        ficheros[mapeo.tabla] = (fichero, fichero_modificado)
+    return ficheros
+
+# Función que lee las filas de un fichero de indicadores con sus valores como texto
+def leer_filas(fichero):
+    return [[None if valor is None else str(valor) for valor in valores]
+            for sentencia in funcs.leer_fichero_modificado(fichero) if sentencia.startswith("INSERT INTO")
+            for valores in funcs.leer_insercion(sentencia).filas]
+
+def test_agregados_por_grupo(raiz):
+    ficheros = escribir_ficheros(raiz, {
+        'hitachi_ordenes.sql': ORDENES,
+        'hitachi_orden_incidencias_resolucion.sql': INCIDENCIAS,
+        'hitachi_activos.sql': [fila('hitachi_activos.sql', Id=10, IdLocalizacion=5)],
+        'hitachi_localizaciones.sql': [fila('hitachi_localizaciones.sql', Id=5, IdPlanta=7)],
+    })
+    ficheros_indicadores, medidas = indicadores.calcular_indicadores(ficheros)
+
+    # El grupo de la orden sin activo usa 0 y no tiene planta
+    assert leer_filas(ficheros_indicadores[indicadores.TABLA_ORDENES]) == [
+        [FECHA, '0', '1', '1', '0', None, '1', None],
+        [FECHA, '10', '2', '1', '1', '7', '2', '1.5'],
+    ]
+    assert leer_filas(ficheros_indicadores[indicadores.TABLA_INCIDENCIAS]) == [
+        [FECHA, '10', '2', '1', '1', '7', '2', '3', '2', '2', str(89 + 150), str(1 + 2)],
+    ]
+    assert {clave: medidas[clave] for clave in ('ordenes', 'incidencias', 'ordenes_sin_fecha', 'incidencias_sin_orden', 'plantas')} == {
+        'ordenes': 4, 'incidencias': 4, 'ordenes_sin_fecha': 1, 'incidencias_sin_orden': 1, 'plantas': True}
+
+def test_sin_activos_la_planta_queda_a_null(raiz):
+    ficheros = escribir_ficheros(raiz, {'hitachi_ordenes.sql': ORDENES[:1], 'hitachi_orden_incidencias_resolucion.sql': []})
+    ficheros_indicadores, medidas = indicadores.calcular_indicadores(ficheros)
+    assert leer_filas(ficheros_indicadores[indicadores.TABLA_ORDENES]) == [[FECHA, '10', '2', '1', '1', None, '1', '1.5']]
+    assert leer_filas(ficheros_indicadores[indicadores.TABLA_INCIDENCIAS]) == []
+    assert medidas['plantas'] is False
@@ -0,0 +1,126 @@
+import os
+import shutil
+from contextlib import contextmanager
+import Migrations as funcs
+import Scheduler as planificador
+import IndicesDiferidos as indices_diferidos
+
+CARPETA_VOLCADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datos', 'plan_base', 'volcados')
+
+# Filas de information_schema.STATISTICS de una tabla: nombre, columna, prefijo, orden, tipo y NON_UNIQUE, como las de SHOW INDEX
+ESTADISTICAS = [
+    ('PRIMARY', 'Id', None, 'A', 'BTREE', 0),
+    ('ix_compuesto', 'Nombre', 20, 'A', 'BTREE', 1),
+    ('ix_compuesto', 'Fecha', None, 'D', 'BTREE', 1),
+    ('ix_compuesto', 'Codigo', None, 'A', 'BTREE', 1),
+    ('ix_descripcion', 'Descripcion', None, None, 'FULLTEXT', 1),
+    ('ix_empresa', 'IdEmpresa', None, 'A', 'BTREE', 1),
+    ('ix_empresa_fecha', 'IdEmpresa', None, 'A', 'BTREE', 1),
+    ('ix_empresa_fecha', 'Fecha', None, 'A', 'BTREE', 1),
+    ('ix_expresion', None, None, 'A', 'BTREE', 1),
+    ('ux_codigo', 'Codigo', None, 'A', 'BTREE', 0),
+]
+# Columnas de las claves externas de la tabla: sus índices se mantienen durante la carga
+CLAVES_EXTERNAS = [('fk_empresa', 'IdEmpresa')]
+
+# Base de datos en memoria con los índices de cada tabla, que ejecuta los ALTER TABLE que los quitan y los crean
+class BaseDatosPrueba:
+    def __init__(self, indices):
+        self.indices = indices
+        self.sentencias = []
+
+    @contextmanager
+    def conexion(self):
+        yield self
+
+    def cursor(self):
+        return CursorPrueba(self)
+
+class CursorPrueba:
+    def __init__(self, base_datos):
+        self.base_datos = base_datos
+        self.resultado = None
+
+    def execute(self, sentencia, parametros=None):
+        indices = self.base_datos.indices.get(parametros[0] if parametros else None, {})
+        if sentencia.startswith("SELECT INDEX_NAME"):
+            self.resultado = [fila for fila in ESTADISTICAS if fila[0] in indices]
+        elif sentencia.startswith("SELECT CONSTRAINT_NAME"):
+            self.resultado = CLAVES_EXTERNAS
+        elif sentencia.startswith("SELECT DISTINCT INDEX_NAME"):
+            self.resultado = [(nombre,) for nombre in sorted(indices)]
+        elif sentencia.startswith("ALTER TABLE"):
+            self.base_datos.sentencias.append(sentencia)
+
+    def fetchall(self):
+        return self.resultado
+
+    def close(self):
+        pass
+
+TODOS = {nombre for nombre, *_ in ESTADISTICAS}
+
+def test_indices_que_se_quitan_durante_la_carga():
+    indices = indices_diferidos.leer_indices_secundarios(BaseDatosPrueba({'plantas': TODOS}), 'plantas')
+    # Se mantienen la clave primaria, los índices únicos, los de expresiones y el que empieza por la clave externa
+    assert [indice.nombre for indice in indices] == ['ix_compuesto', 'ix_descripcion']
+    assert [indices_diferidos.definicion_indice(indice) for indice in indices] == [
+        "ADD INDEX `ix_compuesto` (`Nombre`(20), `Fecha` DESC, `Codigo`)",
+        "ADD FULLTEXT INDEX `ix_descripcion` (`Descripcion`)"]
+
+def test_los_indices_quitados_se_vuelven_a_crear_iguales(raiz):
+    base_datos = BaseDatosPrueba({'plantas': TODOS})
+    indices = indices_diferidos.quitar_indices(base_datos, 'plantas')
+    assert base_datos.sentencias == ["ALTER TABLE `plantas` DROP INDEX `ix_compuesto`, DROP INDEX `ix_descripcion`"]
+    # Los índices pendientes se guardan en EstadoMigracion y se leen iguales
+    assert indices_diferidos.leer_diferidos() == {'plantas': indices}
+
+    base_datos.indices['plantas'] = TODOS - {'ix_compuesto', 'ix_descripcion'}
+    medidas = {}
+    assert indices_diferidos.crear_indices(base_datos, 'plantas', indices_diferidos.leer_diferidos()['plantas'], medidas) is True
+    assert base_datos.sentencias[-1] == ("ALTER TABLE `plantas` ADD INDEX `ix_compuesto` (`Nombre`(20), `Fecha` DESC, `Codigo`), "
+                                         "ADD FULLTEXT INDEX `ix_descripcion` (`Descripcion`)")
+    assert medidas['indices'] == ['ix_compuesto', 'ix_descripcion']
+    assert indices_diferidos.leer_diferidos() == {}
+
+def test_crear_indices_salta_los_que_ya_existen(raiz):
+    base_datos = BaseDatosPrueba({'plantas': TODOS})
+    indices = indices_diferidos.leer_indices_secundarios(base_datos, 'plantas')
+    indices_diferidos.guardar_diferidos({'plantas': indices})
+    # El ALTER TABLE anterior llegó a ejecutarse pero la migración se interrumpió antes de anotarlo
+    assert indices_diferidos.crear_indices(base_datos, 'plantas', indices) is True
+    assert base_datos.sentencias == []
+    assert indices_diferidos.leer_diferidos() == {}
+
+# Al reanudar, los índices pendientes de las tablas ya cargadas o que no se migran se crean antes de que termine la migración,
+# y por tanto antes de verificarla. Los de la tabla que quedó a medias se crean al terminar su carga
+def test_la_migracion_reanudada_crea_los_indices_pendientes(raiz, monkeypatch):
+    shutil.copy(os.path.join(CARPETA_VOLCADOS, 'hitachi_plantas.sql'), raiz / 'DumpFolder' / 'hitachi_plantas.sql')
+    base_datos = BaseDatosPrueba({})
+    eventos = []
+    def cargar_fichero(pool, tabla, *argumentos):
+        eventos.append(('cargar', tabla))
+        return True
+    monkeypatch.setattr(planificador, 'cargar_fichero', cargar_fichero)
+    monkeypatch.setattr(funcs, 'consultar_maximo_id', lambda pool, tabla, clave: 0)
+    crear_indices = indices_diferidos.crear_indices
+    def crear_indices_registrados(pool, tabla, *argumentos):
+        eventos.append(('indexar', tabla))
+        return crear_indices(pool, tabla, *argumentos)
+    monkeypatch.setattr(indices_diferidos, 'crear_indices', crear_indices_registrados)
+
+    base_datos.indices['plantas'] = TODOS
+    indices = indices_diferidos.leer_indices_secundarios(base_datos, 'plantas')
+    base_datos.indices['plantas'] = TODOS - {indice.nombre for indice in indices}
+    indices_diferidos.guardar_diferidos({tabla: indices for tabla in ('empresas', 'plantas', 'componentes')})
+    planificador.registrar_punto_control('empresas', 'terminada')
+    planificador.registrar_punto_control('plantas', 'cargando', fichero='hitachi_plantas_modificado.sql', marca=None, posicion=0)
+
+    informe_migracion = {}
+    assert planificador.ejecutar_migracion(base_datos, ['hitachi_empresas.sql', 'hitachi_plantas.sql'], reanudar=True,
+                                           informe_migracion=informe_migracion, limite_cache=None, procesos=1, conexiones=1) is True
+    assert sorted(eventos[:2]) == [('indexar', 'componentes'), ('indexar', 'empresas')]
+    assert eventos[2:] == [('cargar', 'plantas'), ('indexar', 'plantas')]
+    assert indices_diferidos.leer_diferidos() == {}
+    assert informe_migracion['tablas']['plantas']['estado'] == 'terminada'
+    assert informe_migracion['tablas']['plantas']['indices']['indices'] == ['ix_compuesto', 'ix_descripcion']
@@ -0,0 +1,81 @@
+import mysql.connector
+from mysql.connector import Error
+import JerarquiaComponentes as jerarquia
+import Conexiones as conexiones
+
+def test_arbol():
+    antecesores, inexistentes, ciclos = jerarquia.calcular_antecesores({1: None, 2: 1, 3: 2, 4: 1})
+    assert antecesores == {1: [], 2: [1], 3: [2, 1], 4: [1]}
+    assert inexistentes == [] and ciclos == []
+
+def test_ciclo():
+    # Se entra en el ciclo por 1, así que se corta su relación con el padre y queda como raíz
+    padres = {1: 2, 2: 3, 3: 1, 4: 3}
+    antecesores, inexistentes, ciclos = jerarquia.calcular_antecesores(padres)
+    assert ciclos == [1]
+    assert inexistentes == []
+    assert antecesores == {1: [], 2: [3, 1], 3: [1], 4: [3, 1]}
+    assert padres[1] is None
+
+def test_ciclo_al_que_se_llega_desde_fuera():
+    antecesores, _, ciclos = jerarquia.calcular_antecesores({4: 1, 1: 2, 2: 1})
+    assert ciclos == [1]
+    assert antecesores == {1: [], 2: [1], 4: [1]}
+
+def test_componente_padre_de_si_mismo():
+    antecesores, _, ciclos = jerarquia.calcular_antecesores({5: 5, 6: 5})
+    assert ciclos == [5]
+    assert antecesores == {5: [], 6: [5]}
+
+def test_padre_inexistente():
+    # El componente cuyo padre no existe se toma como raíz y sus descendientes cuelgan de él
+    padres = {1: 99, 2: 1, 3: 2}
+    antecesores, inexistentes, ciclos = jerarquia.calcular_antecesores(padres)
+    assert inexistentes == [(1, 99)]
+    assert ciclos == []
+    assert antecesores == {1: [], 2: [1], 3: [2, 1]}
+
+def test_cadena_larga_sin_recursion():
+    profundidad = 3000
+    padres = {componente: componente - 1 if componente else None for componente in range(profundidad)}
+    antecesores, _, _ = jerarquia.calcular_antecesores(padres)
+    assert len(antecesores[profundidad - 1]) == profundidad - 1
+
+def test_tabla_de_cierre():
+    antecesores = {1: [], 2: [1], 3: [2, 1]}
+    filas = [fila for insercion in jerarquia.generar_inserciones(antecesores) for fila in insercion.filas]
+    assert sorted(filas) == [(1, 1, 0), (1, 2, 1), (1, 3, 2), (2, 2, 0), (2, 3, 1), (3, 3, 0)]
+
+# Conexión de prueba que guarda las sentencias ejecutadas. Con tablas, las sentencias sobre otras tablas fallan como en MySQL
+class ConexionPrueba:
+    def __init__(self, sentencias, tablas=None):
+        self.sentencias = sentencias
+        self.tablas = tablas
+
+    def cursor(self):
+        return self
+
+    def execute(self, sentencia, parametros=None):
+        if self.tablas is not None and sentencia.startswith("TRUNCATE") and sentencia.split('`')[1] not in self.tablas:
+            raise Error(f"Table '{sentencia.split('`')[1]}' doesn't exist", errno=1146)
+        self.sentencias.append(sentencia)
+
+    def is_connected(self):
+        return True
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+def test_preparar_tabla_solo_la_vacia(monkeypatch):
+    sentencias = []
+    monkeypatch.setattr(mysql.connector, 'connect', lambda **configuracion: ConexionPrueba(sentencias))
+    assert jerarquia.preparar_tabla(conexiones.PoolConexiones({}, 1)) is True
+    assert [sentencia for sentencia in sentencias if not sentencia.startswith("SET SESSION")] == ["TRUNCATE TABLE `componentes_jerarquia`"]
+
+def test_preparar_tabla_sin_la_migracion_de_la_base_de_datos(monkeypatch):
+    monkeypatch.setattr(mysql.connector, 'connect', lambda **configuracion: ConexionPrueba([], tablas=set()))
+    resultado = jerarquia.preparar_tabla(conexiones.PoolConexiones({}, 1))
+    assert "AddedComponentesJerarquia" in resultado
@@ -0,0 +1,53 @@
+import os
+import shutil
+from collections import Counter
+import pytest
+import Migrations as funcs
+
+# Volcados pequeños de cada tabla y los ficheros que generaban con las funciones de transformación de cada tabla,
+# antes de que se sustituyeran por los mapeos
+CARPETA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datos', 'plan_base')
+
+@pytest.mark.parametrize('fichero', sorted(funcs.MAPEOS))
+def test_mapeo_igual_que_la_transformacion_anterior(raiz, fichero):
+    shutil.copy(os.path.join(CARPETA_BASE, 'volcados', fichero), raiz / 'DumpFolder' / fichero)
+    fichero_modificado = funcs.transformar_fichero(fichero)[0]
+    with open(funcs.obtener_ruta('FicherosModificados_Datos', fichero_modificado), 'rb') as file:
+        generado = file.read()
+    with open(os.path.join(CARPETA_BASE, 'esperados', fichero_modificado), 'rb') as file:
+        assert generado == file.read()
+
+
+# Función que transforma un INSERT del volcado con el mapeo del fichero y devuelve el texto de los INSERT generados
+def transformar(fichero, sentencia, columnar=False, desconocidos=None):
+    return [generada if isinstance(generada, str) else funcs.formatear_insercion(generada)
+            for generada in funcs.transformar_sentencias(funcs.MAPEOS[fichero], [sentencia], columnar=columnar,
+                                                         desconocidos=desconocidos)]
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_usuario_sin_reemplazo_en_la_clave_primaria(raiz, columnar):
+    # IdUsuario es parte de la clave de usuarios_ordenes: no se puede insertar como NULL
+    with pytest.raises(ValueError, match=r"usuarios_ordenes \(columna 1\): usuarios '9999'"):
+        transformar('hitachi_usuarios_orden.sql', "INSERT INTO `usuarios_orden` VALUES (1,10),(9999,11);", columnar)
+    with pytest.raises(ValueError, match="usuarios 'NULL'"):
+        transformar('hitachi_usuarios_orden.sql', "INSERT INTO `usuarios_orden` VALUES (NULL,10);", columnar)
+
+def test_criticidad_sin_reemplazo_en_activos(raiz):
+    fila = "(1,'ACT1','Bomba','Pump',1,1,1,1,'50%','XX',1,1,0,1)"
+    with pytest.raises(ValueError, match=r"activos\.IdCriticidad: criticidad 'XX'"):
+        transformar('hitachi_activos.sql', f"INSERT INTO `activos` VALUES {fila};")
+
+def test_descripcion_nula_en_activos(raiz):
+    # DescripcionES es NOT NULL: un NULL del volcado ya no se inserta (antes se insertaba el texto 'NULL')
+    with pytest.raises(ValueError, match=r"activos\.DescripcionES"):
+        transformar('hitachi_activos.sql', "INSERT INTO `activos` VALUES (1,'ACT1',NULL,NULL,1,1,1,1,'50%','MC',1,1,0,1);")
+    generadas = transformar('hitachi_activos.sql', "INSERT INTO `activos` VALUES (1,'ACT1','Bomba',NULL,1,1,1,1,'50%','MC',1,1,0,1);")
+    assert generadas[0].endswith("VALUES (1,'ACT1','Bomba',NULL,1,1,1,1,50,1,1,1,2);")
+
+def test_usuario_sin_reemplazo_en_columna_opcional(raiz):
+    # En el historial los usuarios pueden ser NULL: el valor desconocido se cuenta y se inserta NULL
+    desconocidos = Counter()
+    generadas = transformar('hitachi_historial_modificaciones_usuarios_ordenes.sql',
+                            "INSERT INTO `historial` VALUES (1,'2024-01-01 10:00:00',5,9999,1);", desconocidos=desconocidos)
+    assert generadas[0].endswith("VALUES (1,'2024-01-01 10:00:00',5,NULL,'81e47e59-a3d5-4c7b-b3f7-077da98a369f');")
+    assert desconocidos == {('usuarios', '9999'): 1}
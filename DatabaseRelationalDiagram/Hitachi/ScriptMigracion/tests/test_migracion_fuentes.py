@@ -0,0 +1,31 @@
+import json
+import pytest
+import MigracionFuentes as migracion_fuentes
+
+@pytest.mark.parametrize('conexiones_fuente, escritores, reparto', [
+    (4, None, (4, None)),
+    (8, 3, (2, 3)),
+    (4, 8, (1, 3)),
+    (5, 1, (2, 1)),
+    (1, 4, (1, None)),
+])
+def test_repartir_conexiones(conexiones_fuente, escritores, reparto):
+    assert migracion_fuentes.repartir_conexiones(conexiones_fuente, escritores) == reparto
+    cargas, escritores_carga = reparto
+    assert cargas * (1 + (escritores_carga or 0)) <= conexiones_fuente
+
+def test_los_escritores_no_pasan_de_las_conexiones(monkeypatch):
+    fuentes = [migracion_fuentes.Fuente(nombre, f'/tmp/{nombre}', nombre) for nombre in ('hitachi', 'demo')]
+    llamadas = []
+    monkeypatch.setattr(migracion_fuentes, 'migrar_fuente',
+                        lambda fuente, argumentos, conexiones, procesos, marca, escritores=None:
+                        llamadas.append((conexiones, escritores)) or {'nombre': fuente.nombre, 'resultado': True})
+    migracion_fuentes.migrar_fuentes([], fuentes, simultaneas=2, conexiones=8, procesos=2, escritores=4)
+    assert llamadas == [(1, 3), (1, 3)]
+
+def test_escritores_reservados_en_el_fichero_de_fuentes(tmp_path):
+    ruta_fuentes = tmp_path / 'fuentes.json'
+    ruta_fuentes.write_text(json.dumps({'argumentos': ['--escritores-asincronos=4'],
+                                        'fuentes': [{'nombre': 'hitachi', 'raiz': 'hitachi', 'base_datos': 'gsmao'}]}))
+    with pytest.raises(ValueError):
+        migracion_fuentes.leer_fuentes(str(ruta_fuentes))
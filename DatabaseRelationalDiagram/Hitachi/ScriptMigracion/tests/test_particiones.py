@@ -0,0 +1,96 @@
+import os
+import gzip
+import random
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import Migrations as funcs
+import Benchmark as benchmark
+import Indice as indices
+import Particiones as particiones
+
+# Función que lee un fichero transformado, descomprimiendo sus bloques si está comprimido
+def leer_transformado(fichero_modificado):
+    ruta = funcs.obtener_ruta('FicherosModificados_Datos', fichero_modificado)
+    with (gzip.open(ruta, 'rb') if ruta.endswith('.gz') else open(ruta, 'rb')) as file:
+        return file.read()
+
+@pytest.mark.parametrize('fichero, formato, compresion, marca', [
+    ('hitachi_ordenes.sql', 'sql', None, None),
+    ('hitachi_ordenes.sql', 'tsv', None, None),
+    ('hitachi_ordenes.sql', 'sql', 'gzip', None),
+    ('hitachi_historial_modificaciones_usuarios_ordenes.sql', 'sql', None, 1500),
+])
+def test_las_partes_unidas_son_iguales_que_el_fichero_entero(raiz, monkeypatch, fichero, formato, compresion, marca):
+    monkeypatch.setattr(benchmark, 'FILAS_POR_INSERT', 100)
+    benchmark.generar_volcado(fichero, benchmark.calcular_tamanos(1000))
+
+    fichero_modificado, marca_entero = funcs.transformar_fichero(fichero, formato, marca=marca, compresion=compresion)[:2]
+    entero = leer_transformado(fichero_modificado)
+
+    with ThreadPoolExecutor(max_workers=4) as ejecutor:
+        fichero_partes, marca_partes, medidas = particiones.transformar_fichero(fichero, ejecutor, 4, formato, marca=marca,
+                                                                                compresion=compresion)
+    assert medidas['partes'] == 4
+    assert fichero_partes == fichero_modificado
+    assert marca_partes == marca_entero
+    assert leer_transformado(fichero_partes) == entero
+
+# Función que construye el índice de un volcado con INSERT del número de tuplas indicado, de 10 bytes cada una
+def construir_indice(tuplas_por_insert):
+    volcado = b''.join(b'INSERT INTO `t` VALUES ' + b','.join([b'(1,\'abcd\')'] * tuplas) + b';\n' for tuplas in tuplas_por_insert)
+    return indices.construir_indice(volcado)
+
+def test_las_partes_empiezan_al_principio_de_un_insert():
+    indice = construir_indice([10] * 8)
+    rangos = indices.dividir_tuplas(indice, 3)
+    assert len(rangos) == 3
+    assert all(desde in indice.primeras for desde, _ in rangos)
+    assert rangos[-1][1] == 80
+
+def test_un_insert_mayor_que_una_parte_se_corta():
+    indice = construir_indice([100])
+    rangos = indices.dividir_tuplas(indice, 4)
+    assert rangos == [(0, 25), (25, 50), (50, 75), (75, 100)]
+
+# Función que escribe un volcado con INSERT del número de tuplas indicado en DumpFolder y devuelve su ruta
+def escribir_volcado(tuplas_por_insert, texto=b'abcd'):
+    ruta = funcs.obtener_ruta('DumpFolder', 'hitachi_ordenes.sql')
+    with open(ruta, 'wb') as file:
+        file.write(b'-- cabecera\n')
+        for tuplas in tuplas_por_insert:
+            file.write(b'INSERT INTO `t` VALUES ' + b','.join([b"(1,'" + texto + b"')"] * tuplas) + b';\n')
+    return ruta
+
+def test_leer_tuplas_de_insert_enteros_y_partidos(raiz):
+    ruta = escribir_volcado([3, 2, 4], "a),(b ñ".encode('utf-8'))
+    indice = indices.obtener_indice(ruta)
+    with indices.proyectar_volcado(ruta) as volcado:
+        enteros = list(indices.leer_tuplas(volcado, indice, 0, 9))
+        assert enteros == list(indices.leer_sentencias(volcado, indice))
+        fila = "(1,'a),(b ñ')"
+        assert list(indices.leer_tuplas(volcado, indice, 1, 7)) == [
+            f"INSERT INTO `t` VALUES {fila},{fila};", enteros[1], f"INSERT INTO `t` VALUES {fila},{fila};"]
+
+def test_el_indice_se_regenera_si_cambia_el_volcado(raiz):
+    ruta = escribir_volcado([10, 10])
+    assert len(indices.obtener_indice(ruta).tuplas) == 20
+    assert indices.leer_indice(ruta, os.stat(ruta)) is not None
+
+    # Otro volcado con distinto tamaño
+    ruta = escribir_volcado([10, 10, 5])
+    assert indices.leer_indice(ruta, os.stat(ruta)) is None
+    assert len(indices.obtener_indice(ruta).tuplas) == 25
+
+    # Otro volcado del mismo tamaño con otra fecha
+    estado = os.stat(ruta)
+    ruta = escribir_volcado([5, 10, 10])
+    os.utime(ruta, ns=(estado.st_atime_ns, estado.st_mtime_ns + 10 ** 9))
+    assert indices.leer_indice(ruta, os.stat(ruta)) is None
+    assert list(indices.obtener_indice(ruta).primeras) == [0, 5, 15, 25]
+
+    # Índice guardado a medias
+    with open(ruta + indices.EXTENSION_INDICE, 'r+b') as file:
+        file.truncate(os.path.getsize(ruta + indices.EXTENSION_INDICE) - 8)
+    assert indices.leer_indice(ruta, os.stat(ruta)) is None
+    with indices.proyectar_volcado(ruta) as volcado:
+        assert indices.obtener_indice(ruta) == indices.construir_indice(volcado)
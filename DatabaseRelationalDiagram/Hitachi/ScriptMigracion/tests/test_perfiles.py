@@ -0,0 +1,33 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import Perfiles as perfiles
+
+# Función de una etapa que reserva memoria y anota cuándo empieza y termina
+def etapa(registro, nombre):
+    registro.append(('empieza', nombre))
+    datos = [bytes(1024) for _ in range(2000)]
+    time.sleep(0.05)
+    registro.append(('termina', nombre))
+    return len(datos)
+
+def test_dos_tablas_perfiladas_a_la_vez(raiz):
+    perfil = perfiles.Perfil(perfiles.MODOS['ambos'], None, 5, 'prueba')
+    registro = []
+    inicio = threading.Barrier(2)
+
+    def perfilar(tabla):
+        inicio.wait()
+        return perfiles.perfilar(perfil, tabla, 'cargar', etapa, registro, tabla)
+
+    with ThreadPoolExecutor(max_workers=2) as ejecutor:
+        resultados = list(ejecutor.map(perfilar, ['ordenes', 'activos']))
+
+    # Las etapas perfiladas no se solapan: cada una termina antes de que empiece la siguiente
+    assert [evento for evento, _ in registro] == ['empieza', 'termina', 'empieza', 'termina']
+    for resultado, medidas in resultados:
+        assert resultado == 2000
+        assert os.path.exists(medidas['perfil']) and os.path.exists(medidas['resumen'])
+        assert medidas['pico_memoria_mb'] >= 2
+        assert medidas['funciones']
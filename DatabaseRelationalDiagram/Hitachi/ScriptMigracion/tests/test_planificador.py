@@ -0,0 +1,55 @@
+import os
+import time
+import shutil
+import threading
+import pytest
+import Migrations as funcs
+import Scheduler as planificador
+import JerarquiaComponentes as jerarquia
+import Indicadores as indicadores
+
+CARPETA_VOLCADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datos', 'plan_base', 'volcados')
+
+# Función que migra todos los volcados de prueba sin base de datos y devuelve en orden el inicio y el fin de la carga de cada tabla.
+# Las tablas sin dependencias tardan más en cargarse, para que una tabla hija que no esperase a su padre empezase antes de que
+# el padre terminara
+def migrar(raiz, monkeypatch, **opciones):
+    for fichero in funcs.MAPEOS:
+        shutil.copy(os.path.join(CARPETA_VOLCADOS, fichero), raiz / 'DumpFolder' / fichero)
+
+    eventos = []
+    bloqueo = threading.Lock()
+    def cargar_fichero(pool, tabla, *argumentos):
+        with bloqueo:
+            eventos.append(('inicio', tabla))
+        time.sleep(0.05 if not planificador.DEPENDENCIAS[tabla] else 0.01)
+        with bloqueo:
+            eventos.append(('fin', tabla))
+        return True
+    monkeypatch.setattr(planificador, 'cargar_fichero', cargar_fichero)
+    monkeypatch.setattr(jerarquia, 'preparar_tabla', lambda pool: True)
+    monkeypatch.setattr(indicadores, 'preparar_tabla', lambda pool, tabla: True)
+    monkeypatch.setattr(funcs, 'consultar_maximo_id', lambda pool, tabla, clave: 0)
+
+    informe_migracion = {}
+    assert planificador.ejecutar_migracion(None, sorted(funcs.MAPEOS), informe_migracion=informe_migracion,
+                                           limite_cache=None, **opciones) is True
+    return eventos, informe_migracion
+
+@pytest.mark.parametrize('conexiones', [1, 4])
+def test_las_tablas_padre_terminan_antes_que_las_hijas(raiz, monkeypatch, conexiones):
+    eventos, informe_migracion = migrar(raiz, monkeypatch, procesos=2, conexiones=conexiones)
+
+    tablas = set(planificador.TABLAS_FICHEROS.values()) | planificador.TABLAS_CALCULADAS
+    assert sorted(tabla for evento, tabla in eventos if evento == 'fin') == sorted(tablas)
+    for tabla in tablas:
+        inicio = eventos.index(('inicio', tabla))
+        for padre in planificador.DEPENDENCIAS[tabla]:
+            assert eventos.index(('fin', padre)) < inicio, f"{tabla} empieza a cargarse antes de que termine {padre}"
+    assert all(datos['estado'] == 'terminada' for datos in informe_migracion['tablas'].values())
+
+def test_las_opciones_se_pasan_por_nombre(raiz):
+    with pytest.raises(TypeError):
+        planificador.ejecutar_migracion(None, [], 2, 4)
+    with pytest.raises(TypeError):
+        planificador.ejecutar_migracion(None, [], procesoss=2)
@@ -0,0 +1,194 @@
+import os
+import json
+import mysql.connector
+from mysql.connector import Error
+import Migrations as funcs
+import Scheduler as planificador
+import Conexiones as conexiones
+import Benchmark as benchmark
+
+FICHERO = 'hitachi_orden_incidencias_resolucion.sql'
+TABLA = 'incidenciasordenes'
+
+# Base de datos en memoria con la tabla incidenciasordenes: MySQL genera su Id al insertar y las filas solo son visibles
+# al confirmar. Con fallar_en_commit la conexión se pierde justo después de ese commit, antes del punto de control
+class BaseDatosPrueba:
+    def __init__(self, fallar_en_commit=None):
+        self.filas = {}
+        self.siguiente_id = 1
+        self.commits = 0
+        self.fallar_en_commit = fallar_en_commit
+
+class ConexionPrueba:
+    def __init__(self, base_datos):
+        self.base_datos = base_datos
+        self.pendientes = {}
+
+    def cursor(self):
+        return CursorPrueba(self)
+
+    def is_connected(self):
+        return True
+
+    def commit(self):
+        self.base_datos.filas.update(self.pendientes)
+        self.pendientes = {}
+        self.base_datos.commits += 1
+        if self.base_datos.commits == self.base_datos.fallar_en_commit:
+            raise Error("Lost connection to MySQL server during query")
+
+    def rollback(self):
+        self.pendientes = {}
+
+    def close(self):
+        pass
+
+class CursorPrueba:
+    def __init__(self, conexion):
+        self.conexion = conexion
+        self.with_rows = False
+        self.rowcount = 0
+        self.resultado = None
+
+    def execute(self, sentencia, parametros=None):
+        base_datos = self.conexion.base_datos
+        self.rowcount = 0
+        if sentencia.startswith("SELECT COLUMN_NAME"):
+            self.resultado = [('Id', 'PRI')] + [(columna, '') for columna in funcs.MAPEOS[FICHERO].columnas]
+        elif sentencia.startswith("SELECT MAX"):
+            self.resultado = [(max(base_datos.filas, default=None),)]
+        elif sentencia.startswith("DELETE"):
+            borrar = [identificador for identificador in base_datos.filas if identificador > parametros[0]]
+            for identificador in borrar:
+                del base_datos.filas[identificador]
+            self.rowcount = len(borrar)
+        elif sentencia.startswith("INSERT INTO"):
+            # Los upserts de la carga reanudada no cambian nada: las filas no llevan su Id
+            for valores in funcs.tokenizar_valores(sentencia.split(" ON DUPLICATE KEY UPDATE")[0]):
+                self.conexion.pendientes[base_datos.siguiente_id] = tuple(valores)
+                base_datos.siguiente_id += 1
+                self.rowcount += 1
+
+    def fetchall(self):
+        return self.resultado
+
+    def fetchone(self):
+        return self.resultado[0]
+
+    def close(self):
+        pass
+
+# Función que escribe un volcado de incidencias con filas distintas en INSERT de 5 filas
+def escribir_volcado(raiz, filas=40):
+    with open(raiz / 'DumpFolder' / FICHERO, 'w', encoding='utf-8') as file:
+        for inicio in range(1, filas + 1, 5):
+            tuplas = [funcs.formatear_tupla([i, f'2024-01-01 10:{i % 60:02d}:00', i, 1, 1, 1, None, None, 1, 0, i % 2])
+                      for i in range(inicio, inicio + 5)]
+            file.write(f"INSERT INTO `orden_incidencias_resolucion` VALUES {','.join(tuplas)};\n")
+
+# Función que migra el volcado con un pool sobre la base de datos de prueba, confirmando cada 2 INSERT
+def migrar(monkeypatch, base_datos, reanudar=False):
+    monkeypatch.setattr(mysql.connector, 'connect', lambda **configuracion: ConexionPrueba(base_datos))
+    pool = conexiones.PoolConexiones({}, 2)
+    try:
+        return planificador.ejecutar_migracion(pool, [FICHERO], procesos=1, conexiones=2, lotes={'lotes_por_commit': 2},
+                                               reanudar=reanudar, limite_cache=None)
+    finally:
+        pool.cerrar()
+
+def test_reanudar_no_repite_filas_de_la_clave_generada(raiz, monkeypatch):
+    escribir_volcado(raiz)
+    base_datos = BaseDatosPrueba(fallar_en_commit=3)
+    assert migrar(monkeypatch, base_datos) is not True
+    # El tercer commit llegó a la base de datos pero no a los puntos de control
+    assert len(base_datos.filas) == 30
+
+    base_datos.fallar_en_commit = None
+    assert migrar(monkeypatch, base_datos, reanudar=True) is True
+    assert sorted(fila[1] for fila in base_datos.filas.values()) == list(range(1, 41))
+
+def test_reanudar_sin_fichero_transformado_carga_la_tabla_entera(raiz, monkeypatch):
+    escribir_volcado(raiz)
+    base_datos = BaseDatosPrueba(fallar_en_commit=2)
+    assert migrar(monkeypatch, base_datos) is not True
+    os.remove(funcs.obtener_ruta('FicherosModificados_Datos', funcs.nombre_fichero_modificado(FICHERO)))
+
+    base_datos.fallar_en_commit = None
+    assert migrar(monkeypatch, base_datos, reanudar=True) is True
+    assert sorted(fila[1] for fila in base_datos.filas.values()) == list(range(1, 41))
+
+def test_convertir_upserts():
+    sentencias = ["LOCK TABLES `t` WRITE;", "INSERT INTO `t` VALUES (1,'a',2);", "INSERT INTO `t` (`Id`, `Nombre`) VALUES (3,'c');",
+                  "INSERT INTO `t` VALUES (4,'d',5);"]
+    assert list(funcs.convertir_upserts(iter(sentencias), ['Id', 'Nombre', 'IdPadre'], {'Id'})) == [
+        "LOCK TABLES `t` WRITE;",
+        "INSERT INTO `t` VALUES (1,'a',2) ON DUPLICATE KEY UPDATE Nombre = VALUES(Nombre), IdPadre = VALUES(IdPadre);",
+        "INSERT INTO `t` (`Id`, `Nombre`) VALUES (3,'c') ON DUPLICATE KEY UPDATE Nombre = VALUES(Nombre);",
+        "INSERT INTO `t` VALUES (4,'d',5) ON DUPLICATE KEY UPDATE Nombre = VALUES(Nombre), IdPadre = VALUES(IdPadre);"]
+    # Si todas las columnas son de la clave, la fila existente se deja como está
+    assert list(funcs.convertir_upserts(["INSERT INTO `t` VALUES (1,2);"], ['IdA', 'IdB'], {'IdA', 'IdB'})) == [
+        "INSERT INTO `t` VALUES (1,2) ON DUPLICATE KEY UPDATE IdA = VALUES(IdA);"]
+
+def test_los_puntos_control_se_juntan_por_tabla(raiz):
+    planificador.registrar_punto_control('plantas', 'cargando', fichero='f.sql', marca=None, posicion=0)
+    planificador.registrar_punto_control('empresas', 'terminada')
+    planificador.registrar_punto_control('plantas', 'cargando', lote=2, posicion=120, ultimo_id=7)
+    # Una línea a medias de una migración interrumpida mientras escribía se ignora
+    with open(funcs.obtener_ruta('EstadoMigracion', planificador.FICHERO_PUNTOS_CONTROL), 'a', encoding='utf-8') as file:
+        file.write('{"tabla": "plantas", "estado": "termi')
+    assert planificador.leer_puntos_control() == {
+        'plantas': {'tabla': 'plantas', 'estado': 'cargando', 'fichero': 'f.sql', 'marca': None, 'lote': 2, 'posicion': 120,
+                    'ultimo_id': 7},
+        'empresas': {'tabla': 'empresas', 'estado': 'terminada'}}
+    planificador.borrar_puntos_control()
+    assert planificador.leer_puntos_control() == {}
+
+# Función que sustituye la carga de los scripts SQL: ejecuta las sentencias en la lista ejecutadas y confirma cada
+# lotes_por_commit INSERT. La conexión se pierde en el commit fallar_en_commit, después de confirmarse pero antes del punto de control
+def simular_carga(monkeypatch, ejecutadas, fallar_en_commit=None):
+    def ejecutar_script_mysql(pool, sentencias, lotes_por_commit=None, al_confirmar=None, medidas=None):
+        lotes = 0
+        for sentencia in sentencias:
+            ejecutadas.append(sentencia)
+            if sentencia.startswith("INSERT INTO"):
+                lotes += 1
+                if lotes % lotes_por_commit == 0:
+                    if lotes // lotes_por_commit == fallar_en_commit:
+                        return "Error conectando a la base de datos: Lost connection to MySQL server during query"
+                    al_confirmar(lotes)
+        return True
+    monkeypatch.setattr(funcs, 'ejecutar_script_mysql', ejecutar_script_mysql)
+
+def test_reanudar_desde_el_punto_de_control_con_upserts(raiz, monkeypatch):
+    fichero = 'hitachi_localizaciones.sql'
+    monkeypatch.setattr(benchmark, 'FILAS_POR_INSERT', 20)
+    benchmark.generar_volcado(fichero, benchmark.calcular_tamanos(100))
+    columnas = funcs.MAPEOS[fichero].columnas
+    monkeypatch.setattr(funcs, 'leer_columnas_tabla', lambda pool, tabla: (columnas, {'Id'}))
+    opciones = dict(procesos=1, conexiones=1, lotes={'lotes_por_commit': 2}, limite_cache=None)
+
+    primera = []
+    simular_carga(monkeypatch, primera, fallar_en_commit=3)
+    assert planificador.ejecutar_migracion(None, [fichero], **opciones) is not True
+    inserciones = [sentencia for sentencia in primera if sentencia.startswith("INSERT INTO")]
+    assert len(inserciones) == 6
+    punto = planificador.leer_puntos_control()['localizaciones']
+    assert punto['estado'] == 'cargando' and punto['lote'] == 4
+    assert punto['ultimo_id'] == funcs.ultimo_id(inserciones[3])
+
+    # Se sigue tras el cuarto INSERT: el quinto y el sexto llegaron a confirmarse y se repiten como upserts
+    segunda = []
+    simular_carga(monkeypatch, segunda)
+    assert planificador.ejecutar_migracion(None, [fichero], reanudar=True, **opciones) is True
+    repetidas = [sentencia for sentencia in segunda if sentencia.startswith("INSERT INTO")]
+    assert len(repetidas) == 6
+    assert all(sentencia.endswith(funcs.clausula_actualizacion(columnas, {'Id'}) + ';') for sentencia in repetidas)
+    assert [sentencia.split(" ON DUPLICATE KEY UPDATE")[0] + ';' for sentencia in repetidas[:2]] == inserciones[4:]
+    with open(funcs.obtener_ruta('EstadoMigracion', planificador.FICHERO_PUNTOS_CONTROL), encoding='utf-8') as file:
+        assert json.loads(file.readlines()[-1]) == {'tabla': 'localizaciones', 'estado': 'terminada'}
+
+    # La tabla terminada no se vuelve a cargar
+    tercera = []
+    simular_carga(monkeypatch, tercera)
+    assert planificador.ejecutar_migracion(None, [fichero], reanudar=True, **opciones) is True
+    assert tercera == []
@@ -0,0 +1,66 @@
+from decimal import Decimal
+import pytest
+import Migrations as funcs
+
+# Función que tokeniza la lista VALUES de un INSERT de prueba
+def tokenizar(lista):
+    return list(funcs.tokenizar_valores(f"INSERT INTO `t` VALUES {lista};"))
+
+def test_tipos_de_los_valores():
+    assert tokenizar("(1,-5,'texto',NULL,1.50,-0.25,1e5,'')") == [
+        [1, -5, 'texto', None, Decimal('1.50'), Decimal('-0.25'), Decimal('1e5'), '']]
+    assert [type(valor) for valor in tokenizar("(7,1.5)")[0]] == [int, Decimal]
+
+def test_varias_tuplas():
+    assert tokenizar("(1,'a'),(2,NULL),(3,'c')") == [[1, 'a'], [2, None], [3, 'c']]
+
+@pytest.mark.parametrize('lista, cadena', [
+    ("(1,'it\\'s')", "it's"),
+    ("(1,'C:\\\\datos\\\\')", 'C:\\datos\\'),
+    ("(1,'\\\\\\'')", "\\'"),
+    ("(1,'\\0\\Z\\n\\r\\t\\b')", '\0\x1a\n\r\t\b'),
+    ("(1,'\\\"comillas\\\" y \"dobles\"')", '"comillas" y "dobles"'),
+    ("(1,'Cambio (lado A), revisar')", 'Cambio (lado A), revisar'),
+    ("(1,'ñandú ✓')", 'ñandú ✓'),
+])
+def test_escapes(lista, cadena):
+    assert tokenizar(lista) == [[1, cadena]]
+
+# Las comas, paréntesis, NULL y comillas de dentro de las cadenas no se confunden con los de fuera
+@pytest.mark.parametrize('lista, valores', [
+    ("(1,'a),(b',NULL)", [[1, 'a),(b', None]]),
+    ("(1,'NULL',NULL),(2,NULL,'NULL')", [[1, 'NULL', None], [2, None, 'NULL']]),
+    ("(1,'x'),(2,'),(3,'),(4,'')", [[1, 'x'], [2, '),(3,'], [4, '']]),
+    ("(1,'it''s',''),(2,'''','a''')", [[1, "it's", ''], [2, "'", "a'"]]),
+    ("(1,'\\\\\\\\',''),(2,'\\\\'',','')", [[1, '\\\\', ''], [2, "\\',", '']]),
+    ("(1,'x\\u0041')", [[1, 'xu0041']]),
+    ("(1,'\\f\\/\\%')", [[1, 'f/%']]),
+])
+def test_cadenas_con_separadores(lista, valores):
+    assert tokenizar(lista) == valores
+
+@pytest.mark.parametrize('valores', [
+    [1, None, -42, Decimal('3.14'), Decimal('-0.001'), ''],
+    [2, "it's", 'barra \\ final\\', 'salto\nde línea', '\0\x1a\r\t', '"dobles"'],
+    [3, 'NULL', 'a),(b', '(', ')', ','],
+])
+def test_ida_y_vuelta(valores):
+    lista = ','.join([funcs.formatear_tupla(valores), funcs.formatear_tupla(valores)])
+    filas = tokenizar(lista)
+    assert filas == [valores, valores]
+    assert ','.join(funcs.formatear_tupla(fila) for fila in filas) == lista
+
+def test_espacios_fuera_de_las_cadenas():
+    assert tokenizar("(1, 2 ,'a b'), (3,NULL)") == [[1, 2, 'a b'], [3, None]]
+
+def test_sin_lista_values():
+    with pytest.raises(ValueError):
+        list(funcs.tokenizar_valores("LOCK TABLES `t` WRITE;"))
+
+def test_valor_no_reconocido():
+    with pytest.raises(ValueError):
+        tokenizar("(1,abc)")
+    with pytest.raises(ValueError):
+        tokenizar("(1,true,'a')")
+    with pytest.raises(ValueError):
+        tokenizar("(1,'sin cerrar)")
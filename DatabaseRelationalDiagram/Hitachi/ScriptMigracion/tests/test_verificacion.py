@@ -0,0 +1,97 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import Migrations as funcs
+import Benchmark as benchmark
+import Particiones as particiones
+import ClavesExternas as claves_externas
+import Verificacion as verificador
+
+CARPETA_VOLCADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datos', 'plan_base', 'volcados')
+
+# Función que transforma un volcado de plan_base guardando su resumen y devuelve el fichero transformado y su ruta
+def transformar(raiz, fichero, formato='sql', columnar=False):
+    shutil.copy(os.path.join(CARPETA_VOLCADOS, fichero), raiz / 'DumpFolder' / fichero)
+    fichero_modificado = funcs.transformar_fichero(fichero, formato, columnar=columnar, resumir=True)[0]
+    return fichero_modificado, funcs.obtener_ruta('FicherosModificados_Datos', fichero_modificado)
+
+@pytest.mark.parametrize('formato, columnar', [('sql', False), ('tsv', False), ('sql', True)])
+@pytest.mark.parametrize('fichero', sorted(funcs.MAPEOS))
+def test_el_resumen_es_igual_que_leer_el_fichero(raiz, fichero, formato, columnar):
+    fichero_modificado, ruta = transformar(raiz, fichero, formato, columnar)
+    resumen = verificador.leer_resumen(ruta)
+    posiciones = verificador.posiciones_verificacion(funcs.MAPEOS[fichero])
+    assert resumen['posiciones'] == posiciones
+    assert resumen['tramos'] == verificador.resumir_fichero(fichero_modificado, posiciones)
+
+def test_el_resumen_de_las_partes_es_el_del_fichero_entero(raiz, monkeypatch):
+    fichero = 'hitachi_ordenes.sql'
+    monkeypatch.setattr(benchmark, 'FILAS_POR_INSERT', 100)
+    benchmark.generar_volcado(fichero, benchmark.calcular_tamanos(1000))
+    fichero_modificado = funcs.transformar_fichero(fichero, resumir=True)[0]
+    ruta = funcs.obtener_ruta('FicherosModificados_Datos', fichero_modificado)
+    entero = verificador.leer_resumen(ruta)
+
+    with ThreadPoolExecutor(max_workers=4) as ejecutor:
+        particiones.transformar_fichero(fichero, ejecutor, 4, resumir=True)
+    assert verificador.leer_resumen(ruta) == entero
+    assert sum(filas for filas, _ in entero['tramos'].values()) == 1000
+
+def test_el_resumen_deja_de_valer_si_cambia_el_fichero(raiz):
+    _, ruta = transformar(raiz, 'hitachi_ordenes.sql')
+    with open(ruta, 'a', encoding='utf-8') as file:
+        file.write("INSERT INTO `ordenes` VALUES (999,NULL);\n")
+    assert verificador.leer_resumen(ruta) is None
+    # Sin resumir, el fichero nuevo no conserva el resumen anterior
+    funcs.transformar_fichero('hitachi_ordenes.sql')
+    assert not os.path.exists(verificador.ruta_resumen(ruta))
+
+# Función que verifica una tabla transformada comparándola con los tramos de destino indicados. El fichero no se puede volver
+# a leer: la verificación tiene que usar su resumen
+def verificar(monkeypatch, tabla, fichero, fichero_modificado, destino):
+    mapeo = funcs.MAPEOS[fichero]
+    monkeypatch.setattr(funcs, 'leer_columnas_tabla', lambda pool, tabla: (mapeo.columnas, {'Id'}))
+    monkeypatch.setattr(verificador, 'resumir_tabla', lambda pool, tabla, columnas_clave, tamano_tramo: destino)
+    monkeypatch.setattr(verificador, 'leer_claves_fichero', None)
+    informe_tablas = {tabla: {'estado': 'terminada', 'fichero': fichero, 'fichero_modificado': fichero_modificado}}
+    return verificador.verificar_migracion(None, informe_tablas, procesos=1, conexiones=1)[tabla]
+
+def test_verificacion_con_el_resumen(raiz, monkeypatch):
+    fichero_modificado, _ = transformar(raiz, 'hitachi_orden_incidencias_resolucion.sql')
+    completa = verificador.resumir_fichero(fichero_modificado, [1, 2, 3])
+    resultado = verificar(monkeypatch, 'incidenciasordenes', 'hitachi_orden_incidencias_resolucion.sql', fichero_modificado, completa)
+    assert resultado['estado'] == 'correcta' and resultado['resumen_transformacion']
+    assert resultado['clave'] == ['IdOrden', 'IdComponente', 'IdIncidencia']
+
+def test_verificacion_detecta_una_fila_que_falta(raiz, monkeypatch):
+    fichero_modificado, _ = transformar(raiz, 'hitachi_ordenes.sql')
+    filas = list(verificador.leer_claves_fichero(fichero_modificado, [0]))
+    # En la tabla de destino falta la última fila
+    destino = {}
+    verificador.acumular_tramos(destino, filas[:-1])
+    resultado = verificar(monkeypatch, 'ordenes', 'hitachi_ordenes.sql', fichero_modificado, destino)
+
+    tramo = int(filas[-1][0]) // verificador.TAMANO_TRAMO
+    assert resultado['estado'] == 'distinta' and resultado['resumen_transformacion']
+    assert resultado['filas_origen'] == len(filas) and resultado['filas_destino'] == len(filas) - 1
+    assert [(rango['desde'], rango['hasta']) for rango in resultado['rangos_distintos']] == [
+        (tramo * verificador.TAMANO_TRAMO, (tramo + 1) * verificador.TAMANO_TRAMO - 1)]
+
+@pytest.mark.parametrize('formato', ['sql', 'tsv'])
+def test_la_cuarentena_descuenta_las_filas_del_resumen(raiz, monkeypatch, formato):
+    fichero_modificado, ruta = transformar(raiz, 'hitachi_ordenes.sql', formato)
+    columnas = funcs.MAPEOS['hitachi_ordenes.sql'].columnas
+    monkeypatch.setitem(claves_externas.CLAVES_EXTERNAS, 'ordenes', [claves_externas.ClaveExterna('IdActivo', 'activos')])
+    filas = len(list(verificador.leer_claves_fichero(fichero_modificado, [])))
+    activos = claves_externas.ConjuntoClaves()
+    activos.agregar(5)
+    activos.agregar(9)
+    _, _, resultado = claves_externas.validar_fichero('ordenes', columnas, fichero_modificado, {'activos': activos}, True)
+
+    # Solo quedan en el fichero las filas de los activos 5 y 9
+    assert resultado['filas_huerfanas'] == filas - 2
+    resumen = verificador.leer_resumen(ruta)
+    assert resumen is not None
+    assert resumen['tramos'] == verificador.resumir_fichero(fichero_modificado, [0])
+    assert sum(filas for filas, _ in resumen['tramos'].values()) == 2
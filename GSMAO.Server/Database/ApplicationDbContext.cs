@@ -32,6 +32,9 @@ namespace GSMAO.Server.Database
         public DbSet<IncidenciaOrden> IncidenciasOrdenes { get; set; }
         public DbSet<Orden> Ordenes { get; set; }
         public DbSet<Usuario_Orden> Usuarios_Ordenes { get; set; }
+        public DbSet<Componente_Jerarquia> Componentes_Jerarquia { get; set; }
+        public DbSet<IndicadorOrdenesDiario> Indicadores_Ordenes_Diarias { get; set; }
+        public DbSet<IndicadorIncidenciasDiario> Indicadores_Incidencias_Diarias { get; set; }
         public DbSet<InformeExcelDTO> InformeExcelDTO { get; set; }
 
         protected override void OnModelCreating(ModelBuilder modelBuilder)
@@ -0,0 +1,52 @@
+﻿using Microsoft.EntityFrameworkCore.Migrations;
+
+#nullable disable
+
+namespace GSMAO.Server.Database.Migrations
+{
+    /// <inheritdoc />
+    public partial class AddedComponentesJerarquia : Migration
+    {
+        /// <inheritdoc />
+        protected override void Up(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.CreateTable(
+                name: "Componentes_Jerarquia",
+                columns: table => new
+                {
+                    IdAncestro = table.Column<int>(type: "int", nullable: false),
+                    IdDescendiente = table.Column<int>(type: "int", nullable: false),
+                    Profundidad = table.Column<int>(type: "int", nullable: false)
+                },
+                constraints: table =>
+                {
+                    table.PrimaryKey("PK_Componentes_Jerarquia", x => new { x.IdAncestro, x.IdDescendiente });
+                    table.ForeignKey(
+                        name: "FK_Componentes_Jerarquia_Componentes_IdAncestro",
+                        column: x => x.IdAncestro,
+                        principalTable: "Componentes",
+                        principalColumn: "Id",
+                        onDelete: ReferentialAction.Cascade);
+                    table.ForeignKey(
+                        name: "FK_Componentes_Jerarquia_Componentes_IdDescendiente",
+                        column: x => x.IdDescendiente,
+                        principalTable: "Componentes",
+                        principalColumn: "Id",
+                        onDelete: ReferentialAction.Cascade);
+                })
+                .Annotation("MySql:CharSet", "utf8mb4");
+
+            migrationBuilder.CreateIndex(
+                name: "IX_Componentes_Jerarquia_IdDescendiente_Profundidad",
+                table: "Componentes_Jerarquia",
+                columns: new[] { "IdDescendiente", "Profundidad" });
+        }
+
+        /// <inheritdoc />
+        protected override void Down(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.DropTable(
+                name: "Componentes_Jerarquia");
+        }
+    }
+}
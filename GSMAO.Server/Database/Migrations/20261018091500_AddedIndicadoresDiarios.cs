@@ -0,0 +1,87 @@
+﻿using System;
+using Microsoft.EntityFrameworkCore.Migrations;
+
+#nullable disable
+
+namespace GSMAO.Server.Database.Migrations
+{
+    /// <inheritdoc />
+    public partial class AddedIndicadoresDiarios : Migration
+    {
+        /// <inheritdoc />
+        protected override void Up(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.CreateTable(
+                name: "Indicadores_Incidencias_Diarias",
+                columns: table => new
+                {
+                    Fecha = table.Column<DateOnly>(type: "date", nullable: false),
+                    IdActivo = table.Column<int>(type: "int", nullable: false),
+                    IdEstadoOrden = table.Column<int>(type: "int", nullable: false),
+                    IdTipoOrden = table.Column<int>(type: "int", nullable: false),
+                    Confirmada = table.Column<bool>(type: "tinyint(1)", nullable: false),
+                    IdPlanta = table.Column<int>(type: "int", nullable: true),
+                    Ordenes = table.Column<int>(type: "int", nullable: false),
+                    Incidencias = table.Column<int>(type: "int", nullable: false),
+                    IncidenciasResueltas = table.Column<int>(type: "int", nullable: false),
+                    ParosMaquina = table.Column<int>(type: "int", nullable: false),
+                    MinutosParada = table.Column<long>(type: "bigint", nullable: false),
+                    HorasReparacion = table.Column<long>(type: "bigint", nullable: false)
+                },
+                constraints: table =>
+                {
+                    table.PrimaryKey("PK_Indicadores_Incidencias_Diarias", x => new { x.Fecha, x.IdActivo, x.IdEstadoOrden, x.IdTipoOrden, x.Confirmada });
+                })
+                .Annotation("MySql:CharSet", "utf8mb4");
+
+            migrationBuilder.CreateTable(
+                name: "Indicadores_Ordenes_Diarias",
+                columns: table => new
+                {
+                    Fecha = table.Column<DateOnly>(type: "date", nullable: false),
+                    IdActivo = table.Column<int>(type: "int", nullable: false),
+                    IdEstadoOrden = table.Column<int>(type: "int", nullable: false),
+                    IdTipoOrden = table.Column<int>(type: "int", nullable: false),
+                    Confirmada = table.Column<bool>(type: "tinyint(1)", nullable: false),
+                    IdPlanta = table.Column<int>(type: "int", nullable: true),
+                    Ordenes = table.Column<int>(type: "int", nullable: false),
+                    TiempoParada = table.Column<double>(type: "double", nullable: true)
+                },
+                constraints: table =>
+                {
+                    table.PrimaryKey("PK_Indicadores_Ordenes_Diarias", x => new { x.Fecha, x.IdActivo, x.IdEstadoOrden, x.IdTipoOrden, x.Confirmada });
+                })
+                .Annotation("MySql:CharSet", "utf8mb4");
+
+            migrationBuilder.CreateIndex(
+                name: "IX_Indicadores_Incidencias_Diarias_IdActivo_Fecha",
+                table: "Indicadores_Incidencias_Diarias",
+                columns: new[] { "IdActivo", "Fecha" });
+
+            migrationBuilder.CreateIndex(
+                name: "IX_Indicadores_Incidencias_Diarias_IdPlanta_Fecha",
+                table: "Indicadores_Incidencias_Diarias",
+                columns: new[] { "IdPlanta", "Fecha" });
+
+            migrationBuilder.CreateIndex(
+                name: "IX_Indicadores_Ordenes_Diarias_IdActivo_Fecha",
+                table: "Indicadores_Ordenes_Diarias",
+                columns: new[] { "IdActivo", "Fecha" });
+
+            migrationBuilder.CreateIndex(
+                name: "IX_Indicadores_Ordenes_Diarias_IdPlanta_Fecha",
+                table: "Indicadores_Ordenes_Diarias",
+                columns: new[] { "IdPlanta", "Fecha" });
+        }
+
+        /// <inheritdoc />
+        protected override void Down(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.DropTable(
+                name: "Indicadores_Incidencias_Diarias");
+
+            migrationBuilder.DropTable(
+                name: "Indicadores_Ordenes_Diarias");
+        }
+    }
+}
@@ -236,6 +236,24 @@ namespace GSMAO.Server.Database.Migrations
                     b.ToTable("Componentes");
                 });
 
+            modelBuilder.Entity("GSMAO.Server.Database.Tables.Componente_Jerarquia", b =>
+                {
+                    b.Property<int>("IdAncestro")
+                        .HasColumnType("int");
+
+                    b.Property<int>("IdDescendiente")
+                        .HasColumnType("int");
+
+                    b.Property<int>("Profundidad")
+                        .HasColumnType("int");
+
+                    b.HasKey("IdAncestro", "IdDescendiente");
+
+                    b.HasIndex("IdDescendiente", "Profundidad");
+
+                    b.ToTable("Componentes_Jerarquia");
+                });
+
             modelBuilder.Entity("GSMAO.Server.Database.Tables.Criticidad", b =>
                 {
                     b.Property<int>("Id")
@@ -497,6 +515,88 @@ namespace GSMAO.Server.Database.Migrations
                     b.ToTable("IncidenciasOrdenes");
                 });
 
+            modelBuilder.Entity("GSMAO.Server.Database.Tables.IndicadorIncidenciasDiario", b =>
+                {
+                    b.Property<DateOnly>("Fecha")
+                        .HasColumnType("date");
+
+                    b.Property<int>("IdActivo")
+                        .HasColumnType("int");
+
+                    b.Property<int>("IdEstadoOrden")
+                        .HasColumnType("int");
+
+                    b.Property<int>("IdTipoOrden")
+                        .HasColumnType("int");
+
+                    b.Property<bool>("Confirmada")
+                        .HasColumnType("tinyint(1)");
+
+                    b.Property<long>("HorasReparacion")
+                        .HasColumnType("bigint");
+
+                    b.Property<int?>("IdPlanta")
+                        .HasColumnType("int");
+
+                    b.Property<int>("Incidencias")
+                        .HasColumnType("int");
+
+                    b.Property<int>("IncidenciasResueltas")
+                        .HasColumnType("int");
+
+                    b.Property<long>("MinutosParada")
+                        .HasColumnType("bigint");
+
+                    b.Property<int>("Ordenes")
+                        .HasColumnType("int");
+
+                    b.Property<int>("ParosMaquina")
+                        .HasColumnType("int");
+
+                    b.HasKey("Fecha", "IdActivo", "IdEstadoOrden", "IdTipoOrden", "Confirmada");
+
+                    b.HasIndex("IdActivo", "Fecha");
+
+                    b.HasIndex("IdPlanta", "Fecha");
+
+                    b.ToTable("Indicadores_Incidencias_Diarias");
+                });
+
+            modelBuilder.Entity("GSMAO.Server.Database.Tables.IndicadorOrdenesDiario", b =>
+                {
+                    b.Property<DateOnly>("Fecha")
+                        .HasColumnType("date");
+
+                    b.Property<int>("IdActivo")
+                        .HasColumnType("int");
+
+                    b.Property<int>("IdEstadoOrden")
+                        .HasColumnType("int");
+
+                    b.Property<int>("IdTipoOrden")
+                        .HasColumnType("int");
+
+                    b.Property<bool>("Confirmada")
+                        .HasColumnType("tinyint(1)");
+
+                    b.Property<int?>("IdPlanta")
+                        .HasColumnType("int");
+
+                    b.Property<int>("Ordenes")
+                        .HasColumnType("int");
+
+                    b.Property<double?>("TiempoParada")
+                        .HasColumnType("double");
+
+                    b.HasKey("Fecha", "IdActivo", "IdEstadoOrden", "IdTipoOrden", "Confirmada");
+
+                    b.HasIndex("IdActivo", "Fecha");
+
+                    b.HasIndex("IdPlanta", "Fecha");
+
+                    b.ToTable("Indicadores_Ordenes_Diarias");
+                });
+
             modelBuilder.Entity("GSMAO.Server.Database.Tables.Localizacion", b =>
                 {
                     b.Property<int>("Id")
@@ -1167,6 +1267,25 @@ namespace GSMAO.Server.Database.Migrations
                     b.Navigation("ComponentePadre");
                 });
 
+            modelBuilder.Entity("GSMAO.Server.Database.Tables.Componente_Jerarquia", b =>
+                {
+                    b.HasOne("GSMAO.Server.Database.Tables.Componente", "Ancestro")
+                        .WithMany()
+                        .HasForeignKey("IdAncestro")
+                        .OnDelete(DeleteBehavior.Cascade)
+                        .IsRequired();
+
+                    b.HasOne("GSMAO.Server.Database.Tables.Componente", "Descendiente")
+                        .WithMany()
+                        .HasForeignKey("IdDescendiente")
+                        .OnDelete(DeleteBehavior.Cascade)
+                        .IsRequired();
+
+                    b.Navigation("Ancestro");
+
+                    b.Navigation("Descendiente");
+                });
+
             modelBuilder.Entity("GSMAO.Server.Database.Tables.HistorialCambiosUsuarioOrden", b =>
                 {
                     b.HasOne("GSMAO.Server.Database.Tables.Orden", "Orden")
@@ -0,0 +1,44 @@
+﻿using Microsoft.EntityFrameworkCore;
+using System.ComponentModel.DataAnnotations.Schema;
+
+namespace GSMAO.Server.Database.Tables
+{
+    /// <summary>
+    /// Representa la entidad componente_jerarquia de la base de datos.
+    /// 
+    /// Esta entidad es la tabla de cierre de la jerarquía de componentes,
+    /// tiene una fila por cada componente y cada uno de sus antecesores (y él mismo, con profundidad 0).
+    /// La rellena el script de migración a partir de <see cref="Componente.IdComponentePadre"/>.
+    /// </summary>
+    [PrimaryKey(nameof(IdAncestro), nameof(IdDescendiente))]
+    [Index(nameof(IdDescendiente), nameof(Profundidad))]
+    public class Componente_Jerarquia
+    {
+        /// <summary>
+        /// Identificador del componente antecesor
+        /// </summary>
+        public required int IdAncestro { get; set; }
+
+        /// <summary>
+        /// Identificador del componente descendiente
+        /// </summary>
+        public required int IdDescendiente { get; set; }
+
+        /// <summary>
+        /// Niveles entre el antecesor y el descendiente
+        /// </summary>
+        public required int Profundidad { get; set; }
+
+        /// <summary>
+        /// Componente antecesor. Relación de clave externa con la tabla <see cref="Componente"/>
+        /// </summary>
+        [ForeignKey("IdAncestro")]
+        public required virtual Componente Ancestro { get; set; }
+
+        /// <summary>
+        /// Componente descendiente. Relación de clave externa con la tabla <see cref="Componente"/>
+        /// </summary>
+        [ForeignKey("IdDescendiente")]
+        public required virtual Componente Descendiente { get; set; }
+    }
+}
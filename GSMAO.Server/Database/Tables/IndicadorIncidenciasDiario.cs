@@ -0,0 +1,78 @@
+﻿using Microsoft.EntityFrameworkCore;
+
+namespace GSMAO.Server.Database.Tables
+{
+    /// <summary>
+    /// Representa la entidad indicador_incidencias_diario de la base de datos.
+    /// 
+    /// Esta entidad tiene los indicadores diarios de las incidencias de las órdenes.
+    /// Agrupa por día de apertura, activo, estado, tipo y confirmación de la orden,
+    /// sin claves externas: los Id que la orden no tiene se guardan como 0, igual que en OrdenesDAO.
+    /// La rellena el script de migración a partir de las órdenes y sus incidencias.
+    /// </summary>
+    [PrimaryKey(nameof(Fecha), nameof(IdActivo), nameof(IdEstadoOrden), nameof(IdTipoOrden), nameof(Confirmada))]
+    [Index(nameof(IdActivo), nameof(Fecha))]
+    [Index(nameof(IdPlanta), nameof(Fecha))]
+    public class IndicadorIncidenciasDiario
+    {
+        /// <summary>
+        /// Día de apertura de las órdenes
+        /// </summary>
+        public required DateOnly Fecha { get; set; }
+
+        /// <summary>
+        /// Identificador del activo de las órdenes. 0 si no tienen activo
+        /// </summary>
+        public required int IdActivo { get; set; }
+
+        /// <summary>
+        /// Identificador del estado de las órdenes. 0 si no tienen estado
+        /// </summary>
+        public required int IdEstadoOrden { get; set; }
+
+        /// <summary>
+        /// Identificador del tipo de las órdenes. 0 si no tienen tipo
+        /// </summary>
+        public required int IdTipoOrden { get; set; }
+
+        /// <summary>
+        /// Indica si las órdenes están confirmadas
+        /// </summary>
+        public required bool Confirmada { get; set; }
+
+        /// <summary>
+        /// Identificador de la planta del activo. Null si no se conoce
+        /// </summary>
+        public int? IdPlanta { get; set; }
+
+        /// <summary>
+        /// Número de órdenes del grupo con alguna incidencia
+        /// </summary>
+        public required int Ordenes { get; set; }
+
+        /// <summary>
+        /// Número de incidencias de las órdenes
+        /// </summary>
+        public required int Incidencias { get; set; }
+
+        /// <summary>
+        /// Número de incidencias con fecha de resolución
+        /// </summary>
+        public required int IncidenciasResueltas { get; set; }
+
+        /// <summary>
+        /// Número de incidencias que paran la máquina
+        /// </summary>
+        public required int ParosMaquina { get; set; }
+
+        /// <summary>
+        /// Suma de los minutos de parada de las incidencias resueltas
+        /// </summary>
+        public required long MinutosParada { get; set; }
+
+        /// <summary>
+        /// Suma de las horas de reparación de las incidencias resueltas, redondeadas por incidencia
+        /// </summary>
+        public required long HorasReparacion { get; set; }
+    }
+}